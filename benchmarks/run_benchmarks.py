@@ -0,0 +1,256 @@
+"""
+Benchmark Runner
+================
+
+Times the course-timetable and exam pipelines on synthetic inputs of
+increasing size, records peak memory per stage and writes the results as
+JSON. Results are compared against a stored baseline so that slowdowns
+show up as regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # default scales
+    python benchmarks/run_benchmarks.py --scales small large
+    python benchmarks/run_benchmarks.py --update-baseline    # store new baseline
+
+Author: Team BeyondGames
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'timetable_generator'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'exam_timetable', 'src'))
+
+# scheduling_core imports pandas on first use (read_course_table); loading it here keeps that one-off
+# import (about 1 s and 20 MB) out of the first timed generation stage
+import pandas  # noqa: F401
+
+from scenario_generator import ScenarioGenerator
+from main import TimetableGenerator
+from scheduling_core import SchedulerConfig
+from exam_scheduler import ExamTimetableGenerator
+from instrumentation import TRACER
+from structured_logging import configure_logging
+
+# Problem sizes (ScenarioGenerator arguments): departments x semesters x sections,
+# courses per semester, rooms, and students per section for the exam side
+SCALES = {
+    'small':  {'departments': 3,  'sections': ('A', 'B'),           'courses_per_semester': 6,
+               'electives_per_semester': 3, 'shared_courses_per_semester': 1,
+               'rooms': 20,  'students_per_section': 60},
+    'medium': {'departments': 6,  'sections': ('A', 'B'),           'courses_per_semester': 8,
+               'electives_per_semester': 4, 'shared_courses_per_semester': 1,
+               'rooms': 40,  'students_per_section': 80},
+    'large':  {'departments': 12, 'sections': ('A', 'B', 'C'),      'courses_per_semester': 8,
+               'electives_per_semester': 4, 'shared_courses_per_semester': 2,
+               'rooms': 80,  'students_per_section': 100},
+    'xlarge': {'departments': 24, 'sections': ('A', 'B', 'C', 'D'), 'courses_per_semester': 10,
+               'electives_per_semester': 6, 'shared_courses_per_semester': 3,
+               'rooms': 160, 'students_per_section': 120},
+}
+DEFAULT_SCALES = ['small', 'medium', 'large']
+SEMESTERS = (2, 4, 6)
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_FILE = os.path.join(BENCH_DIR, 'latest_results.json')
+
+
+class StageTimer:
+    """Collects wall time and peak traced memory for named stages"""
+
+    def __init__(self, scale, trace_memory=True):
+        self.scale = scale
+        self.trace_memory = trace_memory
+        self.results = []
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = 0
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            self.results.append({
+                'scale': self.scale,
+                'stage': name,
+                'seconds': round(elapsed, 4),
+                'peak_mb': round(peak / (1024 * 1024), 2) if self.trace_memory else None,
+                **info
+            })
+
+
+def bench_timetable(timer, scenario, work_dir):
+    """Generate every department/semester/section timetable and export the CSVs"""
+    input_dir = os.path.join(work_dir, 'timetable_inputs')
+    scenario.write_timetable_inputs(input_dir)
+    departments = scenario.departments
+    # The scenario's own rooms and enrolment, not the cwd-relative defaults (../exam_timetable/inputs)
+    room_capacity_file = os.path.join(input_dir, 'classroom.csv')
+    enrolment_file = os.path.join(input_dir, 'students.csv')
+    scenario.write_classrooms(room_capacity_file)
+    scenario.write_students(enrolment_file)
+
+    config = SchedulerConfig.from_env().with_changes(room_capacity_file=room_capacity_file,
+                                                     enrolment_file=enrolment_file)
+    generator = TimetableGenerator(csv_folder=input_dir,
+                                   output_dir=os.path.join(work_dir, 'timetable_outputs'), config=config)
+    groups = [(dept, sem, sec) for dept in departments for sem in scenario.semesters for sec in scenario.sections]
+    # The whole run at once, as main.py does: elective baskets and shared offerings are placed once
+    with timer.stage('timetable.generate_all') as info:
+        contexts = generator.generate_all(groups)
+        info['sections'] = len(contexts)
+        info['unscheduled'] = sum(len(ctx.unscheduled_courses) for ctx in contexts.values() if ctx)
+
+    with timer.stage('timetable.export_to_csv') as info:
+        for (dept, sem, sec), ctx in contexts.items():
+            if ctx:
+                timetable, electives, rotated_out = ctx.result()
+                generator.export_to_csv(timetable, f"{dept}_Sem{sem}_Section{sec}_Timetable.csv",
+                                        electives, rotated_out)
+        info['files'] = sum(1 for ctx in contexts.values() if ctx)
+
+
+def bench_exam(timer, scenario, work_dir):
+    """Load exam inputs, build the schedule, and lay out every seating chart"""
+    input_dir = os.path.join(work_dir, 'exam_inputs')
+    counts = scenario.write_exam_inputs(input_dir)
+
+    generator = ExamTimetableGenerator(input_dir=input_dir,
+                                       output_dir=os.path.join(work_dir, 'exam_outputs'))
+    with timer.stage('exam.load_data', students=counts['students'], courses=counts['courses']):
+        generator.load_data()
+
+    with timer.stage('exam.create_exam_schedule') as info:
+        schedule = generator.create_exam_schedule()
+        info['sessions'] = len(schedule)
+        info['exams'] = sum(len(session.get('individual_courses', [])) for session in schedule)
+
+    with timer.stage('exam.generate_seating_arrangements') as info:
+        seating_plans = generator.generate_seating_arrangements(schedule)
+        info['seating_plans'] = len(seating_plans)
+
+    with timer.stage('exam.save_outputs'):
+        generator.save_exam_schedule(schedule)
+        generator.save_seating_summary(seating_plans)
+        generator.generate_exam_timetable_html(schedule)
+
+
+def run_scale(scale, trace_memory=True, quiet=True):
+    """Run both pipelines for one scale in a throwaway directory"""
+    scenario = ScenarioGenerator(semesters=SEMESTERS, **SCALES[scale])
+    timer = StageTimer(scale, trace_memory)
+    with tempfile.TemporaryDirectory(prefix=f'bench_{scale}_') as work_dir:
+        # The generators report progress with print(); keep it off the terminal
+        with open(os.devnull, 'w') as devnull:
+            with contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+                bench_timetable(timer, scenario, work_dir)
+                bench_exam(timer, scenario, work_dir)
+    return timer.results
+
+
+def compare_with_baseline(results, baseline, tolerance, min_seconds):
+    """Return stages that got slower than baseline by more than tolerance"""
+    previous = {(r['scale'], r['stage']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result['scale'], result['stage']))
+        if not old:
+            continue
+        limit = old['seconds'] * (1 + tolerance)
+        # Tiny stages are dominated by noise; require an absolute slowdown too
+        if result['seconds'] > limit and result['seconds'] - old['seconds'] > min_seconds:
+            regressions.append({
+                'scale': result['scale'],
+                'stage': result['stage'],
+                'baseline_seconds': old['seconds'],
+                'seconds': result['seconds'],
+                'ratio': round(result['seconds'] / old['seconds'], 2) if old['seconds'] else None
+            })
+    return regressions
+
+
+def print_report(results, regressions):
+    print(f"\n{'Scale':<8} {'Stage':<38} {'Seconds':>9} {'Peak MB':>9}")
+    print("-" * 68)
+    for r in results:
+        peak = f"{r['peak_mb']:.2f}" if r['peak_mb'] is not None else '-'
+        print(f"{r['scale']:<8} {r['stage']:<38} {r['seconds']:>9.3f} {peak:>9}")
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) against baseline:")
+        for r in regressions:
+            print(f"   {r['scale']}/{r['stage']}: {r['baseline_seconds']:.3f}s -> {r['seconds']:.3f}s ({r['ratio']}x)")
+    else:
+        print("\n✅ No regressions against baseline")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark timetable and exam generation at scale')
+    parser.add_argument('--scales', nargs='+', choices=sorted(SCALES), default=DEFAULT_SCALES)
+    parser.add_argument('--output', default=RESULTS_FILE, help='where to write the JSON results')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline JSON to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown ratio (0.25 = 25%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='ignore slowdowns smaller than this')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc (faster, no peak memory)')
+    parser.add_argument('--verbose', action='store_true', help='show generator output')
+    parser.add_argument('--trace', metavar='FILE', help='also write a Chrome trace of spans and counters')
+    args = parser.parse_args(argv)
+
+    # Generator progress and per-exam scheduling errors go through logging; keep the benchmark output to the
+    # report (the unscheduled sessions and exams scheduled are recorded with each stage's results)
+    configure_logging(level='DEBUG' if args.verbose else 'CRITICAL')
+    if args.trace:
+        TRACER.enable(output_file=args.trace, trace_format='chrome')
+    trace_memory = not args.no_memory
+    results = []
+    for scale in args.scales:
+        print(f"Running {scale} benchmark...")
+        results.extend(run_scale(scale, trace_memory=trace_memory, quiet=not args.verbose))
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        # Timings taken under tracemalloc are not comparable with untraced ones
+        if baseline.get('meta', {}).get('trace_memory', True) == trace_memory:
+            regressions = compare_with_baseline(results, baseline, args.tolerance, args.min_seconds)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'trace_memory': trace_memory,
+            'scales': {name: {k: list(v) if isinstance(v, tuple) else v for k, v in SCALES[name].items()}
+                       for name in args.scales}
+        },
+        'results': results,
+        'regressions': regressions
+    }
+    output_file = args.baseline if args.update_baseline else args.output
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print_report(results, regressions)
+    print(f"\nResults saved: {output_file}")
+    TRACER.finish()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Scenario Generator
+==================
+
+Generates a consistent, seeded set of inputs for both pipelines:
+
+    <out>/timetable_inputs/Even <DEPT>.csv   course timetable inputs
+    <out>/exam_inputs/courses.csv            exam courses (core courses)
+    <out>/exam_inputs/students.csv           students with elective enrolments
+    <out>/exam_inputs/classroom.csv          classrooms with seating capacities
+    <out>/scenario.json                      parameters, seed and row counts
+
+Course codes, faculty and rooms are shared between the files, so the exam
+courses are the same core courses the timetable schedules and every student
+is enrolled in one elective per basket that exists in the timetable CSV.
+Rows are streamed straight to disk, so tens of thousands of students and
+hundreds of rooms do not need to fit in memory at once. The same seed always
+produces byte-identical files.
+
+Usage:
+    python benchmarks/scenario_generator.py --out scenarios/big --departments 20 --students 20000 --rooms 300
+
+Author: Team BeyondGames
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+
+BASE_DEPARTMENTS = ['CSE', 'DSAI', 'ECE']
+TIMETABLE_COLUMNS = ['Course Code', 'Course Title', 'Lectures', 'Tutorials', 'Practicals',
+                     'Self-Study', 'Credits', 'Faculty', 'Classroom', 'Semester',
+                     'Electives', 'Basket', 'Section']
+STUDENT_COLUMNS = ['roll_number', 'department', 'semester', 'section', 'student_name', 'year', 'electives']
+EXAM_COURSE_COLUMNS = ['department', 'semester', 'course_code', 'course_name', 'credits',
+                       'exam_type', 'exam_duration']
+# L-T-P patterns seen in the real course lists
+LTP_PATTERNS = [(3, 1, 0), (3, 0, 2), (3, 0, 0), (2, 1, 0), (3, 1, 2), (1, 0, 0)]
+# Baskets offered per semester (matches the generator's elective rotation)
+ELECTIVE_BASKETS = {2: ['B1', 'B3', 'E1'], 4: ['B1', 'B3', 'Minor'], 6: ['B1', 'B3', 'E1']}
+LARGE_AUDITORIUM = ('C004', 240)
+
+
+def department_names(count):
+    """Real department names first, then D04, D05, ..."""
+    names = BASE_DEPARTMENTS[:count]
+    names += [f"D{i:02d}" for i in range(len(names) + 1, count + 1)]
+    return names
+
+
+def classroom_names(count):
+    """C101, C102, ... spread over floors of 10 rooms"""
+    return [f"C{100 * (i // 10 + 1) + i % 10 + 1}" for i in range(count)]
+
+
+class ScenarioGenerator:
+    """Seeded generator for course, student and classroom inputs of any size"""
+
+    def __init__(self, departments=3, semesters=(2, 4, 6), sections=('A', 'B'),
+                 courses_per_semester=6, electives_per_semester=3, shared_courses_per_semester=0,
+                 students_per_section=60, students=None, rooms=20, room_capacity=(48, 120),
+                 courses_per_faculty=2, seed=42):
+        self.departments = department_names(departments)
+        self.semesters = tuple(semesters)
+        self.sections = tuple(sections)
+        self.courses_per_semester = courses_per_semester
+        self.electives_per_semester = electives_per_semester
+        self.shared_courses_per_semester = shared_courses_per_semester
+        if students is not None:
+            # Total student count wins over the per-section figure
+            groups = len(self.departments) * len(self.semesters) * len(self.sections)
+            students_per_section = max(1, -(-students // groups))
+        self.students_per_section = students_per_section
+        self.rooms = rooms
+        self.room_capacity = room_capacity
+        self.courses_per_faculty = max(1, courses_per_faculty)
+        self.seed = seed
+        self.classrooms = self._build_classrooms()
+        self.catalogue = self._build_catalogue()
+
+    # ------------------------------------------------------------------
+    # Catalogue (small: one entry per course offering)
+    # ------------------------------------------------------------------
+    def _rng(self, *parts):
+        """Independent, reproducible stream per purpose so files don't depend on write order"""
+        return random.Random(f"{self.seed}:" + ":".join(str(p) for p in parts))
+
+    def _build_classrooms(self):
+        rng = self._rng('rooms')
+        low, high = self.room_capacity
+        rooms = [LARGE_AUDITORIUM]
+        for room in classroom_names(self.rooms):
+            # Capacities in multiples of 8 so every room fills whole benches
+            rooms.append((room, 8 * rng.randint(low // 8, high // 8)))
+        return rooms
+
+    def _build_catalogue(self):
+        """Course offerings per department: core (per section), shared and elective courses"""
+        rng = self._rng('catalogue')
+        room_ids = [room for room, _ in self.classrooms[1:]] or [LARGE_AUDITORIUM[0]]
+        catalogue = {dept: [] for dept in self.departments}
+
+        for dept in self.departments:
+            offerings = (len(self.semesters) * (self.courses_per_semester * len(self.sections)
+                                                + self.electives_per_semester))
+            pool = [f"Dr. {dept} Faculty {n + 1:02d}"
+                    for n in range(max(1, -(-offerings // self.courses_per_faculty)))]
+            rng.shuffle(pool)
+            faculty_cycle = iter(pool * (offerings // len(pool) + 1))
+
+            for sem in self.semesters:
+                for c in range(self.courses_per_semester):
+                    lectures, tutorials, practicals = rng.choice(LTP_PATTERNS)
+                    for sec in self.sections:
+                        catalogue[dept].append({
+                            'code': f"{dept[:2]}{sem}{c + 1:02d}", 'title': f"{dept} Core {sem}.{c + 1}",
+                            'ltp': (lectures, tutorials, practicals), 'credits': lectures + 1,
+                            'faculty': next(faculty_cycle), 'room': rng.choice(room_ids),
+                            'semester': sem, 'electives': 'F', 'basket': '', 'section': f"{sem}{sec}"
+                        })
+                baskets = ELECTIVE_BASKETS.get(sem, ['B1'])
+                for e in range(self.electives_per_semester):
+                    lectures, tutorials, practicals = rng.choice(LTP_PATTERNS[:4])
+                    catalogue[dept].append({
+                        'code': f"{dept[:2]}E{sem}{e + 1:02d}", 'title': f"{dept} Elective {sem}.{e + 1}",
+                        'ltp': (lectures, tutorials, practicals), 'credits': 3,
+                        'faculty': next(faculty_cycle), 'room': rng.choice(room_ids),
+                        'semester': sem, 'electives': 'T', 'basket': baskets[e % len(baskets)], 'section': ''
+                    })
+
+        # Shared courses: same code and faculty taught to neighbouring departments together
+        for sem in self.semesters:
+            for s in range(self.shared_courses_per_semester):
+                lectures, tutorials, practicals = rng.choice(LTP_PATTERNS[:3])
+                owners = rng.sample(self.departments, min(2, len(self.departments)))
+                for dept in owners:
+                    catalogue[dept].append({
+                        'code': f"SH{sem}{s + 1:02d}", 'title': f"Shared Course {sem}.{s + 1}",
+                        'ltp': (lectures, tutorials, practicals), 'credits': 3,
+                        'faculty': f"Dr. Shared Faculty {sem}{s + 1:02d}", 'room': LARGE_AUDITORIUM[0],
+                        'semester': sem, 'electives': 'F', 'basket': '', 'section': ''
+                    })
+        return catalogue
+
+    # ------------------------------------------------------------------
+    # Writers (streamed)
+    # ------------------------------------------------------------------
+    def write_timetable_inputs(self, folder):
+        """Write one 'Even <DEPT>.csv' per department; return the number of rows written"""
+        os.makedirs(folder, exist_ok=True)
+        rows = 0
+        for dept in self.departments:
+            with open(os.path.join(folder, f'Even {dept}.csv'), 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(TIMETABLE_COLUMNS)
+                for course in self.catalogue[dept]:
+                    lectures, tutorials, practicals = course['ltp']
+                    writer.writerow([course['code'], course['title'], lectures, tutorials, practicals,
+                                     0, course['credits'], course['faculty'], course['room'],
+                                     course['semester'], course['electives'], course['basket'],
+                                     course['section']])
+                    rows += 1
+        return rows
+
+    def write_exam_courses(self, path):
+        """Write the exam courses.csv (core and shared courses, one row per department/semester)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        rows = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(EXAM_COURSE_COLUMNS)
+            for dept in self.departments:
+                seen = set()
+                for course in self.catalogue[dept]:
+                    key = (course['semester'], course['code'])
+                    if course['electives'] != 'F' or key in seen:
+                        continue
+                    seen.add(key)
+                    writer.writerow([dept, f"Sem{course['semester']}", course['code'], course['title'],
+                                     course['credits'], 'END SEM', '3_hours'])
+                    rows += 1
+        return rows
+
+    def iter_students(self):
+        """Yield student rows one at a time, each enrolled in one elective per basket"""
+        for dept in self.departments:
+            for sem in self.semesters:
+                baskets = {}
+                for course in self.catalogue[dept]:
+                    if course['semester'] == sem and course['electives'] == 'T':
+                        baskets.setdefault(course['basket'], []).append(course['code'])
+                rng = self._rng('students', dept, sem)
+                year = 25 - sem // 2
+                for s, sec in enumerate(self.sections):
+                    for n in range(self.students_per_section):
+                        roll = f"{year}B{dept}{sem}{s}{n + 1:04d}"
+                        electives = ';'.join(rng.choice(codes) for _, codes in sorted(baskets.items()))
+                        yield [roll, dept, f"Sem{sem}", sec, f"Student_{roll}", year, electives]
+
+    def write_students(self, path):
+        """Stream students.csv to disk; return the number of students"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        rows = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(STUDENT_COLUMNS)
+            for row in self.iter_students():
+                writer.writerow(row)
+                rows += 1
+        return rows
+
+    def write_classrooms(self, path):
+        """Write classroom.csv in the exam input format; return the number of rooms"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['ID', 'Seating Capacity'])
+            writer.writerows(self.classrooms)
+        return len(self.classrooms)
+
+    def write_exam_inputs(self, folder):
+        """Write students.csv, courses.csv and classroom.csv into folder; return row counts"""
+        return {
+            'students': self.write_students(os.path.join(folder, 'students.csv')),
+            'courses': self.write_exam_courses(os.path.join(folder, 'courses.csv')),
+            'classrooms': self.write_classrooms(os.path.join(folder, 'classroom.csv'))
+        }
+
+    def parameters(self):
+        return {
+            'departments': self.departments,
+            'semesters': list(self.semesters),
+            'sections': list(self.sections),
+            'courses_per_semester': self.courses_per_semester,
+            'electives_per_semester': self.electives_per_semester,
+            'shared_courses_per_semester': self.shared_courses_per_semester,
+            'students_per_section': self.students_per_section,
+            'rooms': self.rooms,
+            'room_capacity': list(self.room_capacity),
+            'courses_per_faculty': self.courses_per_faculty,
+            'seed': self.seed
+        }
+
+    def write_all(self, out_dir):
+        """Write the complete scenario under out_dir and return its manifest"""
+        counts = {'timetable_rows': self.write_timetable_inputs(os.path.join(out_dir, 'timetable_inputs'))}
+        counts.update(self.write_exam_inputs(os.path.join(out_dir, 'exam_inputs')))
+        manifest = {'parameters': self.parameters(), 'counts': counts}
+        with open(os.path.join(out_dir, 'scenario.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic timetable and exam inputs')
+    parser.add_argument('--out', required=True, help='output folder for the scenario')
+    parser.add_argument('--departments', type=int, default=3)
+    parser.add_argument('--semesters', type=int, nargs='+', default=[2, 4, 6])
+    parser.add_argument('--sections', nargs='+', default=['A', 'B'])
+    parser.add_argument('--courses-per-semester', type=int, default=6)
+    parser.add_argument('--electives-per-semester', type=int, default=3)
+    parser.add_argument('--shared-courses-per-semester', type=int, default=0)
+    parser.add_argument('--students-per-section', type=int, default=60)
+    parser.add_argument('--students', type=int, help='total students (overrides --students-per-section)')
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    generator = ScenarioGenerator(
+        departments=args.departments, semesters=args.semesters, sections=args.sections,
+        courses_per_semester=args.courses_per_semester, electives_per_semester=args.electives_per_semester,
+        shared_courses_per_semester=args.shared_courses_per_semester,
+        students_per_section=args.students_per_section, students=args.students,
+        rooms=args.rooms, seed=args.seed)
+    manifest = generator.write_all(args.out)
+
+    print(f"Scenario written to {args.out}/")
+    for name, count in manifest['counts'].items():
+        print(f"   {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Timetable Command Line
+======================
+
+One entry point for both pipelines. Every subcommand runs in its pipeline's
+folder, so it works from any working directory, and takes selectors that
+narrow the run to a slice:
+
+    python cli.py timetable                              # every section
+    python cli.py timetable --dept CSE --sem 4 --section A
+    python cli.py html --dept ECE                        # re-render some timetable pages
+    python cli.py exam --date 15/04/2025 --session FN    # re-seat one exam session
+    python cli.py exam --room C101
+    python cli.py viewer                                 # seating charts viewer page
+    python cli.py query --room C004 --day Monday         # room bookings (needs the schedule store)
+    python cli.py query --roll 24BCS101                  # a student's exam seats
+    python cli.py students --html                        # personal timetables (needs the schedule store)
+    python cli.py calendar                               # .ics feeds per section, room, faculty, student
+    python cli.py watch                                  # regenerate whenever an input CSV is saved
+
+A partial timetable run regenerates the selected sections plus those sharing
+a common course or elective basket with them. It needs the schedule store
+(--db or TIMETABLE_DB): it keeps every other section's room bookings and
+replaces only the slice, so one section costs a fraction of a full run.
+
+Watch mode polls the course CSVs and the exam inputs and reruns only what an
+edit affects: the changed sections (a partial run) or, for the exam inputs,
+the exams whose slot, classrooms or students changed. It stays in one
+process, so imports and parsed inputs are warm for every rerun.
+
+Author: Team BeyondGames
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+import traceback
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+TIMETABLE_DIR = os.path.join(REPO_ROOT, 'timetable_generator')
+EXAM_DIR = os.path.join(REPO_ROOT, 'exam_timetable')
+sys.path.insert(0, os.path.join(REPO_ROOT, 'common'))
+
+from input_watch import PARSED_INPUTS, InputWatcher
+from schedule_store import DB_ENV, ScheduleStore
+
+
+@contextlib.contextmanager
+def pipeline_dir(directory, *import_dirs):
+    """Run inside a pipeline's folder (its paths are relative to it) with its modules importable"""
+    for path in reversed((directory,) + import_dirs):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _groups(args):
+    """Selected (department, semester, section) groups, or None when no selector narrows the run"""
+    if not (args.dept or args.sem or args.section):
+        return None
+    from main import select_groups
+    groups = select_groups(args.dept, args.sem, args.section)
+    if not groups:
+        raise SystemExit("No section matches the selectors")
+    return groups
+
+
+def run_timetable(args):
+    with pipeline_dir(TIMETABLE_DIR):
+        import main
+        from scheduling_core import DIAGNOSE_ENV
+        if args.diagnose:
+            os.environ[DIAGNOSE_ENV] = '1'
+        main.main(_groups(args))
+
+
+def run_html(args):
+    with pipeline_dir(TIMETABLE_DIR):
+        from timetable_to_html import TimetableHTMLConverter
+        from instrumentation import TRACER
+        from structured_logging import configure_logging
+        configure_logging()
+        TimetableHTMLConverter(store=ScheduleStore.from_env()).convert_all(_groups(args))
+        TRACER.finish()
+
+
+def run_exam(args):
+    with pipeline_dir(EXAM_DIR, os.path.join(EXAM_DIR, 'src')):
+        from exam_scheduler import ExamTimetableGenerator
+        from structured_logging import configure_logging
+        configure_logging()
+        selection = {'departments': args.dept, 'semesters': [f"Sem{sem}" for sem in args.sem or ()],
+                     'dates': args.date, 'sessions': args.session, 'rooms': args.room}
+        exams, seating_plans = ExamTimetableGenerator().run_complete_generation(
+            {key: value for key, value in selection.items() if value} or None)
+        print(f"Exams: {len(exams)}, seating charts: {len(seating_plans)}")
+
+
+def run_viewer(args):
+    with pipeline_dir(EXAM_DIR):
+        from generate_seating_viewer import generate_seating_viewer
+        generate_seating_viewer()
+
+
+def run_students(args):
+    store = ScheduleStore.from_env()
+    if store is None:
+        raise SystemExit(f"Personal timetables are built from the schedule store: pass --db or set {DB_ENV}")
+    with pipeline_dir(TIMETABLE_DIR), store:
+        from student_timetables import StudentTimetables
+        count = StudentTimetables.from_store(store).export(
+            html_dir=os.path.join('timetable_html', 'students') if args.html else None)
+    print(f"Personal timetables: {count} students")
+
+
+def run_calendar(args):
+    store = ScheduleStore.from_env()
+    if store is None:
+        raise SystemExit(f"Calendars are built from the schedule store: pass --db or set {DB_ENV}")
+    with pipeline_dir(TIMETABLE_DIR), store:
+        from datetime import date
+        from ical_export import TERM_START, CalendarExporter, CalendarTerm
+        term = CalendarTerm.before_exams(store.exams(), date.fromisoformat(args.term_start or TERM_START.isoformat()))
+        if args.term_end:
+            term = CalendarTerm(term.start, date.fromisoformat(args.term_end))
+        counts = CalendarExporter(store, term).export_all(os.path.join('timetable_outputs', 'calendars'))
+    print("Calendars: " + ', '.join(f"{count} {kind}" for kind, count in counts.items()))
+
+
+def run_query(args):
+    store = ScheduleStore.from_env()
+    if store is None:
+        raise SystemExit(f"Queries read the schedule store: pass --db or set {DB_ENV}")
+    with store:
+        if args.roll:
+            rows = store.seats_for(args.roll)
+        elif args.faculty:
+            rows = store.faculty_bookings(args.faculty)
+        elif args.room or args.day or args.slot:
+            rows = store.room_bookings(room=args.room, day=args.day, slot=args.slot)
+        elif args.dept and args.sem and args.section:
+            rows = store.section_bookings(args.dept[0], args.sem[0], args.section[0])
+        else:
+            raise SystemExit("Query by --roll, --faculty, --room/--day/--slot, or one --dept --sem --section")
+    for row in rows:
+        print('  '.join(f"{key}={value}" for key, value in row.items() if value is not None))
+    print(f"{len(rows)} row(s)")
+
+
+class WatchSession:
+    """The state a watch loop keeps between reruns: last-seen inputs and the last exam result"""
+
+    def __init__(self):
+        with pipeline_dir(TIMETABLE_DIR):
+            import main
+            from room_assignment import load_enrolment
+            from scheduling_core import read_course_table
+        self.timetable_main = main
+        self.parsers = {'course': read_course_table, 'enrolment': load_enrolment}
+        self.course_files = {dept: os.path.join(TIMETABLE_DIR, 'input_files', 'sdtt_inputs', f'Even {dept}.csv')
+                             for dept in main.DEPARTMENTS}
+        self.exam_inputs = {name: os.path.join(EXAM_DIR, 'inputs', name)
+                            for name in ('students.csv', 'courses.csv', 'classroom.csv')}
+        # Versions the last run was generated from (diffed against on the next edit)
+        self.course_tables = {dept: self._parse(path, 'course') for dept, path in self.course_files.items()}
+        self.enrolment = self._parse(self.exam_inputs['students.csv'], 'enrolment')
+        self.exam_generator = None
+        self.exam_result = None
+
+    def _parse(self, path, kind):
+        # Through the process-wide cache, so the pipelines reuse what is parsed here
+        return PARSED_INPUTS.get(path, self.parsers[kind]) if os.path.exists(path) else None
+
+    def paths(self):
+        return list(self.course_files.values()) + list(self.exam_inputs.values())
+
+    def timetable(self, groups=None):
+        """Generate (and convert to HTML) `groups` and the sections sharing courses with them; None = all"""
+        with pipeline_dir(TIMETABLE_DIR):
+            from timetable_to_html import TimetableHTMLConverter
+            generated = self.timetable_main.main(groups)
+            TimetableHTMLConverter(store=ScheduleStore.from_env()).convert_all(None if groups is None else generated)
+
+    def exam(self):
+        """Full exam run the first time, then re-seat only the exams an edit changed"""
+        with pipeline_dir(EXAM_DIR, os.path.join(EXAM_DIR, 'src')):
+            from exam_scheduler import ExamTimetableGenerator
+            from generate_seating_viewer import generate_seating_viewer
+            if self.exam_result is None:
+                self.exam_generator = ExamTimetableGenerator()
+                self.exam_result = self.exam_generator.run_complete_generation()
+            else:
+                self.exam_result = self.exam_generator.run_incremental(*self.exam_result)
+            generate_seating_viewer()
+
+    def regenerate(self, changed):
+        """Rerun what the changed input files affect"""
+        main = self.timetable_main
+        groups = set()
+        for dept, path in self.course_files.items():
+            if path in changed:
+                table = self._parse(path, 'course')
+                groups.update(main.changed_groups(dept, self.course_tables[dept], table))
+                self.course_tables[dept] = table
+        if self.exam_inputs['students.csv'] in changed:
+            # Enrolment picks the rooms of the sections whose head count changed
+            enrolment = self._parse(self.exam_inputs['students.csv'], 'enrolment') or {}
+            groups.update(main.enrolment_groups(self.enrolment or {}, enrolment))
+            self.enrolment = enrolment
+        
+        if self.exam_inputs['classroom.csv'] in changed:
+            self.timetable()  # Room capacities feed every section's room choice
+        elif groups:
+            self.timetable([group for group in main.select_groups() if group in groups])
+        if any(path in changed for path in self.exam_inputs.values()):
+            self.exam()
+
+
+def run_watch(args):
+    # Partial reruns take the other sections' room bookings from the schedule store
+    os.environ.setdefault(DB_ENV, '1')
+    session = WatchSession()
+    watcher = InputWatcher(session.paths())
+    session.timetable()
+    session.exam()
+    print(f"Watching {len(watcher.paths)} input files every {args.interval:g}s (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            print("Changed: " + ', '.join(os.path.relpath(path, REPO_ROOT) for path in changed))
+            started = time.perf_counter()
+            try:
+                session.regenerate(changed)
+            except Exception:
+                # A half-saved or malformed CSV: report it and wait for the next save
+                traceback.print_exc()
+                continue
+            print(f"Regenerated in {time.perf_counter() - started:.2f}s")
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Generate, render and query timetables and exam seating')
+    parser.add_argument('--db', metavar='PATH', help=f'schedule store to use (sets {DB_ENV}; "1" = schedule.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def selectors(command, exam=False):
+        command.add_argument('--dept', nargs='+', help='departments, e.g. CSE DSAI')
+        command.add_argument('--sem', nargs='+', type=int, help='semesters, e.g. 2 4')
+        if exam:
+            command.add_argument('--date', nargs='+', help='exam dates as DD/MM/YYYY')
+            command.add_argument('--session', nargs='+', choices=['FN', 'AN'])
+            command.add_argument('--room', nargs='+', help='classrooms to seat')
+        else:
+            command.add_argument('--section', nargs='+', help='sections, e.g. A')
+
+    timetable = commands.add_parser('timetable', help='generate daily timetables')
+    selectors(timetable)
+    timetable.add_argument('--diagnose', action='store_true',
+                           help='explain every unscheduled session (unscheduled_diagnostics.json)')
+    selectors(commands.add_parser('html', help='convert timetables to HTML pages'))
+    selectors(commands.add_parser('exam', help='generate the exam schedule and seating charts'), exam=True)
+    commands.add_parser('viewer', help='build the seating charts viewer page')
+    query = commands.add_parser('query', help='look up bookings and seats in the schedule store')
+    selectors(query)
+    query.add_argument('--room')
+    query.add_argument('--day')
+    query.add_argument('--slot', help="e.g. '09:45-11:15'")
+    query.add_argument('--faculty')
+    query.add_argument('--roll', help='student roll number')
+    students = commands.add_parser('students', help="write every student's personal timetable")
+    students.add_argument('--html', action='store_true', help='also one HTML page per student')
+    calendar = commands.add_parser('calendar', help='write iCalendar feeds for sections, rooms, faculty and students')
+    calendar.add_argument('--term-start', metavar='YYYY-MM-DD', help='first teaching day (default 2025-01-06)')
+    calendar.add_argument('--term-end', metavar='YYYY-MM-DD', help='last teaching day (default: before the exams)')
+    watch = commands.add_parser('watch', help='regenerate what an input edit affects, as files are saved')
+    watch.add_argument('--interval', type=float, default=1.0, help='seconds between polls (default 1)')
+    return parser
+
+
+COMMANDS = {'timetable': run_timetable, 'html': run_html, 'exam': run_exam, 'viewer': run_viewer,
+            'query': run_query, 'students': run_students, 'calendar': run_calendar, 'watch': run_watch}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.db:
+        os.environ[DB_ENV] = os.path.abspath(args.db) if args.db not in ('1', 'true', 'yes', 'on') else args.db
+    COMMANDS[args.command](args)
+
+
+if __name__ == '__main__':
+    main()
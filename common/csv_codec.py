@@ -0,0 +1,101 @@
+"""
+Lightweight CSV Codec
+=====================
+
+Most of the pipelines' CSV traffic is plain tables: input rows turned into
+dicts (students, courses, classrooms, the seating summary) and timetable
+grids with days as rows and slots as columns. Importing pandas for those
+costs more than the reading itself, so they go through the standard csv
+module here; pandas is imported only where a DataFrame is really needed
+(the scheduler's course tables).
+
+    students = read_records('inputs/students.csv')     # like read_csv(...).to_dict('records')
+    grid = Grid.from_nested(timetable)                  # like DataFrame(timetable).T
+    write_grid('CSE_Sem4_SectionA_Timetable.csv', grid) # like .to_csv(index=True)
+
+Values are typed per column the way pandas infers them: a column whose
+non-empty cells all parse as integers holds ints, one that parses as
+numbers holds floats, anything else stays text. Empty cells read as None.
+
+Author: Team BeyondGames
+"""
+
+import csv
+import math
+
+
+def is_missing(value):
+    """True for an empty CSV cell: None here, NaN when the row came from pandas"""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _column_parser(values):
+    """int, float or str: the narrowest type every non-empty value of a column parses as"""
+    for parse in (int, float):
+        try:
+            for value in values:
+                if value != '':
+                    parse(value)
+        except ValueError:
+            continue
+        return parse
+    return str
+
+
+def read_records(path):
+    """Rows of a CSV file as dicts keyed by its header"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = [row + [''] * (len(header) - len(row)) for row in reader if row]
+
+    columns = list(zip(*rows)) if rows else [() for _ in header]
+    parsers = [_column_parser(values) for values in columns]
+    return [{name: (None if value == '' else parse(value)) for name, parse, value in zip(header, parsers, row)}
+            for row in rows]
+
+
+class Grid:
+    """A row-labelled table of text cells (a timetable: days as rows, slots as columns)"""
+
+    def __init__(self, columns, rows):
+        """
+        Args:
+            columns: Column labels in order
+            rows: {row label: [cell per column]} in row order
+        """
+        self.columns = list(columns)
+        self.rows = rows
+
+    @property
+    def index(self):
+        return list(self.rows)
+
+    def cell(self, row, column):
+        return self.rows[row][self.columns.index(column)]
+
+    @classmethod
+    def from_nested(cls, nested):
+        """{row: {column: value}} -> Grid; columns in first-seen order, missing cells empty"""
+        columns = list(dict.fromkeys(column for cells in nested.values() for column in cells))
+        rows = {row: ['' if is_missing(cells.get(column)) else str(cells.get(column)) for column in columns]
+                for row, cells in nested.items()}
+        return cls(columns, rows)
+
+
+def read_grid(path):
+    """A CSV written by write_grid (first column holds the row labels)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [''])
+        rows = {row[0]: row[1:] for row in reader if row}
+    return Grid(header[1:], rows)
+
+
+def write_grid(path, grid):
+    """Write a Grid with its row labels in the first column and an unnamed corner cell"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow([''] + grid.columns)
+        for label, cells in grid.rows.items():
+            writer.writerow([label] + cells)
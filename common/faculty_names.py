@@ -0,0 +1,121 @@
+"""
+Faculty Names
+=============
+
+The course CSVs' Faculty column is free text. One cell can name several
+people ("Dr. Abdul Wahid & Dr. Rajendra Hegadi", "Dr. Malay/ Dr. Dibyajyothi",
+"Prof. Chachadi and Dr. Chandrika K"), carry a role or an affiliation
+("Dr. Rao (Lab)", "Mr. Ram Subramanian ( Course Coordinator: Dr. Manjunath KV)",
+"Dr. Jolly Thomas, IIT Dharwad"), and the same person is spelt differently
+across departments ("Dr.Anushree K" / "Dr. Anushree Kini", "Dr. Girish GN" /
+"Dr. Girish G N").
+
+    split_faculty('Dr. Abdul Wahid & Dr. Rajendra Hegadi')
+        -> ['Dr. Abdul Wahid', 'Dr. Rajendra Hegadi']
+
+    directory = FacultyDirectory(all_faculty_cells)
+    directory.members('Dr.Anushree K')      -> ['Dr. Anushree Kini']
+
+A FacultyDirectory sees every name first, so an abbreviated name resolves
+to the one full name it abbreviates (each word a prefix of the full name's
+word); an abbreviation matching several people is left as written.
+
+Author: Team BeyondGames
+"""
+import re
+
+# Co-teachers are separated by '&', '/', ',' or ' and '
+SEPARATORS = re.compile(r'\s*(?:&|/|,|\band\b)\s*', re.IGNORECASE)
+# Parenthesised roles and notes: '(Lab)', '( Course Coordinator: Dr. X)'
+ROLE = re.compile(r'\([^)]*\)?')
+TITLE = re.compile(r'^(dr|prof|pof|mr|mrs|ms)\b\.?\s*', re.IGNORECASE)
+TITLES = {'dr': 'Dr.', 'prof': 'Prof.', 'pof': 'Prof.', 'mr': 'Mr.', 'mrs': 'Mrs.', 'ms': 'Ms.'}
+# Parts of a cell that are an institution rather than a person
+AFFILIATION = re.compile(r'\b(IIT|IIIT|NIT|University|Institute)\b')
+
+
+def _display(name):
+    """'Dr.Anushree  K' -> 'Dr. Anushree K' (title spelt one way, whitespace collapsed)"""
+    name = ' '.join(name.replace('.', '. ').split()).replace(' .', '.')
+    match = TITLE.match(name)
+    if not match:
+        return name.rstrip('.')
+    rest = name[match.end():].rstrip('.')
+    return f"{TITLES[match.group(1).lower()]} {rest}" if rest else ''
+
+
+def split_faculty(value):
+    """The people named in one Faculty cell, roles and affiliations dropped, in order"""
+    value = ROLE.sub(' ', '' if value is None else str(value))
+    names = []
+    for part in SEPARATORS.split(value):
+        name = _display(part)
+        if name and not AFFILIATION.search(name) and name not in names:
+            names.append(name)
+    return names
+
+
+def name_tokens(name):
+    """Lower-case words of a name without its title; run-together initials split ('GN' -> 'g', 'n')"""
+    tokens = []
+    for word in TITLE.sub('', name).replace('.', ' ').split():
+        if word.isupper() and len(word) <= 3:
+            tokens.extend(word.lower())
+        else:
+            tokens.append(word.lower())
+    return tuple(tokens)
+
+
+def _first_name(token):
+    # 'Chinmayanand' / 'Chinmayananda': a transliterated final vowel
+    return token[:-1] if token.endswith('a') and len(token) > 4 else token
+
+
+def abbreviates(short, full):
+    """True if name tokens `short` are `full` with later words cut short ('anushree k' -> 'anushree kini')"""
+    if not short or len(short) > len(full) or _first_name(short[0]) != _first_name(full[0]):
+        return False
+    return all(b.startswith(a) for a, b in zip(short[1:], full[1:]))
+
+
+def faculty_key(name):
+    """Comparison key of one person's name: letters only, title dropped"""
+    return ''.join(name_tokens(name))
+
+
+class FacultyDirectory:
+    """Canonical names for every person in a set of Faculty cells"""
+
+    def __init__(self, values=()):
+        self._people = {}  # name tokens -> most complete spelling seen
+        for value in values:
+            for name in split_faculty(value):
+                tokens = name_tokens(name)
+                if tokens and (tokens not in self._people or len(name) > len(self._people[tokens])):
+                    self._people[tokens] = name
+        self._canonical = {tokens: self._resolve(tokens, name) for tokens, name in self._people.items()}
+
+    def _resolve(self, tokens, name):
+        candidates = [other for other in self._people if abbreviates(tokens, other)]
+        if not candidates:
+            return name
+        # The fullest candidate, if every other candidate abbreviates it too (they are one person)
+        target = max(candidates, key=lambda other: (len(other), len(''.join(other))))
+        one_person = all(abbreviates(other, target) for other in candidates)
+        return self._people[target] if one_person else name
+
+    def canonical(self, name):
+        """Canonical spelling of one person's name (names the directory has not seen are resolved too)"""
+        tokens = name_tokens(name)
+        if tokens in self._canonical:
+            return self._canonical[tokens]
+        return self._resolve(tokens, _display(name))
+
+    def members(self, value):
+        """Canonical names of the people in one Faculty cell"""
+        names = []
+        for name in split_faculty(value):
+            name = self.canonical(name)
+            if name not in names:
+                names.append(name)
+        return names
@@ -0,0 +1,98 @@
+"""
+Input Change Detection
+======================
+
+Polling-based change detection for the pipelines' input files, and a cache
+of parsed inputs that survives between runs in one process (watch mode).
+
+A file's signature is its (mtime, size) stamp plus a SHA-256 of its bytes.
+The hash is only recomputed when the stamp moves, so an idle poll costs one
+stat() per file, and saving a file without changing it (or touching it) is
+not reported as a change.
+
+    watcher = InputWatcher(['inputs/students.csv', 'inputs/courses.csv'])
+    changed = watcher.poll()                     # paths whose content changed
+
+    frame = PARSED_INPUTS.get(csv_file, pd.read_csv)   # reparsed only after an edit
+
+Author: Team BeyondGames
+"""
+
+import hashlib
+import os
+import threading
+
+
+def file_stamp(path):
+    """(mtime in ns, size) of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def content_digest(path):
+    """SHA-256 of a file's bytes, or None when it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def signature(path, previous=None):
+    """(stamp, digest) of a file, reusing `previous`'s digest while the stamp is unchanged"""
+    stamp = file_stamp(path)
+    if previous is not None and previous[0] == stamp:
+        return previous
+    return stamp, (content_digest(path) if stamp is not None else None)
+
+
+class InputWatcher:
+    """Reports which of a set of files changed content since the last poll"""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._seen = {path: signature(path) for path in self.paths}
+
+    def poll(self):
+        """Paths whose content changed (including files created or deleted), in watch order"""
+        changed = []
+        for path in self.paths:
+            previous = self._seen[path]
+            current = signature(path, previous)
+            if current[1] != previous[1]:
+                changed.append(path)
+            self._seen[path] = current
+        return changed
+
+
+class ParsedInputCache:
+    """Parsed input files, keyed by path and parser, reparsed only when their content changes"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, parse):
+        """parse(path), or the value parse() returned last time if the file's content is unchanged"""
+        key = os.path.abspath(path), parse
+        with self._lock:
+            previous, value = self._entries.get(key, (None, None))
+            current = signature(path, previous)
+            if previous is None or current[1] != previous[1] or current[1] is None:
+                value = parse(path)
+            self._entries[key] = current, value
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# One cache per process: a watch loop's reruns share it with every generator they create
+PARSED_INPUTS = ParsedInputCache()
@@ -0,0 +1,198 @@
+"""
+Instrumentation
+===============
+
+Lightweight stage timing and counters shared by the daily timetable and exam
+pipelines.
+
+    from instrumentation import TRACER
+
+    with TRACER.span('timetable.load', department='CSE'):
+        ...
+    TRACER.count('timetable.slot_probes')
+
+Tracing is off unless the TIMETABLE_TRACE environment variable is set, in
+which case spans and counters are collected and written when the run calls
+TRACER.finish():
+
+    TIMETABLE_TRACE=1                   -> trace.json (summary + events)
+    TIMETABLE_TRACE=run_trace.json      -> that file
+    TIMETABLE_TRACE_FORMAT=chrome       -> Chrome trace format (chrome://tracing, Perfetto)
+
+When disabled, span() hands back a shared no-op context manager and count()
+returns after a single attribute check.
+
+Author: Team BeyondGames
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from structured_logging import get_logger
+
+log = get_logger('timetable.trace')
+
+TRACE_ENV = 'TIMETABLE_TRACE'
+TRACE_FORMAT_ENV = 'TIMETABLE_TRACE_FORMAT'
+DEFAULT_TRACE_FILE = 'trace.json'
+
+
+class _NullSpan:
+    """Context manager used for every span while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """One timed region; nested spans are recorded independently"""
+
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach extra arguments (e.g. result sizes) before the span closes"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects spans and counters; everything is a no-op while disabled"""
+
+    def __init__(self, enabled=False, output_file=None, trace_format='json'):
+        self.enabled = enabled
+        self.output_file = output_file or DEFAULT_TRACE_FILE
+        self.trace_format = trace_format
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls):
+        """Configure from TIMETABLE_TRACE / TIMETABLE_TRACE_FORMAT"""
+        value = os.environ.get(TRACE_ENV, '').strip()
+        enabled = value.lower() not in ('', '0', 'false', 'no', 'off')
+        output_file = value if value.lower().endswith('.json') else None
+        trace_format = os.environ.get(TRACE_FORMAT_ENV, 'json').strip().lower()
+        return cls(enabled=enabled, output_file=output_file, trace_format=trace_format)
+
+    def reset(self):
+        self.events = []
+        self.counters = defaultdict(int)
+        self.origin = time.perf_counter_ns()
+
+    def enable(self, output_file=None, trace_format=None):
+        self.enabled = True
+        if output_file:
+            self.output_file = output_file
+        if trace_format:
+            self.trace_format = trace_format
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, **args):
+        """Time a block: `with TRACER.span('stage', key=value): ...`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def count(self, name, n=1):
+        """Add n to a named counter"""
+        if self.enabled:
+            # Counted from the what-if and pipeline worker threads: += on a dict entry is not atomic
+            with self._lock:
+                self.counters[name] += n
+
+    def _record(self, name, start_ns, duration_ns, args):
+        with self._lock:
+            self.events.append((name, start_ns - self.origin, duration_ns,
+                                threading.get_ident(), args))
+
+    def summary(self):
+        """Per-span totals {name: {'calls', 'total_ms', 'max_ms'}} plus counters"""
+        with self._lock:
+            events, counters = list(self.events), dict(self.counters)
+        stages = {}
+        for name, _, duration_ns, _, _ in events:
+            stage = stages.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            duration_ms = duration_ns / 1e6
+            stage['calls'] += 1
+            stage['total_ms'] += duration_ms
+            stage['max_ms'] = max(stage['max_ms'], duration_ms)
+        for stage in stages.values():
+            stage['total_ms'] = round(stage['total_ms'], 3)
+            stage['max_ms'] = round(stage['max_ms'], 3)
+        return {'stages': stages, 'counters': dict(sorted(counters.items()))}
+
+    def to_json(self):
+        """Summary plus the raw span list (times in milliseconds from tracer start)"""
+        data = self.summary()
+        data['events'] = [
+            {'name': name, 'start_ms': round(start / 1e6, 3), 'duration_ms': round(duration / 1e6, 3),
+             'thread': tid, 'args': args}
+            for name, start, duration, tid, args in self.events
+        ]
+        return data
+
+    def to_chrome_trace(self):
+        """Chrome trace event format: complete ('X') events plus final counter ('C') values"""
+        pid = os.getpid()
+        trace_events = [
+            {'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'ts': start / 1e3, 'dur': duration / 1e3,
+             'pid': pid, 'tid': tid, 'args': {k: str(v) for k, v in args.items()}}
+            for name, start, duration, tid, args in self.events
+        ]
+        end_us = max((e['ts'] + e['dur'] for e in trace_events), default=0)
+        for name, value in sorted(self.counters.items()):
+            trace_events.append({'name': name, 'ph': 'C', 'ts': end_us, 'pid': pid, 'args': {'value': value}})
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def export(self, output_file=None, trace_format=None):
+        """Write the trace; returns the file path"""
+        output_file = output_file or self.output_file
+        trace_format = trace_format or self.trace_format
+        data = self.to_chrome_trace() if trace_format == 'chrome' else self.to_json()
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        return output_file
+
+    def finish(self):
+        """Export the trace if tracing is enabled; call once at the end of a run"""
+        if not self.enabled:
+            return None
+        output_file = self.export()
+        log.info("Trace saved: %s", output_file, extra={'file': output_file})
+        return output_file
+
+
+# Process-wide tracer used by both pipelines
+TRACER = Tracer.from_env()
@@ -0,0 +1,317 @@
+"""
+SQLite Schedule Store
+=====================
+
+An optional storage backend holding everything a run produces in one
+SQLite database: the section timetables, the room ledger, elective
+baskets, the exam schedule, seating plans and individual seat
+assignments. The CSV/HTML outputs are still written; the store adds a
+single indexed place to query them from.
+
+    store = ScheduleStore.from_env()          # None unless TIMETABLE_DB is set
+    store.write_timetables(contexts, generator.global_classroom_usage)
+    store.room_bookings(room='C004')          # indexed by room, slot, section, faculty
+    store.faculty_bookings('Dr.Anushree K')   # any spelling, co-taught sessions included
+    store.seats_for('24BCS101')               # indexed by roll number
+
+Each pipeline replaces only its own tables, inside a single transaction
+with executemany bulk inserts, so readers never see half a run. The
+database runs in WAL mode: the HTML converters and query tools can read
+while a pipeline is writing.
+
+    TIMETABLE_DB=1                 -> schedule.db at the repository root
+    TIMETABLE_DB=/tmp/tt.db        -> that file
+
+Author: Team BeyondGames
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from csv_codec import Grid
+from faculty_names import FacultyDirectory
+from structured_logging import get_logger
+
+DB_ENV = 'TIMETABLE_DB'
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'schedule.db')
+
+log = get_logger('timetable.store')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    department TEXT NOT NULL, semester INTEGER NOT NULL, section TEXT NOT NULL,
+    day TEXT NOT NULL, day_index INTEGER NOT NULL,
+    slot TEXT NOT NULL, slot_index INTEGER NOT NULL,
+    cell TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_section ON sessions (department, semester, section);
+CREATE INDEX IF NOT EXISTS idx_sessions_slot ON sessions (day, slot);
+
+CREATE TABLE IF NOT EXISTS room_bookings (
+    room TEXT NOT NULL, day TEXT NOT NULL, slot TEXT NOT NULL,
+    department TEXT, semester INTEGER, section TEXT,
+    course TEXT, faculty TEXT, type TEXT,
+    cohort TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_room ON room_bookings (room, day, slot);
+CREATE INDEX IF NOT EXISTS idx_bookings_slot ON room_bookings (day, slot);
+CREATE INDEX IF NOT EXISTS idx_bookings_section ON room_bookings (department, semester, section);
+CREATE INDEX IF NOT EXISTS idx_bookings_faculty ON room_bookings (faculty);
+
+CREATE TABLE IF NOT EXISTS electives (
+    department TEXT NOT NULL, semester INTEGER NOT NULL, section TEXT NOT NULL,
+    basket TEXT NOT NULL, course_code TEXT NOT NULL, title TEXT, classroom TEXT,
+    after_midsems INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_electives_section ON electives (department, semester, section);
+
+CREATE TABLE IF NOT EXISTS exams (
+    exam_index INTEGER PRIMARY KEY,
+    date TEXT NOT NULL, day TEXT, session TEXT NOT NULL, time TEXT,
+    course_code TEXT NOT NULL, course_name TEXT,
+    department TEXT, semester TEXT, student_count INTEGER,
+    classrooms TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_exams_slot ON exams (date, session);
+CREATE INDEX IF NOT EXISTS idx_exams_course ON exams (course_code);
+
+CREATE TABLE IF NOT EXISTS seating_plans (
+    exam_date TEXT NOT NULL, session TEXT NOT NULL, course_code TEXT NOT NULL,
+    classroom TEXT NOT NULL, students_assigned INTEGER, html_file TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_plans_room ON seating_plans (classroom, exam_date, session);
+
+CREATE TABLE IF NOT EXISTS seats (
+    exam_date TEXT NOT NULL, session TEXT NOT NULL, course_code TEXT NOT NULL,
+    classroom TEXT NOT NULL, seat_row INTEGER NOT NULL, seat_col INTEGER NOT NULL,
+    roll_number TEXT NOT NULL, department TEXT, semester TEXT, section TEXT, course_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_seats_roll ON seats (roll_number);
+CREATE INDEX IF NOT EXISTS idx_seats_room ON seats (classroom, exam_date, session);
+"""
+
+# Bumped when the schema changes; an older database is rebuilt (it only holds derived data)
+SCHEMA_VERSION = 2
+
+# Tables each pipeline owns (and replaces on every write)
+TIMETABLE_TABLES = ('sessions', 'room_bookings', 'electives')
+EXAM_TABLES = ('exams', 'seating_plans', 'seats')
+
+
+class ScheduleStore:
+    """One SQLite database of timetables, room bookings, electives, exams and seats"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        # WAL: readers (HTML converters, queries) do not block on a writing pipeline
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            with self.conn:
+                for table in TIMETABLE_TABLES + EXAM_TABLES:
+                    self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        """Store configured by TIMETABLE_DB, or None when the variable is unset"""
+        value = os.environ.get(DB_ENV, '').strip()
+        if value.lower() in ('', '0', 'false', 'no', 'off'):
+            return None
+        return cls(DEFAULT_DB_PATH if value.lower() in ('1', 'true', 'yes', 'on') else value)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def _replacing(self, tables, sections=None):
+        """One transaction that empties `tables` (only the given sections' rows, if any) first; rolled back on failure"""
+        with self.conn:
+            for table in tables:
+                if sections is None:
+                    self.conn.execute(f'DELETE FROM {table}')
+                else:
+                    self.conn.executemany(f'DELETE FROM {table} WHERE department = ? AND semester = ? AND section = ?',
+                                          sections)
+            yield self.conn
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write_timetables(self, contexts, ledger, sections=None):
+        """
+        Replace the timetable tables with a run's GenerationContexts and room ledger.
+        With `sections` ((department, semester, section) tuples), only those sections'
+        rows and bookings are replaced; the rest of the stored run is kept.
+        """
+        owned = None if sections is None else set(sections)
+        sessions, electives = [], []
+        for ctx in contexts:
+            if ctx is None:
+                continue
+            group = (ctx.department, ctx.semester, ctx.section)
+            for day_index, (day, row) in enumerate(ctx.timetable.items()):
+                for slot_index, (slot, cell) in enumerate(row.items()):
+                    sessions.append(group + (day, day_index, slot, slot_index, str(cell)))
+            for after, baskets in ((0, ctx.elective_courses), (1, ctx.rotated_out_electives)):
+                for basket, courses in (baskets or {}).items():
+                    for course in courses:
+                        electives.append(group + (str(basket), course['code'], course.get('title'),
+                                                  course.get('classroom'), after))
+
+        bookings = []
+        for day, slots in ledger.items():
+            for slot, rooms in slots.items():
+                for room, entry in rooms.items():
+                    # Sessions packed into a flexible slot after this one share its room
+                    for part in [entry] + entry.get('packed', []):
+                        if owned is not None and (part.get('dept'), part.get('semester'), part.get('section')) not in owned:
+                            continue
+                        cohort = json.dumps([list(member) for member in part['cohort']]) if part.get('cohort') else None
+                        bookings.append((room, day, slot, part.get('dept'), part.get('semester'),
+                                         part.get('section'), part.get('course'), part.get('faculty'),
+                                         part.get('type'), cohort))
+
+        with self._replacing(TIMETABLE_TABLES, None if owned is None else sorted(owned)) as conn:
+            conn.executemany('INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)', sessions)
+            conn.executemany('INSERT INTO room_bookings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', bookings)
+            conn.executemany('INSERT INTO electives VALUES (?, ?, ?, ?, ?, ?, ?, ?)', electives)
+        log.info("Schedule store: %d cells, %d room bookings, %d electives written to %s",
+                 len(sessions), len(bookings), len(electives), self.path, extra={'file': self.path})
+
+    def write_exams(self, schedule, seating_plans):
+        """Replace the exam tables with an exam schedule and its seating plans"""
+        exams = [(index, exam['date'], exam.get('day'), exam['session'], exam.get('time'),
+                  exam['course_code'], exam.get('course_name'), exam.get('department'),
+                  exam.get('semester'), exam.get('student_count'), ','.join(exam.get('classrooms', [])))
+                 for index, exam in enumerate(schedule)]
+        plans, seats = [], []
+        for plan in seating_plans:
+            key = (plan['exam_date'], plan['session'], plan['course_code'], plan['classroom'])
+            plans.append(key + (len(plan['assigned_students']), plan.get('html_file')))
+            for row, seat_row in enumerate(plan['seating_matrix']):
+                for col, seat in enumerate(seat_row):
+                    if seat:
+                        seats.append(key + (row, col, seat['roll_number'], seat.get('department'),
+                                            seat.get('semester'), seat.get('section'), seat.get('course_key')))
+
+        with self._replacing(EXAM_TABLES) as conn:
+            conn.executemany('INSERT INTO exams VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', exams)
+            conn.executemany('INSERT INTO seating_plans VALUES (?, ?, ?, ?, ?, ?)', plans)
+            conn.executemany('INSERT INTO seats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', seats)
+        log.info("Schedule store: %d exams, %d seats written to %s", len(exams), len(seats), self.path,
+                 extra={'file': self.path})
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _rows(self, sql, params=()):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def ledger(self, exclude=()):
+        """
+        The stored room ledger as global_classroom_usage[day][slot][room] = record,
+        without the bookings of the `exclude` sections (the ones a partial run regenerates)
+        """
+        excluded = set(exclude)
+        ledger = {}
+        for row in self.conn.execute('SELECT * FROM room_bookings ORDER BY rowid'):
+            if (row['department'], row['semester'], row['section']) in excluded:
+                continue
+            record = {'dept': row['department'], 'semester': row['semester'], 'section': row['section'],
+                      'course': row['course'], 'faculty': row['faculty'], 'type': row['type']}
+            if row['cohort']:
+                record['cohort'] = [tuple(member) for member in json.loads(row['cohort'])]
+            rooms = ledger.setdefault(row['day'], {}).setdefault(row['slot'], {})
+            if row['room'] in rooms:
+                # Later rows of a room and slot were packed after the first booking
+                rooms[row['room']].setdefault('packed', []).append(record)
+            else:
+                rooms[row['room']] = record
+        return ledger
+
+    def sections(self):
+        """(department, semester, section) of every stored timetable"""
+        return [tuple(row) for row in self.conn.execute(
+            'SELECT DISTINCT department, semester, section FROM sessions ORDER BY department, semester, section')]
+
+    def timetable_grid(self, department, semester, section):
+        """The section's Grid as written to its CSV: days as rows, slots as columns"""
+        rows = self.conn.execute(
+            'SELECT day, slot, cell FROM sessions WHERE department = ? AND semester = ? AND section = ? '
+            'ORDER BY day_index, slot_index', (department, semester, section)).fetchall()
+        grid = {}
+        for day, slot, cell in rows:
+            grid.setdefault(day, {})[slot] = cell
+        return Grid.from_nested(grid)
+
+    def electives(self, department, semester, section):
+        """(electives, rotated_out): {basket: [{'code', 'title', 'classroom'}]} as the scheduler keeps them"""
+        current, rotated_out = {}, {}
+        for row in self.conn.execute(
+                'SELECT basket, course_code, title, classroom, after_midsems FROM electives '
+                'WHERE department = ? AND semester = ? AND section = ? ORDER BY rowid',
+                (department, semester, section)):
+            target = rotated_out if row['after_midsems'] else current
+            target.setdefault(row['basket'], []).append(
+                {'code': row['course_code'], 'title': row['title'], 'classroom': row['classroom']})
+        return current, rotated_out
+
+    def room_bookings(self, room=None, day=None, slot=None):
+        """Ledger rows, optionally for one room and/or (day, slot)"""
+        clauses, params = [], []
+        for column, value in (('room', room), ('day', day), ('slot', slot)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._rows(f'SELECT * FROM room_bookings{where} ORDER BY room, day, slot', params)
+
+    def faculty_bookings(self, faculty):
+        """Ledger rows taught by one person, matched on their canonical name as the faculty views are"""
+        cells = [row[0] for row in self.conn.execute('SELECT DISTINCT faculty FROM room_bookings')]
+        directory = FacultyDirectory(cells)
+        name = directory.canonical(faculty)
+        matching = [cell for cell in cells if name in directory.members(cell)]
+        if not matching:
+            return []
+        placeholders = ', '.join('?' * len(matching))
+        return self._rows(f'SELECT * FROM room_bookings WHERE faculty IN ({placeholders}) ORDER BY day, slot',
+                          matching)
+
+    def section_bookings(self, department, semester, section):
+        return self._rows('SELECT * FROM room_bookings WHERE department = ? AND semester = ? AND section = ? '
+                          'ORDER BY day, slot', (department, semester, section))
+
+    def exams(self):
+        """Exam schedule entries in scheduled order (classrooms as a list, like the scheduler's)"""
+        exams = self._rows('SELECT * FROM exams ORDER BY exam_index')
+        for exam in exams:
+            exam['classrooms'] = exam['classrooms'].split(',') if exam['classrooms'] else []
+        return exams
+
+    def seating_summary(self):
+        return self._rows('SELECT * FROM seating_plans ORDER BY rowid')
+
+    def seats_for(self, roll_number):
+        """Every exam seat of one student"""
+        return self._rows('SELECT * FROM seats WHERE roll_number = ? ORDER BY rowid',
+                          (roll_number,))
+
+    def seats(self):
+        """Every exam seat, in seating order (bulk exports; seats_for() looks up one student)"""
+        return self._rows('SELECT * FROM seats ORDER BY rowid')
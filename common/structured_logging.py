@@ -0,0 +1,160 @@
+"""
+Structured Logging
+==================
+
+Levelled logging for the timetable and exam pipelines, built on the standard
+library `logging` module.
+
+    from structured_logging import get_logger, configure_logging
+
+    log = get_logger('timetable.generator')
+    log.info("Generating Timetable: %s", name, extra={'department': 'CSE'})
+
+configure_logging() is called once by each entry point. It sends
+human-readable messages to the console (stdout, like the old print calls)
+and, optionally, JSON lines to a file. The JSON file handler runs behind a
+queue: the scheduling thread only enqueues records, and a background
+listener formats and writes them in batches, so per-session DEBUG records
+cost little on large runs.
+
+Environment overrides:
+    TIMETABLE_LOG_LEVEL=DEBUG|INFO|WARNING   console level (default INFO)
+    TIMETABLE_QUIET=1                        console shows warnings and errors only
+    TIMETABLE_LOG_FILE=run.jsonl             also write JSON lines (all levels from DEBUG)
+
+Author: Team BeyondGames
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+LOGGER_ROOTS = ('timetable', 'exam')
+LEVEL_ENV = 'TIMETABLE_LOG_LEVEL'
+QUIET_ENV = 'TIMETABLE_QUIET'
+FILE_ENV = 'TIMETABLE_LOG_FILE'
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_installed_handlers = []
+
+
+def get_logger(name):
+    """Logger under one of the pipeline roots, e.g. 'timetable.generator' or 'exam.scheduler'"""
+    return logging.getLogger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class BufferedJsonFileHandler(logging.handlers.MemoryHandler):
+    """Collects records and writes them as JSON lines every `capacity` records (or on error)"""
+
+    def __init__(self, filename, capacity=500):
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        target = logging.FileHandler(filename, mode='w', encoding='utf-8')
+        target.setFormatter(JsonFormatter())
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target)
+
+    def close(self):
+        target = self.target
+        super().close()  # flushes, then drops the target reference
+        if target is not None:
+            target.close()
+
+
+def _resolve_level(level):
+    """Level number for a number or name (INFO when unset); None for an unknown name"""
+    if isinstance(level, int):
+        return level
+    if not level:
+        return logging.INFO
+    resolved = logging.getLevelName(str(level).strip().upper())
+    return resolved if isinstance(resolved, int) else None
+
+
+def configure_logging(level=None, quiet=None, json_file=None, json_level=logging.DEBUG, stream=None):
+    """Set up console + optional async JSON logging for both pipelines (safe to call again)"""
+    global _listener
+    shutdown_logging()
+
+    requested = level or os.environ.get(LEVEL_ENV, 'INFO')
+    level = _resolve_level(requested)
+    unknown_level = level is None
+    if unknown_level:
+        level = logging.INFO
+    if quiet is None:
+        quiet = os.environ.get(QUIET_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+    if quiet:
+        level = max(level, logging.WARNING)
+    json_file = json_file or os.environ.get(FILE_ENV) or None
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    console.setLevel(level)
+    handlers = [console]
+    root_level = level
+
+    if json_file:
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(json_level)
+        file_handler = BufferedJsonFileHandler(json_file)
+        _listener = logging.handlers.QueueListener(log_queue, file_handler)
+        _listener.start()
+        handlers.append(queue_handler)
+        root_level = min(level, json_level)
+
+    for root in LOGGER_ROOTS:
+        logger = logging.getLogger(root)
+        logger.setLevel(root_level)
+        logger.propagate = False
+        for handler in handlers:
+            logger.addHandler(handler)
+    _installed_handlers.extend(handlers)
+    if unknown_level:
+        # A typo in TIMETABLE_LOG_LEVEL should not stop a run
+        get_logger('timetable.logging').warning("Unknown log level %r: using INFO", requested)
+    return level
+
+
+def shutdown_logging():
+    """Flush the JSON queue and remove handlers installed by configure_logging()"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    for root in LOGGER_ROOTS:
+        logger = logging.getLogger(root)
+        for handler in _installed_handlers:
+            logger.removeHandler(handler)
+    _installed_handlers.clear()
+
+
+atexit.register(shutdown_logging)
@@ -3,35 +3,62 @@ Generate Seating Charts Viewer HTML
 This script reads the seating_summary.csv and creates a comprehensive viewer page
 """
 
-import pandas as pd
 import os
+import sys
 from pathlib import Path
 
-def generate_seating_viewer():
-    """Generate HTML page with all seating charts organized by date and session"""
-    
-    # Read the seating summary CSV
-    summary_file = 'outputs/seating_summary.csv'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from csv_codec import read_records
+from schedule_store import ScheduleStore
+
+# seating_plans columns (schedule store) -> seating_summary.csv columns
+STORE_COLUMNS = {
+    'exam_date': 'Exam_Date', 'session': 'Session', 'course_code': 'Course_Code',
+    'classroom': 'Classroom', 'students_assigned': 'Students_Assigned', 'html_file': 'HTML_Chart',
+}
+
+def load_seating_summary(summary_file='outputs/seating_summary.csv'):
+    """Seating summary rows from the schedule store when TIMETABLE_DB is set, else from the CSV (None if neither exists)"""
+    store = ScheduleStore.from_env()
+    if store is not None:
+        with store:
+            rows = store.seating_summary()
+        if rows:
+            return [{STORE_COLUMNS[key]: value for key, value in row.items()} for row in rows]
     
     if not os.path.exists(summary_file):
         print(f"❌ Error: {summary_file} not found!")
         print("Please run main.py first to generate the seating arrangements.")
-        return
-    
-    df = pd.read_csv(summary_file)
+        return None
+    return read_records(summary_file)
+
+def summarize_by_classroom(rows):
+    """One entry per (date, session, classroom), in sorted key order, grouped by (date, session)"""
+    merged = {}
+    for row in rows:
+        key = (row['Exam_Date'], row['Session'], row['Classroom'])
+        entry = merged.setdefault(key, {'courses': set(), 'students': 0, 'chart': row['HTML_Chart']})
+        entry['courses'].add(row['Course_Code'])
+        entry['students'] += row['Students_Assigned']
     
-    # Group by exam date and session
-    # First, we need to aggregate data by date, session, and classroom
-    summary = df.groupby(['Exam_Date', 'Session', 'Classroom']).agg({
-        'Course_Code': lambda x: ' + '.join(sorted(set(x))),
-        'Students_Assigned': 'sum',
-        'HTML_Chart': 'first'
-    }).reset_index()
+    summary = [{'Date': date, 'Session': session, 'Classroom': classroom,
+                'Courses': ' + '.join(sorted(entry['courses'])), 'Total_Students': entry['students'],
+                'Chart_File': entry['chart']}
+               for (date, session, classroom), entry in sorted(merged.items())]
+    grouped = {}
+    for row in summary:
+        grouped.setdefault((row['Date'], row['Session']), []).append(row)
+    return summary, grouped
+
+def generate_seating_viewer():
+    """Generate HTML page with all seating charts organized by date and session"""
     
-    summary.columns = ['Date', 'Session', 'Classroom', 'Courses', 'Total_Students', 'Chart_File']
+    rows = load_seating_summary()
+    if rows is None:
+        return
     
-    # Group by date and session
-    grouped = summary.groupby(['Date', 'Session'])
+    # Aggregate by date, session and classroom, then group by date and session
+    summary, grouped = summarize_by_classroom(rows)
     
     # Start building HTML
     html_content = """<!DOCTYPE html>
@@ -336,7 +363,7 @@ def generate_seating_viewer():
 """
     
     # Generate content for each date and session
-    for (date, session), group in grouped:
+    for (date, session), group in grouped.items():
         session_class = 'forenoon' if session == 'FN' else 'afternoon'
         session_name = 'Forenoon' if session == 'FN' else 'Afternoon'
         
@@ -351,7 +378,7 @@ def generate_seating_viewer():
 """
         
         # Add each classroom card
-        for _, row in group.iterrows():
+        for row in group:
             classroom = row['Classroom']
             courses = row['Courses']
             num_students = row['Total_Students']
@@ -376,9 +403,9 @@ def generate_seating_viewer():
     
     # Calculate statistics
     total_charts = len(summary)
-    total_classrooms = summary['Classroom'].nunique()
+    total_classrooms = len({row['Classroom'] for row in summary})
     total_sessions = len(grouped)
-    total_students = summary['Total_Students'].sum()
+    total_students = sum(row['Total_Students'] for row in summary)
     
     # Replace statistics placeholders
     html_content = html_content.replace('TOTAL_CHARTS_PLACEHOLDER', str(total_charts))
@@ -11,9 +11,11 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent / 'src'))
 
 from exam_scheduler import ExamTimetableGenerator
+from structured_logging import configure_logging
 
 def main():
     """Main function to run the exam timetable system"""
+    configure_logging()
     
     print("🎓 IIIT Dharwad Exam Timetable System")
     print("=" * 50)
@@ -5,16 +5,31 @@ Main system to generate exam schedules and seating arrangements
 
 import csv
 import json
+import os
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
-import pandas as pd
+import sys
+
+# Shared helpers (instrumentation) live in the top-level common/ folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from checkpoints import CheckpointStore, fingerprint
+from csv_codec import read_records
+from input_watch import PARSED_INPUTS
+from instrumentation import TRACER
+from schedule_store import ScheduleStore
+from structured_logging import get_logger, configure_logging
+
 from student_generator import StudentDataGenerator
 from course_generator import CourseDataGenerator
 from seating_arrangement import SeatingArrangement
 
+log = get_logger('exam.scheduler')
+
 class ExamTimetableGenerator:
-    def __init__(self):
+    def __init__(self, input_dir='inputs', output_dir='outputs'):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
         self.seating = SeatingArrangement()
         self.exam_sessions = {
             'FN': {'start': '10:00', 'end': '13:00', 'name': 'Forenoon Session'},
@@ -26,44 +41,59 @@ class ExamTimetableGenerator:
         self.max_exam_days = 9  # 1 week + 2 extra days max
         self.exclude_sundays = True
         
+    def input_fingerprint(self):
+        """Fingerprint of the input CSVs and exam-period settings (keys checkpoints)"""
+        paths = [os.path.join(self.input_dir, name) for name in ('students.csv', 'courses.csv', 'classroom.csv')]
+        settings = (self.output_dir, sorted(self.exam_sessions.items()), self.exam_start_date.isoformat(),
+                    self.max_exam_days, self.exclude_sundays)
+        return fingerprint(paths, extra=settings)
+    
     def load_data(self):
         """Load all required data"""
         try:
+            # Files unchanged since the last load in this process are not parsed again (watch mode)
             # Load students
-            students_df = pd.read_csv('inputs/students.csv')
-            self.students = students_df.to_dict('records')
+            self.students = PARSED_INPUTS.get(os.path.join(self.input_dir, 'students.csv'), read_records)
             
             # Load courses
-            courses_df = pd.read_csv('inputs/courses.csv')
-            self.courses = courses_df.to_dict('records')
+            self.courses = PARSED_INPUTS.get(os.path.join(self.input_dir, 'courses.csv'), read_records)
             
             # Load classrooms
-            classrooms_df = pd.read_csv('inputs/classroom.csv')
-            self.classrooms = classrooms_df.to_dict('records')
+            self.classrooms = PARSED_INPUTS.get(os.path.join(self.input_dir, 'classroom.csv'), read_records)
+            self._register_classroom_layouts()
             
-            print("✅ Data loaded successfully!")
-            print(f"   📊 Students: {len(self.students)}")
-            print(f"   📚 Courses: {len(self.courses)}")
-            print(f"   🏛️ Classrooms: {len(self.classrooms)}")
+            log.info("✅ Data loaded successfully!")
+            log.info("   📊 Students: %s", len(self.students))
+            log.info("   📚 Courses: %s", len(self.courses))
+            log.info("   🏛️ Classrooms: %s", len(self.classrooms))
             
         except FileNotFoundError as e:
-            print(f"❌ Error loading data: {e}")
-            print("🔧 Generating sample data...")
+            log.warning("❌ Error loading data: %s", e)
+            log.info("🔧 Generating sample data...")
             self.generate_sample_data()
     
     def generate_sample_data(self):
         """Generate sample data if files don't exist"""
         # Generate students
         student_gen = StudentDataGenerator()
-        self.students = student_gen.save_student_data()
+        self.students = student_gen.save_student_data(os.path.join(self.input_dir, 'students.csv'))
         
         # Generate courses  
         course_gen = CourseDataGenerator()
-        self.courses = course_gen.save_course_data()
+        self.courses = course_gen.save_course_data(os.path.join(self.input_dir, 'courses.csv'))
         
         # Load classrooms (should exist)
-        classrooms_df = pd.read_csv('inputs/classroom.csv')
-        self.classrooms = classrooms_df.to_dict('records')
+        self.classrooms = read_records(os.path.join(self.input_dir, 'classroom.csv'))
+        self._register_classroom_layouts()
+    
+    def _register_classroom_layouts(self):
+        """Give every classroom from classroom.csv a seating layout (derived from capacity if unknown)"""
+        for classroom in self.classrooms:
+            try:
+                capacity = int(float(classroom['Seating Capacity']))
+            except (ValueError, TypeError):
+                continue
+            self.seating.register_classroom(classroom['ID'], capacity)
     
     def group_courses_by_semester(self):
         """Group courses by department and semester for scheduling"""
@@ -101,7 +131,7 @@ class ExamTimetableGenerator:
                         'capacity': capacity
                     })
                 except (ValueError, TypeError):
-                    print(f"⚠️ Warning: Invalid capacity for {classroom['ID']}, skipping")
+                    log.warning("⚠️ Warning: Invalid capacity for %s, skipping", classroom['ID'])
         
         available_classrooms.sort(key=lambda x: x['capacity'], reverse=True)
         
@@ -140,18 +170,21 @@ class ExamTimetableGenerator:
         available_slots = self._calculate_available_slots()
         total_exams = len(all_individual_exams)
         
-        print(f"📊 Scheduling {total_exams} individual exams in {len(available_slots)} available slots")
+        log.info("📊 Scheduling %s individual exams in %s available slots", total_exams, len(available_slots))
+        TRACER.count('exam.individual_exams', total_exams)
         
         if total_exams > len(available_slots):
-            print(f"⚠️ Warning: {total_exams} exams need {len(available_slots)} slots - some exams will share slots")
+            log.warning("⚠️ Warning: %s exams need %s slots - some exams will share slots",
+                        total_exams, len(available_slots))
             # Allow multiple exams per slot by mixing different departments/semesters
+            TRACER.count('exam.mixed_schedule_fallbacks')
             schedule = self._create_mixed_schedule(all_individual_exams, available_slots)
         else:
             # Simple 1:1 mapping when slots are sufficient
             schedule = []
             for i, exam in enumerate(all_individual_exams):
                 if i >= len(available_slots):
-                    print(f"❌ Cannot schedule {exam['course_code']} - exceeded time limit")
+                    log.error("❌ Cannot schedule %s - exceeded time limit", exam['course_code'])
                     break
                     
                 slot = available_slots[i]
@@ -177,7 +210,8 @@ class ExamTimetableGenerator:
         
         # Count total scheduled exams
         total_scheduled = sum(len(exam.get('individual_courses', [exam])) for exam in schedule)
-        print(f"✅ Scheduled {len(schedule)} exam sessions covering {total_scheduled}/{total_exams} courses within {self.max_exam_days} days")
+        log.info("✅ Scheduled %s exam sessions covering %s/%s courses within %s days",
+                 len(schedule), total_scheduled, total_exams, self.max_exam_days)
         return schedule
     
     def _create_mixed_schedule(self, all_exams, available_slots):
@@ -185,7 +219,7 @@ class ExamTimetableGenerator:
         schedule = []
         remaining_exams = all_exams.copy()
         
-        print(f"📊 Distributing {len(all_exams)} exams across {len(available_slots)} slots...")
+        log.info("📊 Distributing %s exams across %s slots...", len(all_exams), len(available_slots))
         
         for slot_index, slot in enumerate(available_slots):
             if not remaining_exams:
@@ -271,21 +305,21 @@ class ExamTimetableGenerator:
                 }
                 
                 schedule.append(exam_entry)
-                print(f"   Slot {slot_index + 1}: {len(session_exams)} exams ({', '.join(course_codes)})")
+                log.debug("   Slot %d: %d exams (%s)", slot_index + 1, len(session_exams), ', '.join(course_codes))
         
         # Handle any remaining exams by adding them to the last few slots
         if remaining_exams:
-            print(f"⚠️  {len(remaining_exams)} exams still need scheduling...")
+            log.warning("⚠️  %s exams still need scheduling...", len(remaining_exams))
             for i, remaining_exam in enumerate(remaining_exams):
                 if i < len(schedule):
                     # Add to existing sessions
                     schedule[-(i+1)]['course_code'] += f" + {remaining_exam['course_code']}"
                     schedule[-(i+1)]['individual_courses'].append({'course_code': remaining_exam['course_code']})
-                    print(f"   Added {remaining_exam['course_code']} to existing session")
+                    log.debug("   Added %s to existing session", remaining_exam['course_code'])
                 else:
-                    print(f"   ❌ Could not schedule {remaining_exam['course_code']}")
+                    log.error("   ❌ Could not schedule %s", remaining_exam['course_code'])
         
-        print(f"✅ Final distribution: {sum(len(s.get('individual_courses', [])) for s in schedule)} exams scheduled")
+        log.info("✅ Final distribution: %s exams scheduled", sum(len(s.get('individual_courses', [])) for s in schedule))
         return schedule
     
     def _calculate_available_slots(self):
@@ -322,68 +356,101 @@ class ExamTimetableGenerator:
         
         return slots
     
-    def generate_seating_arrangements(self, schedule):
-        """Generate seating arrangements for all exams"""
+    def generate_seating_arrangements(self, schedule, checkpoints=None):
+        """Generate seating arrangements for all exams (each exam checkpointed when `checkpoints` is enabled)"""
         seating_plans = []
         
-        for exam in schedule:
-            for classroom_id in exam['classrooms']:
-                # Get classroom capacity
-                classroom_capacity = next(
-                    (int(c['Seating Capacity']) for c in self.classrooms 
-                     if c['ID'] == classroom_id and c['Seating Capacity']), 
-                    96  # Default capacity
-                )
-                
-                # Determine students for this classroom
-                students_per_room = len(exam['students']) // len(exam['classrooms'])
-                start_idx = exam['classrooms'].index(classroom_id) * students_per_room
-                end_idx = start_idx + min(students_per_room, classroom_capacity)
-                
-                if classroom_id == exam['classrooms'][-1]:  # Last classroom gets remaining
-                    end_idx = len(exam['students'])
-                
-                room_students = exam['students'][start_idx:end_idx]
-                
-                if room_students:  # Only create seating if there are students
-                    # Create seating matrix
+        for index, exam in enumerate(schedule):
+            name = f"seating-{index:04d}"
+            if checkpoints is not None and checkpoints.has(name):
+                # Resume: this exam was seated (and its charts written) by an earlier run
+                plans = checkpoints.load(name)
+            else:
+                plans = self._seat_exam(exam)
+                if checkpoints is not None:
+                    checkpoints.save(name, plans)
+            seating_plans.extend(plans)
+        
+        return seating_plans
+    
+    @staticmethod
+    def select_exams(schedule, departments=None, semesters=None, dates=None, sessions=None):
+        """Exams matching every selector given (a mixed session matches any of its departments/semesters)"""
+        def matches(value, wanted):
+            return not wanted or any(part in wanted for part in str(value).split('/'))
+        return [exam for exam in schedule
+                if matches(exam['department'], departments) and matches(exam['semester'], semesters)
+                and (not dates or exam['date'] in dates) and (not sessions or exam['session'] in sessions)]
+    
+    def _seat_exam(self, exam, rooms=None):
+        """Seating plans (and HTML charts) for one exam's classrooms (only `rooms`, if given)"""
+        seating_plans = []
+        
+        for classroom_id in exam['classrooms']:
+            if rooms and classroom_id not in rooms:
+                continue  # Students are still split over all the exam's classrooms
+            # Get classroom capacity
+            classroom_capacity = next(
+                (int(c['Seating Capacity']) for c in self.classrooms 
+                 if c['ID'] == classroom_id and c['Seating Capacity']), 
+                96  # Default capacity
+            )
+            
+            # Determine students for this classroom
+            students_per_room = len(exam['students']) // len(exam['classrooms'])
+            start_idx = exam['classrooms'].index(classroom_id) * students_per_room
+            end_idx = start_idx + min(students_per_room, classroom_capacity)
+            
+            if classroom_id == exam['classrooms'][-1]:  # Last classroom gets remaining
+                end_idx = len(exam['students'])
+            
+            room_students = exam['students'][start_idx:end_idx]
+            
+            if room_students:  # Only create seating if there are students
+                # Create seating matrix
+                with TRACER.span('exam.seating.matrix', classroom=classroom_id):
                     seating_matrix, assigned_students = self.seating.create_seating_matrix(
                         classroom_id, room_students
                     )
-                    
-                    # Prepare exam info for seating chart
-                    courses_list = exam.get('individual_courses', [{'course_code': exam['course_code']}])
-                    course_codes = [c['course_code'] for c in courses_list]
-                    
-                    exam_info = {
-                        'date': exam['date'],
-                        'time_slot': f"{exam['session']} ({exam['time']})",
-                        'courses': course_codes,
-                        'student_count': len(assigned_students)
-                    }
-                    
-                    # Generate HTML seating chart
-                    output_file = f"outputs/seating_charts/{exam['date'].replace('/', '_')}_{exam['session']}_{classroom_id}_{exam['course_code']}.html"
+                TRACER.count('exam.seats_assigned', len(assigned_students))
+                TRACER.count('exam.students_unseated', len(room_students) - len(assigned_students))
+                
+                # Prepare exam info for seating chart
+                courses_list = exam.get('individual_courses', [{'course_code': exam['course_code']}])
+                course_codes = [c['course_code'] for c in courses_list]
+                
+                exam_info = {
+                    'date': exam['date'],
+                    'time_slot': f"{exam['session']} ({exam['time']})",
+                    'courses': course_codes,
+                    'student_count': len(assigned_students)
+                }
+                
+                # Generate HTML seating chart
+                output_file = f"{self.output_dir}/seating_charts/{exam['date'].replace('/', '_')}_{exam['session']}_{classroom_id}_{exam['course_code']}.html"
+                with TRACER.span('exam.seating.html', classroom=classroom_id):
                     self.seating.generate_seating_chart_html(
                         classroom_id, seating_matrix, exam_info, output_file
                     )
-                    
-                    seating_plan = {
-                        'exam_date': exam['date'],
-                        'session': exam['session'],
-                        'course_code': exam['course_code'],
-                        'classroom': classroom_id,
-                        'seating_matrix': seating_matrix,
-                        'assigned_students': assigned_students,
-                        'html_file': output_file
-                    }
-                    
-                    seating_plans.append(seating_plan)
+                TRACER.count('exam.seating_charts')
+                
+                seating_plan = {
+                    'exam_date': exam['date'],
+                    'session': exam['session'],
+                    'course_code': exam['course_code'],
+                    'classroom': classroom_id,
+                    'seating_matrix': seating_matrix,
+                    'assigned_students': assigned_students,
+                    'html_file': output_file
+                }
+                
+                seating_plans.append(seating_plan)
         
         return seating_plans
     
-    def save_exam_schedule(self, schedule, output_file='outputs/exam_schedule.csv'):
+    def save_exam_schedule(self, schedule, output_file=None):
         """Save exam schedule to CSV"""
+        output_file = output_file or os.path.join(self.output_dir, 'exam_schedule.csv')
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
         
         # Flatten schedule for CSV
@@ -408,10 +475,11 @@ class ExamTimetableGenerator:
             writer.writeheader()
             writer.writerows(csv_schedule)
         
-        print(f"✅ Exam schedule saved: {output_file}")
+        log.info("✅ Exam schedule saved: %s", output_file)
     
-    def save_seating_summary(self, seating_plans, output_file='outputs/seating_summary.csv'):
+    def save_seating_summary(self, seating_plans, output_file=None):
         """Save seating arrangement summary"""
+        output_file = output_file or os.path.join(self.output_dir, 'seating_summary.csv')
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
         
         summary = []
@@ -432,10 +500,11 @@ class ExamTimetableGenerator:
             writer.writeheader()
             writer.writerows(summary)
         
-        print(f"✅ Seating summary saved: {output_file}")
+        log.info("✅ Seating summary saved: %s", output_file)
     
-    def generate_exam_timetable_html(self, schedule, output_file='outputs/exam_timetable.html'):
+    def generate_exam_timetable_html(self, schedule, output_file=None):
         """Generate comprehensive HTML exam timetable"""
+        output_file = output_file or os.path.join(self.output_dir, 'exam_timetable.html')
         html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
@@ -732,41 +801,149 @@ class ExamTimetableGenerator:
         with open(output_file, 'w', encoding='utf-8') as file:
             file.write(html_content)
         
-        print(f"✅ HTML exam timetable saved: {output_file}")
+        log.info("✅ HTML exam timetable saved: %s", output_file)
     
-    def run_complete_generation(self):
-        """Run the complete exam timetable generation process"""
-        print("🚀 Starting Exam Timetable Generation...")
-        print("=" * 60)
+    def run_complete_generation(self, selection=None):
+        """
+        Run the complete exam timetable generation process.
+        
+        selection: optional selectors for a partial run ({'departments', 'semesters', 'dates',
+        'sessions', 'rooms'}, each a collection). The whole schedule is still built (it is
+        cheap and decides every exam's slot and rooms), but only the selected exams and
+        classrooms are seated and their charts rewritten; the summary CSV, the viewer's
+        inputs and the schedule store keep the last full run.
+        """
+        if selection:
+            return self._run_partial(selection)
+        
+        log.info("🚀 Starting Exam Timetable Generation...")
+        log.info("=" * 60)
+        
+        # With TIMETABLE_CHECKPOINTS set, a rerun on unchanged inputs resumes after the last finished stage
+        checkpoints = CheckpointStore.from_env('exam', self.input_fingerprint())
         
         # Step 1: Load data
-        print("\n📊 Step 1: Loading Data...")
-        self.load_data()
+        log.info("\n📊 Step 1: Loading Data...")
+        with TRACER.span('exam.load'):
+            def load():
+                self.load_data()
+                return self.students, self.courses, self.classrooms
+            self.students, self.courses, self.classrooms = checkpoints.stage('load', load)
+            # Layouts live in self.seating, not in the checkpoint (registering twice is harmless)
+            self._register_classroom_layouts()
         
         # Step 2: Create exam schedule
-        print("\n📅 Step 2: Creating Exam Schedule...")
-        schedule = self.create_exam_schedule()
-        print(f"✅ Generated {len(schedule)} exam sessions")
+        log.info("\n📅 Step 2: Creating Exam Schedule...")
+        with TRACER.span('exam.schedule'):
+            schedule = checkpoints.stage('schedule', self.create_exam_schedule)
+        log.info("✅ Generated %s exam sessions", len(schedule))
         
         # Step 3: Generate seating arrangements
-        print("\n🪑 Step 3: Generating Seating Arrangements...")
-        seating_plans = self.generate_seating_arrangements(schedule)
-        print(f"✅ Generated {len(seating_plans)} seating charts")
+        log.info("\n🪑 Step 3: Generating Seating Arrangements...")
+        with TRACER.span('exam.seating'):
+            seating_plans = self.generate_seating_arrangements(schedule, checkpoints)
+        log.info("✅ Generated %s seating charts", len(seating_plans))
         
         # Step 4: Save outputs
-        print("\n💾 Step 4: Saving Outputs...")
-        self.save_exam_schedule(schedule)
-        self.save_seating_summary(seating_plans)
-        self.generate_exam_timetable_html(schedule)
+        log.info("\n💾 Step 4: Saving Outputs...")
+        self.save_outputs(schedule, seating_plans)
         
-        print("\n🎉 Exam Timetable Generation Complete!")
-        print("=" * 60)
-        print(f"📁 Outputs saved in: outputs/")
-        print(f"🌐 Main timetable: outputs/exam_timetable.html")
-        print(f"🪑 Seating charts: outputs/seating_charts/")
+        log.info("\n🎉 Exam Timetable Generation Complete!")
+        log.info("=" * 60)
+        log.info("📁 Outputs saved in: %s/", self.output_dir)
+        log.info("🌐 Main timetable: %s/exam_timetable.html", self.output_dir)
+        log.info("🪑 Seating charts: %s/seating_charts/", self.output_dir)
+        TRACER.finish()
         
         return schedule, seating_plans
+    
+    def save_outputs(self, schedule, seating_plans):
+        """Schedule and summary CSVs, the schedule store (with TIMETABLE_DB set) and the timetable HTML"""
+        with TRACER.span('exam.export_csv'):
+            self.save_exam_schedule(schedule)
+            self.save_seating_summary(seating_plans)
+        # With TIMETABLE_DB set, exams and seats go to the SQLite schedule store and the HTML is read back from it
+        store = ScheduleStore.from_env()
+        if store is not None:
+            with TRACER.span('exam.export_store'):
+                store.write_exams(schedule, seating_plans)
+        with TRACER.span('exam.export_html'):
+            self.generate_exam_timetable_html(store.exams() if store is not None else schedule)
+        if store is not None:
+            store.close()
+    
+    def _seating_key(self, exam):
+        """Everything an exam's seating depends on: slot, classrooms and their capacities, roll list"""
+        capacities = {c['ID']: c['Seating Capacity'] for c in self.classrooms}
+        return (exam['course_code'], exam['date'], exam['session'],
+                tuple((room, capacities.get(room)) for room in exam['classrooms']),
+                tuple(tuple(sorted(student.items())) for student in exam['students']))
+    
+    def run_incremental(self, previous_schedule, previous_plans):
+        """
+        Regenerate after an input edit, re-seating only the exams whose seating inputs changed.
+        
+        previous_schedule, previous_plans: the result of the last run in this process.
+        Inputs are reloaded (only edited files are parsed again) and the schedule is
+        rebuilt; an exam whose slot, classrooms and students are unchanged keeps its
+        seating plans and charts (seating is deterministic, so the outputs match a full
+        run). Charts no longer produced are removed. Returns (schedule, seating_plans).
+        """
+        with TRACER.span('exam.load'):
+            self.load_data()
+        with TRACER.span('exam.schedule'):
+            schedule = self.create_exam_schedule()
+        
+        kept = {}
+        for exam in previous_schedule:
+            kept[self._seating_key(exam)] = [plan for plan in previous_plans
+                                             if (plan['exam_date'], plan['session'], plan['course_code'])
+                                             == (exam['date'], exam['session'], exam['course_code'])]
+        seating_plans = []
+        reseated = 0
+        with TRACER.span('exam.seating'):
+            for exam in schedule:
+                plans = kept.get(self._seating_key(exam))
+                if plans is None:
+                    plans = self._seat_exam(exam)
+                    reseated += 1
+                seating_plans.extend(plans)
+        
+        charts = {plan['html_file'] for plan in seating_plans}
+        for plan in previous_plans:
+            if plan['html_file'] not in charts and os.path.exists(plan['html_file']):
+                os.remove(plan['html_file'])
+        log.info("🔁 Re-seated %s of %s exam sessions", reseated, len(schedule))
+        
+        self.save_outputs(schedule, seating_plans)
+        TRACER.finish()
+        return schedule, seating_plans
+    
+    def _run_partial(self, selection):
+        """Seat only the selected exams and classrooms (see run_complete_generation)"""
+        selectors = {key: set(value) for key, value in selection.items() if value}
+        rooms = selectors.pop('rooms', None)
+        checkpoints = CheckpointStore.from_env('exam', self.input_fingerprint())
+        
+        with TRACER.span('exam.load'):
+            def load():
+                self.load_data()
+                return self.students, self.courses, self.classrooms
+            self.students, self.courses, self.classrooms = checkpoints.stage('load', load)
+            self._register_classroom_layouts()
+        with TRACER.span('exam.schedule'):
+            schedule = checkpoints.stage('schedule', self.create_exam_schedule)
+        
+        exams = self.select_exams(schedule, **selectors)
+        log.info("🎯 Partial run: %s of %s exam sessions selected", len(exams), len(schedule))
+        with TRACER.span('exam.seating', exams=len(exams)):
+            seating_plans = [plan for exam in exams for plan in self._seat_exam(exam, rooms)]
+        log.info("✅ Regenerated %s seating charts in %s/seating_charts/", len(seating_plans), self.output_dir)
+        TRACER.finish()
+        
+        return exams, seating_plans
 
 if __name__ == "__main__":
+    configure_logging()
     generator = ExamTimetableGenerator()
     schedule, seating_plans = generator.run_complete_generation()
\ No newline at end of file
@@ -5,10 +5,15 @@ Generates optimal seating plans ensuring no same-course students sit together
 
 import csv
 import json
+import os
 import random
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-import pandas as pd
+
+# Shared helpers (CSV codec) live in the top-level common/ folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from csv_codec import read_records
 
 # Set random seed for reproducible results
 random.seed(42)
@@ -51,15 +56,24 @@ class SeatingArrangement:
             'C407': {'capacity': 78, 'rows': 10, 'cols': 8, 'layout': 'standard'}
         }
     
+    def register_classroom(self, classroom_id, capacity, cols=8):
+        """Add a standard layout for a classroom not listed above (rows derived from capacity)"""
+        if classroom_id not in self.classroom_layouts:
+            self.classroom_layouts[classroom_id] = {
+                'capacity': capacity,
+                'rows': -(-capacity // cols),  # ceiling division
+                'cols': cols,
+                'layout': 'standard'
+            }
+        return self.classroom_layouts[classroom_id]
+    
     def load_students(self, file_path='inputs/students.csv'):
         """Load student data"""
-        df = pd.read_csv(file_path)
-        return df.to_dict('records')
+        return read_records(file_path)
     
     def load_courses(self, file_path='inputs/courses.csv'):
         """Load course data"""
-        df = pd.read_csv(file_path)
-        return df.to_dict('records')
+        return read_records(file_path)
     
     def create_seating_matrix(self, classroom_id, students_list):
         """Create seating matrix with each column filled by one course, adjacent columns different courses, repeat pattern"""
@@ -11,9 +11,14 @@ Date: October 14, 2025
 import unittest
 import sys
 import os
+import tempfile
+import contextlib
+import io
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'exam_timetable'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'exam_timetable', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
 
 
 class TestStudentGeneration(unittest.TestCase):
@@ -244,6 +249,216 @@ class TestIntegration(unittest.TestCase):
         print("✓ Test 4.2.2 passed: Zero conflicts verified")
 
 
+class TestSyntheticExamInputs(unittest.TestCase):
+    """Test cases for running the exam pipeline on generated (benchmark) inputs"""
+    
+    def test_unknown_classroom_gets_layout(self):
+        """Test Case 4.3.1: Rooms missing from the built-in layouts get one from capacity"""
+        from seating_arrangement import SeatingArrangement
+        
+        seating = SeatingArrangement()
+        layout = seating.register_classroom('Z901', 100)
+        
+        self.assertEqual(layout['cols'], 8)
+        self.assertEqual(layout['rows'], 13, "100 seats need 13 rows of 8")
+        self.assertEqual(seating.register_classroom('C101', 10)['capacity'], 96,
+                         "Known layouts should not be overwritten")
+        
+        print("✓ Test 4.3.1 passed: Capacity-derived layout created")
+    
+    def test_generation_with_custom_directories(self):
+        """Test Case 4.3.2: Schedule and seat synthetic students from a custom input folder"""
+        from exam_scheduler import ExamTimetableGenerator
+        from scenario_generator import ScenarioGenerator
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            input_dir = os.path.join(work_dir, 'inputs')
+            output_dir = os.path.join(work_dir, 'outputs')
+            scenario = ScenarioGenerator(departments=4, semesters=(2, 4), students_per_section=20,
+                                         courses_per_semester=2, rooms=5)
+            counts = scenario.write_exam_inputs(input_dir)
+            
+            generator = ExamTimetableGenerator(input_dir=input_dir, output_dir=output_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.load_data()
+                schedule = generator.create_exam_schedule()
+                plans = generator.generate_seating_arrangements(schedule)
+                generator.save_exam_schedule(schedule)
+            
+            self.assertEqual(len(generator.students), counts['students'])
+            seated = sum(len(plan['assigned_students']) for plan in plans)
+            self.assertGreater(seated, 0, "Students should be seated")
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'exam_schedule.csv')))
+        
+        print("✓ Test 4.3.2 passed: Exam pipeline runs on synthetic inputs")
+    
+    def test_scenario_is_seeded_and_consistent(self):
+        """Test Case 4.3.3: Same seed gives identical files; enrolments match timetable electives"""
+        import csv
+        from scenario_generator import ScenarioGenerator
+        
+        params = dict(departments=5, semesters=(2, 4), sections=('A', 'B', 'C'),
+                      students=300, rooms=12, shared_courses_per_semester=1, seed=7)
+        with tempfile.TemporaryDirectory() as work_dir:
+            first = ScenarioGenerator(**params).write_all(os.path.join(work_dir, 'one'))
+            ScenarioGenerator(**params).write_all(os.path.join(work_dir, 'two'))
+            
+            for name in ['exam_inputs/students.csv', 'timetable_inputs/Even D04.csv']:
+                with open(os.path.join(work_dir, 'one', name), encoding='utf-8') as f1, \
+                     open(os.path.join(work_dir, 'two', name), encoding='utf-8') as f2:
+                    self.assertEqual(f1.read(), f2.read(), f"{name} should be reproducible")
+            
+            self.assertGreaterEqual(first['counts']['students'], 300)
+            
+            with open(os.path.join(work_dir, 'one', 'timetable_inputs', 'Even CSE.csv'), encoding='utf-8') as f:
+                offered = {row['Course Code'] for row in csv.DictReader(f) if row['Electives'] == 'T'}
+            with open(os.path.join(work_dir, 'one', 'exam_inputs', 'students.csv'), encoding='utf-8') as f:
+                for student in csv.DictReader(f):
+                    if student['department'] == 'CSE':
+                        self.assertTrue(set(student['electives'].split(';')) <= offered)
+        
+        print("✓ Test 4.3.3 passed: Scenario is reproducible and consistent")
+
+
+class TestCheckpointResume(unittest.TestCase):
+    """Test cases for resuming exam generation from checkpoints"""
+    
+    def test_seating_resumes_from_checkpoints(self):
+        """Test Case 4.4.1: Seated exams are reloaded, not seated again"""
+        from checkpoints import CheckpointStore
+        from exam_scheduler import ExamTimetableGenerator
+        from scenario_generator import ScenarioGenerator
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            input_dir = os.path.join(work_dir, 'inputs')
+            ScenarioGenerator(departments=2, semesters=(2,), students_per_section=20,
+                              courses_per_semester=2, rooms=3).write_exam_inputs(input_dir)
+            generator = ExamTimetableGenerator(input_dir=input_dir, output_dir=os.path.join(work_dir, 'outputs'))
+            store = CheckpointStore(os.path.join(work_dir, 'ckpt'), 'exam', generator.input_fingerprint())
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.load_data()
+                schedule = store.stage('schedule', generator.create_exam_schedule)
+                plans = generator.generate_seating_arrangements(schedule, store)
+            
+            # A rerun on the same inputs loads the schedule and every exam's plans
+            rerun = ExamTimetableGenerator(input_dir=input_dir, output_dir=os.path.join(work_dir, 'outputs'))
+            rerun._seat_exam = lambda exam: self.fail("exam seated again")
+            store = CheckpointStore(os.path.join(work_dir, 'ckpt'), 'exam', rerun.input_fingerprint())
+            resumed = rerun.generate_seating_arrangements(store.stage('schedule', self.fail), store)
+            
+            self.assertGreater(len(plans), 0)
+            self.assertEqual([p['assigned_students'] for p in resumed], [p['assigned_students'] for p in plans])
+        
+        print("✓ Test 4.4.1 passed: Seating resumed from checkpoints")
+
+
+class TestScheduleStore(unittest.TestCase):
+    """Test cases for exams and seats in the SQLite schedule store"""
+    
+    def test_seats_queryable_by_roll_number(self):
+        """Test Case 4.5.1: Stored exams match the schedule and every seat is found by roll number"""
+        from schedule_store import ScheduleStore
+        from exam_scheduler import ExamTimetableGenerator
+        from scenario_generator import ScenarioGenerator
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            input_dir = os.path.join(work_dir, 'inputs')
+            ScenarioGenerator(departments=2, semesters=(2,), students_per_section=20,
+                              courses_per_semester=2, rooms=3).write_exam_inputs(input_dir)
+            generator = ExamTimetableGenerator(input_dir=input_dir, output_dir=os.path.join(work_dir, 'outputs'))
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.load_data()
+                schedule = generator.create_exam_schedule()
+                plans = generator.generate_seating_arrangements(schedule)
+            
+            with ScheduleStore(os.path.join(work_dir, 'schedule.db')) as store:
+                store.write_exams(schedule, plans)
+                exams = store.exams()
+                self.assertEqual([(e['date'], e['session'], e['course_code'], e['classrooms']) for e in exams],
+                                 [(e['date'], e['session'], e['course_code'], e['classrooms']) for e in schedule])
+                self.assertEqual(len(store.seating_summary()), len(plans))
+                
+                student = plans[0]['assigned_students'][0]
+                seats = store.seats_for(student['roll_number'])
+                expected = sum(1 for p in plans for s in p['assigned_students'] if s['roll_number'] == student['roll_number'])
+                self.assertEqual(len(seats), expected)
+                self.assertEqual(seats[0]['classroom'], plans[0]['classroom'])
+        
+        print("✓ Test 4.5.1 passed: Exams and seats stored")
+
+
+class TestPartialExamRun(unittest.TestCase):
+    """Test cases for seating a slice of the exam schedule"""
+    
+    def test_selected_exams_and_rooms_only(self):
+        """Test Case 4.6.1: Selectors pick exams by date/session/department; --room seats the same students"""
+        from exam_scheduler import ExamTimetableGenerator
+        from scenario_generator import ScenarioGenerator
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            input_dir = os.path.join(work_dir, 'inputs')
+            ScenarioGenerator(departments=2, semesters=(2,), students_per_section=40,
+                              courses_per_semester=2, rooms=3).write_exam_inputs(input_dir)
+            generator = ExamTimetableGenerator(input_dir=input_dir, output_dir=os.path.join(work_dir, 'outputs'))
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.load_data()
+                schedule = generator.create_exam_schedule()
+                first = schedule[0]
+                selected = generator.select_exams(schedule, dates={first['date']}, sessions={first['session']})
+                self.assertEqual(selected, [e for e in schedule if (e['date'], e['session']) == (first['date'], first['session'])])
+                department = first['department'].split('/')[0]
+                self.assertTrue(all(department in e['department'].split('/')
+                                    for e in generator.select_exams(schedule, departments={department})))
+                
+                # Seating one classroom gives it the students a full seating gives it
+                room = first['classrooms'][-1]
+                full = generator._seat_exam(first)
+                only = generator._seat_exam(first, rooms={room})
+            self.assertEqual([p['classroom'] for p in only], [room])
+            self.assertEqual(only[0]['assigned_students'],
+                             next(p for p in full if p['classroom'] == room)['assigned_students'])
+        
+        print("✓ Test 4.6.1 passed: Partial exam run seats only the selection")
+
+
+class TestIncrementalExamRun(unittest.TestCase):
+    """Test cases for watch-mode reruns of the exam pipeline"""
+    
+    def test_rerun_matches_full_run(self):
+        """Test Case 4.7.1: After a roll list edit, only changed exams are re-seated and outputs match a full run"""
+        from exam_scheduler import ExamTimetableGenerator
+        from scenario_generator import ScenarioGenerator
+        
+        with tempfile.TemporaryDirectory() as work_dir:
+            input_dir = os.path.join(work_dir, 'inputs')
+            ScenarioGenerator(departments=2, semesters=(2, 4), students_per_section=30,
+                              courses_per_semester=2, rooms=3).write_exam_inputs(input_dir)
+            generator = ExamTimetableGenerator(input_dir=input_dir, output_dir=os.path.join(work_dir, 'watch'))
+            with contextlib.redirect_stdout(io.StringIO()):
+                previous = generator.run_complete_generation()
+                
+                # Drop the last student on the roll list: only that student's exams change
+                students_file = os.path.join(input_dir, 'students.csv')
+                with open(students_file, encoding='utf-8') as f:
+                    lines = f.readlines()
+                with open(students_file, 'w', encoding='utf-8') as f:
+                    f.writelines(lines[:-1])
+                reseated = []
+                seat_exam = generator._seat_exam
+                generator._seat_exam = lambda exam, rooms=None: reseated.append(exam) or seat_exam(exam, rooms)
+                schedule, seating_plans = generator.run_incremental(*previous)
+                
+                fresh = ExamTimetableGenerator(input_dir=input_dir, output_dir=os.path.join(work_dir, 'watch'))
+                expected_schedule, expected_plans = fresh.run_complete_generation()
+            
+            self.assertTrue(0 < len(reseated) < len(schedule))
+            self.assertEqual(schedule, expected_schedule)
+            self.assertEqual([(p['html_file'], p['assigned_students']) for p in seating_plans],
+                             [(p['html_file'], p['assigned_students']) for p in expected_plans])
+        
+        print("✓ Test 4.7.1 passed: Incremental rerun matches a full run")
+
+
 if __name__ == '__main__':
     # Create test suite
     loader = unittest.TestLoader()
@@ -255,6 +470,11 @@ if __name__ == '__main__':
     suite.addTests(loader.loadTestsFromTestCase(TestSeatingArrangement))
     suite.addTests(loader.loadTestsFromTestCase(TestSeatingChartGeneration))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
+    suite.addTests(loader.loadTestsFromTestCase(TestSyntheticExamInputs))
+    suite.addTests(loader.loadTestsFromTestCase(TestCheckpointResume))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduleStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestPartialExamRun))
+    suite.addTests(loader.loadTestsFromTestCase(TestIncrementalExamRun))
     
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
@@ -12,16 +12,46 @@ import unittest
 import pandas as pd
 import os
 import sys
+import json
+import logging
+import tempfile
+import threading
+import contextlib
 from io import StringIO
 
 # Add parent directory to path to import main module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'timetable_generator'))
 
 try:
-    from main import TimetableGenerator
+    from main import TimetableGenerator, changed_groups, select_groups
 except ImportError:
     print("Warning: Could not import TimetableGenerator. Some tests may fail.")
 
+from ledger_views import LedgerViewIndex
+from faculty_names import split_faculty
+from room_analytics import RoomUtilizationReport
+from instrumentation import Tracer
+from structured_logging import configure_logging, shutdown_logging, get_logger
+from scheduling_core import SchedulerConfig, ScheduleState, SchedulingCore, GenerationContext, run_what_if, write_electives_file
+import main_functional
+import what_if
+from optimizer import TimetableOptimizer
+from time_model import TimeModel, Slot, parse_hhmm
+from timetable_to_html import TimetableHTMLConverter
+from course_offerings import CourseOfferingIndex
+from elective_planner import ElectivePlanner
+from room_assignment import RoomCatalog, RoomAssigner
+from room_pools import RoomPool
+from diagnostics import SessionDiagnosis, DiagnosticsReport
+from pipeline import GenerationPipeline
+from schedule_store import DB_ENV, ScheduleStore
+from csv_codec import Grid, read_grid, read_records, write_grid
+from checkpoints import CheckpointStore, fingerprint
+from input_watch import InputWatcher, ParsedInputCache
+from student_timetables import StudentTimetables
+from ical_export import CalendarExporter, cell_sessions, fold
+import pickle
+
 
 class TestCourseLoading(unittest.TestCase):
     """Test cases for course data loading from CSV files"""
@@ -250,6 +280,1401 @@ class TestConflictDetection(unittest.TestCase):
         
         print("✓ Test 1.3.3 passed: Time overlap detection works")
 
+class TestLedgerViews(unittest.TestCase):
+    """Test cases for room/faculty views built from the global classroom ledger"""
+    
+    def setUp(self):
+        """Build a small ledger covering two rooms and two faculty"""
+        self.ledger = {
+            'Tuesday': {
+                '09:45-11:15': {
+                    'C203': {'dept': 'CSE', 'semester': 2, 'section': 'A', 'course': 'MA163',
+                             'faculty': 'Dr. Padhy', 'type': 'Lecture'},
+                    'C004': {'dept': 'ECE', 'semester': 2, 'section': 'B', 'course': 'CS162',
+                             'faculty': 'Dr. Guha', 'type': 'Lecture'},
+                },
+                '14:30-16:30': {
+                    'C203': {'dept': 'DSAI', 'semester': 4, 'section': 'A', 'course': 'CS310',
+                             'faculty': 'Dr. Padhy', 'type': 'Tutorial'},
+                },
+            },
+            'Monday': {
+                '08:00-09:30': {
+                    'C203': {'dept': 'CSE', 'semester': 2, 'section': 'B', 'course': 'MA163',
+                             'faculty': 'Dr. Padhy', 'type': 'Lecture'},
+                },
+            },
+        }
+        time_slots = [('08:00', '09:30'), ('09:45', '11:15'), ('13:00', '14:30'), ('14:30', '16:30')]
+        self.views = LedgerViewIndex(self.ledger, time_slots, ('13:00', '14:30'))
+    
+    def test_whats_in_room_on_day(self):
+        """Test Case 1.4.1: Answer "what's in C203 on Tuesday?" from the index"""
+        sessions = self.views.whats_in('C203', 'Tuesday')
+        self.assertEqual([s['course'] for s in sessions], ['MA163', 'CS310'], "Should list both sessions in time order")
+        self.assertIsNone(self.views.whats_in('C203', 'Tuesday', '08:00-09:30'), "Free slot should return None")
+        
+        print("✓ Test 1.4.1 passed: Room query answered from ledger index")
+    
+    def test_faculty_schedule(self):
+        """Test Case 1.4.2: Faculty view spans days and rooms"""
+        sessions = self.views.faculty_schedule('Dr. Padhy')
+        self.assertEqual([(s['day'], s['room']) for s in sessions],
+                         [('Monday', 'C203'), ('Tuesday', 'C203'), ('Tuesday', 'C203')])
+        self.assertEqual(self.views.days, ['Monday', 'Tuesday'], "Days should follow week order")
+        
+        print("✓ Test 1.4.2 passed: Faculty schedule built in one pass")
+    
+    def test_free_rooms_and_grid(self):
+        """Test Case 1.4.3: Free room lookup and grid layout match section CSVs"""
+        self.assertEqual(self.views.free_rooms('Tuesday', '09:45-11:15'), [])
+        self.assertEqual(self.views.free_rooms('Monday', '09:45-11:15'), ['C004', 'C203'])
+        
+        grid = self.views.room_grid('C203')
+        self.assertEqual(grid['Monday']['13:00-14:30'], 'LUNCH BREAK')
+        self.assertEqual(grid['Monday']['09:45-11:15'], 'Free')
+        self.assertIn('MA163', grid['Monday']['08:00-09:30'])
+        
+        print("✓ Test 1.4.3 passed: Free rooms and room grid correct")
+    
+    def test_export_all(self):
+        """Test Case 1.4.4: Export writes one CSV/HTML per room and faculty"""
+        with tempfile.TemporaryDirectory() as tmp:
+            counts = self.views.export_all(csv_dir=tmp, html_dir=tmp)
+            self.assertEqual(counts, {'rooms': 2, 'faculty': 2})
+            room_csv = pd.read_csv(os.path.join(tmp, 'room_timetables', 'Room_C203.csv'), index_col=0)
+            self.assertEqual(list(room_csv.index), ['Monday', 'Tuesday'])
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'views', 'index.html')))
+        
+        print("✓ Test 1.4.4 passed: Room and faculty views exported")
+    
+    def test_co_taught_and_variant_names(self):
+        """Test Case 1.4.5: Co-taught sessions reach every teacher; name variants are one person"""
+        self.assertEqual(split_faculty('Mr. Ram Subramanian ( Course Coordinator: Dr. Manjunath KV)'),
+                         ['Mr. Ram Subramanian'])
+        self.assertEqual(split_faculty('Dr. Jolly Thomas, IIT Dharwad'), ['Dr. Jolly Thomas'])
+        
+        ledger = {'Monday': {
+            '08:00-09:30': {'C101': {'dept': 'CSE', 'semester': 4, 'section': 'A', 'course': 'CS261',
+                                     'faculty': 'Dr. Abdul Wahid & Dr. Rajendra Hegadi', 'type': 'Lecture'}},
+            '09:45-11:15': {'C102': {'dept': 'DSAI', 'semester': 2, 'section': 'A', 'course': 'MA161',
+                                     'faculty': 'Dr. Rajendra H', 'type': 'Lecture'},
+                            'C103': {'dept': 'ECE', 'semester': 2, 'section': 'A', 'course': 'EC161',
+                                     'faculty': 'Dr. Shirshendu and Dr. Utkarsh Khaire', 'type': 'Lecture'}},
+            '11:30-13:00': {'C104': {'dept': 'CSE', 'semester': 6, 'section': 'A', 'course': 'EC301',
+                                     'faculty': 'Dr. Shirshendu Layek', 'type': 'Lecture'}},
+        }}
+        views = LedgerViewIndex(ledger)
+        self.assertEqual(views.faculty(), ['Dr. Abdul Wahid', 'Dr. Rajendra Hegadi', 'Dr. Shirshendu Layek',
+                                           'Dr. Utkarsh Khaire'])
+        self.assertEqual([s['course'] for s in views.faculty_schedule('Dr. Rajendra Hegadi')], ['CS261', 'MA161'])
+        self.assertEqual([s['course'] for s in views.faculty_schedule('Dr.Shirshendu L')], ['EC161', 'EC301'])
+        
+        print("✓ Test 1.4.5 passed: Faculty views merge co-taught sessions and name variants")
+
+
+class TestRoomAnalytics(unittest.TestCase):
+    """Test cases for room utilization analytics"""
+    
+    def setUp(self):
+        """Two days, two teaching slots, auditorium + one backup + one lab"""
+        ledger = {
+            'Monday': {
+                '08:00-09:30': {'C004': {'course': 'CS162'}, 'C101': {'course': 'HS161'}},
+                '14:30-16:30': {'Lab-1': {'course': 'CS163'}, 'nan': {'course': 'ELECTIVE_B3'}},
+            },
+            'Tuesday': {
+                '08:00-09:30': {'C004': {'course': 'CS162'}},
+            },
+        }
+        self.report = RoomUtilizationReport(
+            ledger, ['Monday', 'Tuesday'], [('08:00', '09:30'), ('13:00', '14:30'), ('14:30', '16:30')],
+            lunch_slot=('13:00', '14:30'), large_auditorium='C004', backup_large_classrooms=['C101'],
+            lab_rooms=['Lab-1', 'Lab-2'], large_room_stats={'requests': 4, 'primary': 2, 'backup': 1, 'none': 1}
+        )
+    
+    def test_occupancy_tensor(self):
+        """Test Case 1.5.1: Occupancy tensor excludes lunch and placeholder rooms"""
+        self.assertEqual(self.report.rooms, ['C004', 'C101', 'Lab-1', 'Lab-2'])
+        self.assertEqual(self.report.occupancy.shape, (4, 2, 2), "rooms x days x slots")
+        occupancy = dict(zip(self.report.rooms, self.report.room_occupancy()))
+        self.assertAlmostEqual(occupancy['C004'], 0.5)
+        self.assertAlmostEqual(occupancy['Lab-2'], 0.0)
+        
+        print("✓ Test 1.5.1 passed: Occupancy tensor built correctly")
+    
+    def test_peak_contention_and_groups(self):
+        """Test Case 1.5.2: Peak contention slot and room-group occupancy"""
+        self.assertEqual(self.report.peak_contention_slots(top=1), [('Monday', '08:00-09:30', 2)])
+        groups = self.report.group_occupancy()
+        self.assertAlmostEqual(groups['auditorium'], 0.5)
+        self.assertAlmostEqual(groups['labs'], 0.125)
+        
+        print("✓ Test 1.5.2 passed: Contention and group occupancy computed")
+    
+    def test_large_room_fallback_rates(self):
+        """Test Case 1.5.3: Fallback rates come from the large-room counters"""
+        rates = self.report.large_room_fallback_rates()
+        self.assertAlmostEqual(rates['backup_rate'], 0.25)
+        self.assertAlmostEqual(rates['none_rate'], 0.25)
+        
+        print("✓ Test 1.5.3 passed: Large-room fallback rates correct")
+    
+    def test_export(self):
+        """Test Case 1.5.4: CSV and heatmap HTML are written"""
+        with tempfile.TemporaryDirectory() as tmp:
+            rooms_file, heatmap_file = self.report.export_csv(tmp)
+            html_file = self.report.export_html(os.path.join(tmp, 'room_utilization.html'))
+            df = pd.read_csv(rooms_file)
+            self.assertEqual(list(df['Room']), ['C004', 'C101', 'Lab-1', 'Lab-2'])
+            self.assertTrue(os.path.exists(heatmap_file))
+            self.assertTrue(os.path.exists(html_file))
+        
+        print("✓ Test 1.5.4 passed: Utilization CSV and heatmap exported")
+    
+    def test_days_follow_config(self):
+        """Test Case 1.5.5: A generator's report covers the configured teaching days, Saturday included"""
+        config = SchedulerConfig().with_changes(
+            weekdays=('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'))
+        generator = TimetableGenerator(core=SchedulingCore(config))
+        report = RoomUtilizationReport.from_generator(generator)
+        self.assertEqual(report.days[-1], 'Saturday')
+        self.assertEqual(report.occupancy.shape[1], 6)
+        
+        print("✓ Test 1.5.5 passed: Report days come from the config")
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for stage timing spans and counters"""
+    
+    def test_disabled_tracer_is_noop(self):
+        """Test Case 1.6.1: Disabled tracer records nothing"""
+        tracer = Tracer(enabled=False)
+        with tracer.span('timetable.place', department='CSE'):
+            tracer.count('timetable.slot_probes')
+        
+        self.assertIs(tracer.span('a'), tracer.span('b'), "Disabled spans share one no-op object")
+        self.assertEqual(tracer.summary(), {'stages': {}, 'counters': {}})
+        
+        print("✓ Test 1.6.1 passed: Disabled tracer is a no-op")
+    
+    def test_spans_counters_and_export(self):
+        """Test Case 1.6.2: Enabled tracer aggregates spans and exports both formats"""
+        tracer = Tracer(enabled=True)
+        for _ in range(3):
+            with tracer.span('timetable.place') as span:
+                span.set(sessions=2)
+        tracer.count('timetable.slot_probes', 5)
+        tracer.count('timetable.slot_probes')
+        
+        summary = tracer.summary()
+        self.assertEqual(summary['stages']['timetable.place']['calls'], 3)
+        self.assertEqual(summary['counters'], {'timetable.slot_probes': 6})
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tracer.export(os.path.join(tmp, 'trace.json'), trace_format='chrome')
+            with open(path, encoding='utf-8') as f:
+                events = json.load(f)['traceEvents']
+        phases = [e['ph'] for e in events]
+        self.assertEqual(phases.count('X'), 3)
+        self.assertEqual(phases.count('C'), 1)
+        
+        print("✓ Test 1.6.2 passed: Spans and counters exported")
+    
+    def test_counts_from_threads(self):
+        """Test Case 1.6.3: Counters incremented from several threads lose no updates"""
+        tracer = Tracer(enabled=True)
+        
+        def probe():
+            for _ in range(20000):
+                tracer.count('timetable.slot_probes')
+        
+        threads = [threading.Thread(target=probe) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(tracer.summary()['counters'], {'timetable.slot_probes': 160000})
+        
+        print("✓ Test 1.6.3 passed: Thread-safe counters")
+
+
+class TestStructuredLogging(unittest.TestCase):
+    """Test cases for levelled console output and buffered JSON logs"""
+    
+    def tearDown(self):
+        shutdown_logging()
+    
+    def test_quiet_console_and_json_file(self):
+        """Test Case 1.7.1: Quiet console hides INFO; JSON file keeps DEBUG with extra fields"""
+        console = StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, 'run.jsonl')
+            configure_logging(quiet=True, json_file=log_file, stream=console)
+            log = get_logger('timetable.generator')
+            log.debug("Scheduling: %s", 'CS161')
+            log.info("Timetable saved", extra={'file': 'x.csv'})
+            log.warning("WARNING: %d sessions could not be scheduled", 2, extra={'department': 'ECE'})
+            shutdown_logging()
+            
+            with open(log_file, encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f]
+        
+        self.assertEqual(console.getvalue().strip(), "WARNING: 2 sessions could not be scheduled")
+        self.assertEqual([e['level'] for e in entries], ['DEBUG', 'INFO', 'WARNING'])
+        self.assertEqual(entries[1]['file'], 'x.csv')
+        self.assertEqual(entries[2]['department'], 'ECE')
+        
+        print("✓ Test 1.7.1 passed: Quiet console and JSON log file")
+    
+    def test_timetable_grid_only_when_verbose(self):
+        """Test Case 1.7.2: print_timetable formats the grid only at DEBUG level"""
+        console = StringIO()
+        generator = TimetableGenerator()
+        timetable = {'Monday': {'08:00-09:30': 'CS161-A | C101'}}
+        
+        configure_logging(level='INFO', stream=console)
+        generator.print_timetable(timetable)
+        self.assertEqual(console.getvalue(), "")
+        
+        configure_logging(level='DEBUG', stream=console)
+        generator.print_timetable(timetable)
+        self.assertIn('CS161-A | C101', console.getvalue())
+        
+        print("✓ Test 1.7.2 passed: Timetable grid only built when verbose")
+    
+    def test_unknown_level_and_quiet_reports(self):
+        """Test Case 1.7.3: An unknown level falls back to INFO; QUIET silences the report writers too"""
+        console = StringIO()
+        self.assertEqual(configure_logging(level='LOUD', stream=console), logging.INFO)
+        self.assertIn("Unknown log level 'LOUD'", console.getvalue())
+        
+        console = StringIO()
+        configure_logging(quiet=True, stream=console)
+        generator = TimetableGenerator()
+        generator.generate_timetable('CSE', 4, 'A')
+        with tempfile.TemporaryDirectory() as tmp:
+            LedgerViewIndex.from_generator(generator).export_all(tmp, tmp)
+            report = RoomUtilizationReport.from_generator(generator)
+            report.export_csv(tmp)
+            report.export_html(os.path.join(tmp, 'room_utilization.html'))
+        self.assertNotIn('saved', console.getvalue())
+        
+        print("✓ Test 1.7.3 passed: Log level fallback and quiet report writers")
+
+
+class TestSchedulingCore(unittest.TestCase):
+    """Test cases for the scheduling core shared by main.py and main_functional.py"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        pd.DataFrame([
+            {'Course Code': 'MA161', 'Course Title': 'Calculus', 'Lectures': 3, 'Tutorials': 1,
+             'Practicals': 0, 'Faculty': 'Dr. A', 'Classroom': 'C004', 'Semester': 2,
+             'Electives': 'F', 'Basket': '', 'Section': ''},
+            {'Course Code': 'CS161', 'Course Title': 'Programming', 'Lectures': 2, 'Tutorials': 0,
+             'Practicals': 2, 'Faculty': 'Dr. B', 'Classroom': 'C302', 'Semester': 2,
+             'Electives': 'F', 'Basket': '', 'Section': '2A'},
+            {'Course Code': 'HS161', 'Course Title': 'Economics', 'Lectures': 2, 'Tutorials': 0,
+             'Practicals': 0, 'Faculty': 'Dr. C', 'Classroom': 'C303', 'Semester': 2,
+             'Electives': 'T', 'Basket': 'B2', 'Section': ''},
+        ]).to_csv(os.path.join(self.tmp.name, 'Even ECE.csv'), index=False)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_config_is_immutable(self):
+        """Test Case 1.8.1: SchedulerConfig is frozen and carries the Saturday and rotation rules"""
+        config = SchedulerConfig()
+        with self.assertRaises(Exception):
+            config.large_auditorium = 'C101'
+        
+        self.assertIn('Saturday', config.days_for('ECE', 4))
+        self.assertNotIn('Saturday', config.days_for('CSE', 4))
+        self.assertEqual(config.rotation_for(4), ('B1', 'B3', 'Minor'))
+        self.assertIsNone(config.rotation_for(3))
+        self.assertEqual(config.with_changes(csv_folder='x').csv_folder, 'x')
+        
+        print("✓ Test 1.8.1 passed: Immutable scheduler config")
+    
+    def test_front_ends_share_core(self):
+        """Test Case 1.8.2: Class and functional front-ends produce the same timetable and ledger"""
+        generator = TimetableGenerator(csv_folder=self.tmp.name)
+        timetable, electives, rotated_out = generator.generate_timetable('ECE', 2, 'A')
+        
+        state = ScheduleState()
+        result = main_functional.generate_timetable(state, 'ECE', 2, 'A', csv_folder=self.tmp.name)
+        
+        self.assertEqual(result, (timetable, electives, rotated_out))
+        self.assertEqual(state.global_classroom_usage, generator.global_classroom_usage)
+        self.assertIn('B2', rotated_out)  # Semester 2 rotation skips basket B2
+        cells = [cell for day in timetable.values() for cell in day.values()]
+        # MA161 has no section: a common course (3 lectures + 1 tutorial) in a large room
+        self.assertEqual(sum(c.startswith('MA161 (Common)') for c in cells), 4)
+        self.assertEqual(sum('CS161-Lab-A' in c for c in cells), 1)
+        
+        print("✓ Test 1.8.2 passed: Both front-ends share one scheduling core")
+    
+    def test_snapshot_copy_on_write(self):
+        """Test Case 1.8.3: Ledger snapshots share bookings until either side writes"""
+        base = ScheduleState()
+        base.record_usage('Monday', '08:00-09:30', 'C101', {'course': 'CS161'})
+        fork = base.snapshot()
+        fork.record_usage('Monday', '08:00-09:30', 'C102', {'course': 'MA161'})
+        base.record_usage('Monday', '08:00-09:30', 'C103', {'course': 'HS161'})
+        
+        self.assertEqual(set(base.global_classroom_usage['Monday']['08:00-09:30']), {'C101', 'C103'})
+        self.assertEqual(set(fork.global_classroom_usage['Monday']['08:00-09:30']), {'C101', 'C102'})
+        
+        print("✓ Test 1.8.3 passed: Copy-on-write ledger snapshots")
+    
+    def test_parallel_what_if_matches_serial(self):
+        """Test Case 1.8.4: Scenarios run in parallel give the same result as one at a time"""
+        generator = TimetableGenerator(csv_folder=self.tmp.name)
+        generator.generate_timetable('ECE', 2, 'A')
+        base_ledger = repr(generator.global_classroom_usage)
+        groups = [('ECE', 2, 'B'), ('ECE', 4, 'A')]
+        scenarios = {
+            'baseline': {},
+            'all_baskets': {'elective_rotation': ()},
+            'one_lab': {'lab_rooms': ('Lab-1',)},
+        }
+        
+        parallel = run_what_if(generator.core, scenarios, groups, max_workers=3)
+        for name, changes in scenarios.items():
+            serial = generator.snapshot(**changes)
+            expected = {group: serial.generate_context(*group) for group in groups}
+            core, contexts = parallel[name]
+            for group in groups:
+                if expected[group] is None:
+                    self.assertIsNone(contexts[group])
+                else:
+                    self.assertEqual(contexts[group].result(), expected[group].result())
+            self.assertEqual(core.state.global_classroom_usage, serial.global_classroom_usage)
+        
+        self.assertEqual(repr(generator.global_classroom_usage), base_ledger)
+        self.assertIn('B2', parallel['baseline'][1][('ECE', 2, 'B')].rotated_out_electives)
+        self.assertIn('B2', parallel['all_baskets'][1][('ECE', 2, 'B')].elective_courses)
+        
+        print("✓ Test 1.8.4 passed: Parallel what-if runs are isolated and deterministic")
+
+class TestWhatIfRunner(unittest.TestCase):
+    """Test cases for the multi-scenario what-if batch runner"""
+    
+    def test_expand_grid_and_convert(self):
+        """Test Case 1.9.1: Grid expands to every combination with typed config values"""
+        spec = {
+            'grid': {'saturday_groups': {'ece4': [['ECE', 4]], 'none': []},
+                     'lab_rooms': [['Lab-1'], ['Lab-1', 'Lab-2']]},
+            'scenarios': {'all_electives': {'elective_rotation': {}}},
+        }
+        scenarios = what_if.expand_scenarios(spec)
+        
+        self.assertEqual(len(scenarios), 1 + 4 + 1)
+        self.assertIn('saturday_groups=none,lab_rooms=1', scenarios)
+        changes = what_if.config_changes_from_json({'saturday_groups': [['ECE', 4]],
+                                                    'elective_rotation': {'2': ['B1']},
+                                                    'lab_rooms': ['Lab-1']})
+        config = SchedulerConfig().with_changes(**changes)
+        self.assertEqual(config.saturday_groups, frozenset({('ECE', 4)}))
+        self.assertEqual(config.rotation_for(2), ('B1',))
+        self.assertEqual(config.lab_rooms, ('Lab-1',))
+        with self.assertRaises(ValueError):
+            what_if.config_changes_from_json({'no_such_setting': 1})
+        
+        print("✓ Test 1.9.1 passed: Scenario grid expansion")
+    
+    def test_batch_ranking(self):
+        """Test Case 1.9.2: Scenarios are scored in worker processes and ranked best-first"""
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        scenarios = {'baseline': {}, 'one_lab': {'lab_rooms': ['Lab-1']}}
+        groups = [('CSE', 2, 'A'), ('CSE', 2, 'B'), ('ECE', 4, 'A')]
+        
+        ranked = what_if.run_batch(scenarios, csv_folder=csv_folder, workers=2, groups=groups)
+        
+        self.assertEqual([r['rank'] for r in ranked], [1, 2])
+        self.assertEqual({r['scenario'] for r in ranked}, set(scenarios))
+        self.assertLessEqual(ranked[0]['score'], ranked[1]['score'])
+        self.assertGreater(ranked[0]['saturday_sessions'], 0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = what_if.write_ranking_csv(ranked, os.path.join(tmp, 'ranking.csv'))
+            table = pd.read_csv(path)
+        self.assertEqual(list(table['scenario']), [r['scenario'] for r in ranked])
+        
+        print("✓ Test 1.9.2 passed: Ranked what-if comparison table")
+    
+    def test_utilization_is_not_scored(self):
+        """Test Case 1.9.3: Utilization is reported but cannot rank a scenario with fewer rooms higher"""
+        base = {'unscheduled': 0, 'evening_sessions': 2, 'saturday_sessions': 0, 'large_room_fallback_pct': 10.0}
+        results = [{**base, 'scenario': 'all_rooms', 'utilization_pct': 40.0},
+                   {**base, 'scenario': 'fewer_rooms', 'utilization_pct': 70.0}]
+        
+        ranked = what_if.rank_results(results)
+        
+        self.assertEqual([r['scenario'] for r in ranked], ['all_rooms', 'fewer_rooms'])
+        self.assertEqual(ranked[0]['score'], ranked[1]['score'])
+        with self.assertRaises(ValueError):
+            what_if.rank_results(results, weights={'utilization_pct': -1.0})
+        
+        print("✓ Test 1.9.3 passed: Utilization left out of the score")
+
+class TestOptimizer(unittest.TestCase):
+    """Test cases for the simulated annealing quality pass"""
+    
+    def setUp(self):
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        self.generator = TimetableGenerator(csv_folder=csv_folder)
+        self.contexts = [self.generator.generate_context('CSE', sem, sec) for sem in (2, 4) for sec in ('A', 'B')]
+    
+    def test_cost_improves_with_incremental_scoring(self):
+        """Test Case 1.10.1: Annealing never ends worse and its delta-tracked cost matches a full recount"""
+        optimizer = TimetableOptimizer(self.generator.core, self.contexts, seed=7)
+        report = optimizer.run(time_budget=None, max_iterations=20000)
+        
+        self.assertLessEqual(report['final_cost'], report['initial_cost'])
+        self.assertAlmostEqual(report['final_cost'], optimizer.cost(), places=3)
+        self.assertEqual(report['iterations'], 20000)
+        
+        print("✓ Test 1.10.1 passed: Incremental objective and improvement")
+    
+    def test_hard_constraints_kept(self):
+        """Test Case 1.10.2: Moves keep rooms single-booked and per-day limits intact"""
+        TimetableOptimizer(self.generator.core, self.contexts, seed=3).run(time_budget=None, max_iterations=20000)
+        ledger = self.generator.global_classroom_usage
+        
+        for ctx in self.contexts:
+            for day, slots in ctx.used_slots.items():
+                for time_str, entries in slots.items():
+                    for course_code, entry in entries.items():
+                        self.assertNotEqual(ctx.timetable[day][time_str], 'Free')
+                        if entry['shared']:
+                            continue  # Planned basket sessions book each member course's room and never move
+                        self.assertEqual(ledger[day][time_str][entry['room']]['course'], course_code)
+            for schedule in (ctx.lecture_schedule, ctx.tutorial_schedule, ctx.lab_schedule):
+                for course_days in schedule.values():
+                    self.assertTrue(all(0 <= n <= 1 for n in course_days.values()))
+        
+        booked = sum(1 for day in ledger.values() for rooms in day.values() for record in rooms.values()
+                     if 'cohort' not in record)
+        placed = sum(1 for ctx in self.contexts for day in ctx.used_slots.values() for entries in day.values()
+                     for entry in entries.values() if not entry['shared'])
+        self.assertEqual(booked, placed)
+        
+        print("✓ Test 1.10.2 passed: Hard constraints preserved by the optimizer")
+
+class TestTimeModel(unittest.TestCase):
+    """Test cases for the minute-resolution slot grid"""
+    
+    def test_interval_queries(self):
+        """Test Case 1.11.1: Lookup, overlap and fit queries on the default grid"""
+        model = SchedulerConfig().time_model
+        
+        self.assertEqual(model.slot_at(parse_hhmm('10:00')).key, '09:45-11:15')
+        self.assertIsNone(model.slot_at(parse_hhmm('09:35')))  # Break between slots
+        self.assertEqual([s.key for s in model.overlapping(parse_hhmm('12:00'), parse_hhmm('15:00'))],
+                         ['11:30-13:00', '13:00-14:30', '14:30-16:30'])
+        self.assertEqual([s.key for s in model.fits(120)], ['14:30-16:30', '16:30-18:30'])
+        self.assertEqual([s.key for s in model.fits(90, ('evening', 'regular'))], ['08:00-09:30', '09:45-11:15', '11:30-13:00', '18:30-20:00'])
+        self.assertIs(model.fits(90, ('regular',)), model.fits(90, ['regular']))  # Memoized per (duration, kinds)
+        self.assertEqual(model.capacity('18:30-20:00'), 90)
+        self.assertEqual(model.kind_of('13:00-14:30'), 'lunch')
+        with self.assertRaises(ValueError):
+            TimeModel([Slot(480, 570), Slot(540, 600)])
+        
+        print("✓ Test 1.11.1 passed: Time model interval queries")
+    
+    def test_custom_grid_drives_scheduler(self):
+        """Test Case 1.11.2: A slot grid loaded from JSON replaces the hard-coded slots"""
+        grid = {'slots': [
+            {'start': '09:00', 'end': '10:00', 'kind': 'regular'},
+            {'start': '10:00', 'end': '11:30', 'kind': 'regular'},
+            {'start': '12:30', 'end': '13:30', 'kind': 'lunch'},
+            {'start': '13:30', 'end': '16:30', 'kind': 'flex'},
+        ]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.json')
+            with open(path, 'w') as f:
+                json.dump(grid, f)
+            csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+            config = SchedulerConfig.from_time_grid(path, csv_folder=csv_folder)
+        
+        self.assertEqual(config.regular_slots, (('09:00', '10:00'), ('10:00', '11:30')))
+        self.assertEqual(config.evening_slot, ())
+        generator = TimetableGenerator(config=config, csv_folder=csv_folder)
+        timetable, _, _ = generator.generate_timetable('CSE', 2, 'A')
+        
+        self.assertEqual(list(timetable['Monday']), ['09:00-10:00', '10:00-11:30', '12:30-13:30', '13:30-16:30'])
+        for day in timetable.values():
+            # Only tutorials fit the 60-minute morning slot
+            cell = day['09:00-10:00']
+            self.assertTrue(cell == 'Free' or '-T-' in cell or cell.startswith('Elective'), cell)
+        
+        print("✓ Test 1.11.2 passed: Scheduler follows a configured slot grid")
+
+
+class TestFlexPacking(unittest.TestCase):
+    """Test cases for packing short sessions into flexible afternoon slots"""
+    
+    def _pack_two_tutorials(self, **changes):
+        # One day with a single 2-hour flexible slot and nothing else
+        config = SchedulerConfig(weekdays=('Monday',), regular_slots=(), afternoon_flex_slots=(('14:30', '16:30'),),
+                                 evening_slot=(), **changes)
+        core = SchedulingCore(config)
+        ctx = GenerationContext('CSE', 2, 'A', ['Monday'], config.time_slots, config.lunch_slot)
+        placed = []
+        for code, faculty in (('CS161', 'Dr. X'), ('MA161', 'Dr. Y')):
+            for schedule in (ctx.lecture_schedule, ctx.tutorial_schedule, ctx.lab_schedule):
+                schedule[code] = {'Monday': 0}
+            placed.append(core._schedule_session(ctx, code, 'C202', 'Tutorial', False, False, None, faculty=faculty))
+        return core, ctx, placed
+    
+    def test_two_tutorials_share_a_flex_slot(self):
+        """Test Case 1.12.1: Two 1-hour tutorials are packed into one 2-hour slot and its room"""
+        core, ctx, placed = self._pack_two_tutorials()
+        
+        self.assertEqual(placed, [True, True])
+        self.assertEqual(ctx.timetable['Monday']['14:30-16:30'],
+                         'CS161-T-A [60min] | C202 + MA161-T-A [60min] | C202')
+        self.assertEqual(ctx.flex_minutes['Monday']['14:30-16:30'], 120)
+        self.assertEqual(ctx.used_slots['Monday']['14:30-16:30']['MA161']['offset_minutes'], 60)
+        
+        # Both sessions are in the ledger and in the faculty views
+        views = LedgerViewIndex(core.state.global_classroom_usage, core.config.time_slots, core.config.lunch_slot)
+        self.assertEqual(views.faculty(), ['Dr. X', 'Dr. Y'])
+        self.assertEqual(views.faculty_schedule('Dr. Y')[0]['room'], 'C202')
+        self.assertIn('CS161 Tutorial', views.room_grid('C202')['Monday']['14:30-16:30'])
+        self.assertIn('MA161 Tutorial', views.room_grid('C202')['Monday']['14:30-16:30'])
+        
+        # With packing off the second tutorial has nowhere to go
+        _, _, placed = self._pack_two_tutorials(pack_flex_slots=False)
+        self.assertEqual(placed, [True, False])
+        
+        print("✓ Test 1.12.1 passed: Short sessions packed into one flexible slot")
+    
+    def test_packed_cell_renders_one_bar_per_session(self):
+        """Test Case 1.12.2: The HTML flexible-slot cell shows a duration bar per packed session"""
+        with tempfile.TemporaryDirectory() as tmp:
+            converter = TimetableHTMLConverter(output_dir=tmp)
+        
+        packed = converter._render_flex_slot_cell('CS161-T-A [60min] | C202 + MA161-T-A [60min] | C202',
+                                                  '14:30-16:30')
+        self.assertIn('packed-slot', packed)
+        self.assertEqual(packed.count('tutorial-duration'), 2)
+        self.assertEqual(packed.count('flex: 60 1 0'), 2)
+        self.assertNotIn('spare-duration', packed)
+        
+        # A single session keeps the full-width bar
+        single = converter._render_flex_slot_cell('CS161-A [90min] | C202', '14:30-16:30')
+        self.assertNotIn('packed-slot', single)
+        self.assertEqual(single.count('duration-bar '), 1)
+        
+        print("✓ Test 1.12.2 passed: Packed flexible slots rendered as side-by-side bars")
+
+
+class TestCourseOfferings(unittest.TestCase):
+    """Test cases for scheduling cross-department common courses once per offering"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for dept, faculty, room in (('DSAI', 'Dr. D. Guha', 'C204'), ('ECE', 'Dr D Guha, IIT Dharwad', 'C205')):
+            pd.DataFrame([
+                {'Course Code': 'CS162', 'Course Title': 'Optimization', 'Lectures': 3, 'Tutorials': 1,
+                 'Practicals': 2, 'Faculty': faculty, 'Classroom': room, 'Semester': 2, 'Electives': 'F',
+                 'Basket': ''},
+                {'Course Code': 'CS163', 'Course Title': 'Data Structures', 'Lectures': 3, 'Tutorials': 0,
+                 'Practicals': 0, 'Faculty': f'Dr. {dept}', 'Classroom': room, 'Semester': 2, 'Electives': 'F',
+                 'Basket': ''},
+            ]).to_csv(os.path.join(self.tmp.name, f'Even {dept}.csv'), index=False)
+        self.groups = [(dept, 2, sec) for dept in ('DSAI', 'ECE') for sec in ('A', 'B')]
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_offering_index(self):
+        """Test Case 1.13.1: Identical offerings are merged, different faculty are not"""
+        index = CourseOfferingIndex()
+        index.add(('DSAI', 2, 'A'), 'CS162', 'Dr. D. Guha', 3, 1, classroom='C204')
+        index.add(('ECE', 2, 'A'), 'CS162', 'Dr D Guha, IIT Dharwad', 3, 1, classroom='C205/C004')
+        index.add(('DSAI', 2, 'A'), 'CS163', 'Dr. DSAI', 3, 0)
+        index.add(('ECE', 2, 'A'), 'CS163', 'Dr. ECE', 3, 0)
+        
+        shared = index.shared()
+        self.assertEqual(len(shared), 1)
+        self.assertEqual(shared[0].groups, [('DSAI', 2, 'A'), ('ECE', 2, 'A')])
+        self.assertEqual(shared[0].classrooms, ['C204', 'C205', 'C004'])
+        self.assertEqual(index.placements_saved(), 4)
+        
+        print("✓ Test 1.13.1 passed: Course offering index deduplicates common courses")
+    
+    def test_shared_offering_placed_once(self):
+        """Test Case 1.13.2: A shared common course gets the same slots in every group and one room booking"""
+        core = SchedulingCore(SchedulerConfig(csv_folder=self.tmp.name))
+        contexts = core.generate_all(self.groups)
+        
+        def slots_of(ctx, code):
+            return sorted((day, time_str) for day, row in ctx.timetable.items()
+                          for time_str, cell in row.items() if cell.startswith(f"{code} (Common)"))
+        
+        cs162 = [slots_of(ctx, 'CS162') for ctx in contexts.values()]
+        self.assertEqual(len(cs162[0]), 4)
+        self.assertTrue(all(slots == cs162[0] for slots in cs162))
+        for day, time_str in cs162[0]:
+            bookings = [r for r in core.state.global_classroom_usage[day][time_str].values() if r['course'] == 'CS162']
+            self.assertEqual(len(bookings), 1)
+            self.assertEqual(bookings[0]['cohort'], self.groups)
+        
+        # CS163 is shared by a department's two sections only; labs stay per section
+        self.assertEqual(slots_of(contexts[('DSAI', 2, 'A')], 'CS163'), slots_of(contexts[('DSAI', 2, 'B')], 'CS163'))
+        for ctx in contexts.values():
+            self.assertEqual(sum('CS162-Lab' in cell for row in ctx.timetable.values() for cell in row.values()), 1)
+            self.assertEqual(ctx.unscheduled_courses, [])
+        
+        # Without sharing every group books its own rooms
+        separate = SchedulingCore(SchedulerConfig(csv_folder=self.tmp.name, share_common_offerings=False))
+        separate.generate_all(self.groups)
+        self.assertEqual(core.state.large_room_stats['requests'], 4 + 2 * 3)
+        # One count per placed session, whichever slots were tried first
+        self.assertEqual(core.state.large_room_stats['primary'] + core.state.large_room_stats['backup'], 4 + 2 * 3)
+        self.assertEqual(separate.state.large_room_stats['requests'], 4 * (4 + 3))
+        
+        print("✓ Test 1.13.2 passed: Shared offerings placed once for the whole cohort")
+
+
+class TestElectivePlanner(unittest.TestCase):
+    """Test cases for scheduling elective baskets once across sections"""
+    
+    def test_basket_meetings(self):
+        """Test Case 1.14.1: Baskets merge across groups and short courses avoid shared rooms"""
+        planner = ElectivePlanner()
+        planner.add(('CSE', 2, 'A'), 'B4', 'DS151', 'Dr. L', 'C203', 3, 1)
+        planner.add(('CSE', 2, 'A'), 'B4', 'HS156', 'Dr. C', 'C203', 1, 0)
+        planner.add(('CSE', 2, 'A'), 'B4', 'HS154', 'Dr. P', 'C204', 1, 0)
+        planner.add(('ECE', 2, 'A'), 'B4', 'ASD152', 'Dr. S', 'Online', 2, 1)
+        planner.add(('ECE', 2, 'A'), 'B4', 'HS154', 'Dr. P', 'C204', 2, 0)
+        
+        [plan] = planner.plans()
+        self.assertEqual(plan.groups, [('CSE', 2, 'A'), ('ECE', 2, 'A')])
+        self.assertEqual(plan.course_code, 'ELECTIVE_B4')
+        self.assertEqual(plan.courses['HS154'].lectures, 2)  # Longest listing wins
+        self.assertIsNone(plan.courses['ASD152'].room)
+        
+        lectures = [[c.code for c in session] for session in plan.meetings('Lecture')]
+        self.assertEqual(len(lectures), 3)
+        self.assertTrue(all('DS151' in session for session in lectures))
+        self.assertEqual(sum('ASD152' in session for session in lectures), 2)
+        self.assertEqual(sum('HS154' in session for session in lectures), 2)
+        self.assertEqual([[c.code for c in session] for session in plan.meetings('Tutorial')], [['DS151', 'ASD152']])
+        
+        print("✓ Test 1.14.1 passed: Elective baskets planned across groups")
+    
+    def test_basket_scheduled_once_with_rooms(self):
+        """Test Case 1.14.2: A basket shares slots across sections and books every member course's room"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for dept, room in (('DSAI', 'C302'), ('ECE', 'C303')):
+                pd.DataFrame([
+                    {'Course Code': f'{dept}1', 'Course Title': 'Elective', 'Lectures': 2, 'Tutorials': 0,
+                     'Practicals': 0, 'Faculty': f'Dr. {dept}', 'Classroom': room, 'Semester': 2,
+                     'Electives': 'T', 'Basket': 'B3'},
+                ]).to_csv(os.path.join(tmp, f'Even {dept}.csv'), index=False)
+            core = SchedulingCore(SchedulerConfig(csv_folder=tmp))
+            groups = [('DSAI', 2, 'A'), ('ECE', 2, 'A')]
+            contexts = core.generate_all(groups)
+        
+        slots = [sorted((day, t) for day, row in ctx.timetable.items() for t, cell in row.items()
+                        if cell == 'Elective (B3)') for ctx in contexts.values()]
+        self.assertEqual(len(slots[0]), 2)
+        self.assertEqual(slots[0], slots[1])
+        for day, time_str in slots[0]:
+            booked = core.state.global_classroom_usage[day][time_str]
+            self.assertEqual({room: r['course'] for room, r in booked.items()}, {'C302': 'DSAI1', 'C303': 'ECE1'})
+            self.assertEqual(booked['C302']['cohort'], groups)
+        for ctx in contexts.values():
+            self.assertEqual(ctx.unscheduled_courses, [])
+            self.assertEqual(ctx.planned_baskets, {'B3'})
+        
+        print("✓ Test 1.14.2 passed: Basket placed once with every course room reserved")
+
+    def test_cohort_lectures_leave_labs_room(self):
+        """Test Case 1.14.3: Baskets and shared offerings placed first do not push out any core lab"""
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        contexts = TimetableGenerator(csv_folder=csv_folder).generate_all(select_groups())
+
+        labs = [(group, item) for group, ctx in contexts.items() if ctx
+                for item in ctx.unscheduled_courses if ' - Lab' in item]
+        self.assertEqual(labs, [])
+
+        print("✓ Test 1.14.3 passed: Every core lab placed on the shipped inputs")
+
+    def test_evening_only_when_flex_is_taken(self):
+        """Test Case 1.14.4: No session goes to the evening on a day its sections still share a Free flex slot"""
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        generator = TimetableGenerator(csv_folder=csv_folder)
+        contexts = generator.generate_all(select_groups())
+        flex = [slot.key for slot in generator.config.time_model.fits(generator.config.lecture_minutes, ('flex',))]
+
+        # A cohort or basket session has the same cell in every section attending it
+        evening = {}
+        for ctx in contexts.values():
+            for day, row in (ctx.timetable.items() if ctx else ()):
+                for time_str, cell in row.items():
+                    if '[EVENING]' in cell:
+                        evening.setdefault((day, time_str, cell), []).append(ctx)
+        self.assertTrue(evening)
+        misplaced = [(key, [(m.department, m.semester, m.section) for m in members])
+                     for key, members in evening.items()
+                     if any(all(m.timetable[key[0]][slot] == 'Free' for m in members) for slot in flex)]
+        self.assertEqual(misplaced, [])
+
+        print("✓ Test 1.14.4 passed: Evening used only when no flexible slot is free")
+
+
+class TestRoomAssignment(unittest.TestCase):
+    """Test cases for capacity-aware room assignment"""
+    
+    def test_best_fit_order(self):
+        """Test Case 1.15.1: Rooms are ranked by capacity fit and alternatives are never smaller"""
+        catalog = RoomCatalog({'C004': 240, 'C101': 96, 'C102': 96, 'C403': 78})
+        self.assertEqual(catalog.best_fit(90), ['C101', 'C102', 'C004', 'C403'])
+        self.assertEqual(catalog.best_fit(300), ['C004', 'C101', 'C102', 'C403'])
+        self.assertEqual(catalog.best_fit(80, pool=['C004', 'C102', 'C403', 'C103']), ['C102', 'C004', 'C403', 'C103'])
+        
+        assigner = RoomAssigner(catalog, {('CSE', 2, 'A'): 70, ('CSE', 2, 'B'): 90}, reserved=('C004',))
+        self.assertEqual(assigner.cohort_size([('CSE', 2, 'A'), ('CSE', 2, 'B')]), 160)
+        self.assertEqual(assigner.cohort_size([('ECE', 2, 'A')]), 0)
+        self.assertEqual(assigner.large_room_order([('CSE', 2, 'A'), ('CSE', 2, 'B')], ['C101', 'C004']),
+                         ('C004', 'C101'))
+        self.assertEqual(assigner.alternatives('C101'), ('C102',))
+        self.assertEqual(assigner.alternatives('C403', [('CSE', 2, 'A')]), ('C101', 'C102'))
+        self.assertEqual(assigner.alternatives('Online'), ())
+        
+        print("✓ Test 1.15.1 passed: Best-fit room ranking")
+    
+    def test_busy_room_reassigned(self):
+        """Test Case 1.15.2: A section course moves to a free room as large as its busy nominated one"""
+        with tempfile.TemporaryDirectory() as tmp:
+            pd.DataFrame([
+                {'Course Code': 'CS101', 'Course Title': 'Core', 'Lectures': 2, 'Tutorials': 0, 'Practicals': 0,
+                 'Faculty': 'Dr. A', 'Classroom': 'C302', 'Semester': 2, 'Electives': 'F', 'Section': '2A'},
+            ]).to_csv(os.path.join(tmp, 'Even CSE.csv'), index=False)
+            capacities = os.path.join(tmp, 'classroom.csv')
+            pd.DataFrame({'ID': ['C302', 'C303', 'C403'], 'Seating Capacity': [96, 96, 78]}).to_csv(
+                capacities, index=False)
+            config = SchedulerConfig(csv_folder=tmp, room_capacity_file=capacities, enrolment_file='')
+            
+            # C302 is booked all week
+            state = ScheduleState()
+            for day in config.weekdays:
+                for time_slot in config.time_slots:
+                    state.record_usage(day, f"{time_slot[0]}-{time_slot[1]}", 'C302', {'course': 'OTHER'})
+            ctx = SchedulingCore(config, state).generate_context('CSE', 2, 'A')
+            rooms = {e['room'] for slots in ctx.used_slots.values() for entries in slots.values()
+                     for e in entries.values()}
+            self.assertEqual(ctx.unscheduled_courses, [])
+            self.assertEqual(rooms, {'C303'})
+            
+            # Without reassignment the course has nowhere to go
+            blocked = SchedulingCore(config.with_changes(reassign_busy_rooms=False), state.snapshot())
+            self.assertEqual(len(blocked.generate_context('CSE', 2, 'A').unscheduled_courses), 2)
+        
+        print("✓ Test 1.15.2 passed: Busy nominated room replaced by a free one")
+
+
+class TestFreeRoomPools(unittest.TestCase):
+    """Test cases for the per-slot free-room bitmask pools"""
+    
+    def test_pool_first_free(self):
+        """Test Case 1.16.1: The most preferred room whose bit is clear is returned"""
+        pool = RoomPool(('C004', 'C101', 'C102'))
+        self.assertEqual(pool.first_free(0), 'C004')
+        self.assertEqual(pool.first_free(pool.mask(['C004', 'Lab-1'])), 'C101')
+        self.assertIsNone(pool.first_free(pool.mask(pool.rooms)))
+        self.assertIsNone(RoomPool(()).first_free(0))
+        
+        print("✓ Test 1.16.1 passed: Pool lookup by lowest clear bit")
+    
+    def test_pools_follow_ledger(self):
+        """Test Case 1.16.2: Bookings, releases and snapshots keep the pools in step with the ledger"""
+        state = ScheduleState()
+        labs = ('Lab-1', 'Lab-2', 'Lab-3')
+        state.record_usage('Monday', '14:30-16:30', 'Lab-1', {'course': 'CS101'})
+        self.assertEqual(state.first_free(labs, 'Monday', '14:30-16:30'), 'Lab-2')  # Mask built from the ledger
+        state.record_usage('Monday', '14:30-16:30', 'Lab-2', {'course': 'CS102'})
+        self.assertEqual(state.first_free(labs, 'Monday', '14:30-16:30'), 'Lab-3')
+        self.assertIsNone(state.first_free(labs, 'Monday', '14:30-16:30', exclude=('Lab-3',)))
+        
+        fork = state.snapshot()
+        state.release_usage('Monday', '14:30-16:30', 'Lab-1')
+        fork.record_usage('Monday', '14:30-16:30', 'Lab-3', {'course': 'CS103'})
+        self.assertEqual(state.first_free(labs, 'Monday', '14:30-16:30'), 'Lab-1')
+        self.assertIsNone(fork.first_free(labs, 'Monday', '14:30-16:30'))
+        self.assertEqual(state.first_free(labs, 'Tuesday', '14:30-16:30'), 'Lab-1')
+        
+        print("✓ Test 1.16.2 passed: Free-room pools track the ledger")
+
+    def test_reserve_from_threads(self):
+        """Test Case 1.16.3: Threads reserving rooms in one slot never get the same room"""
+        state = ScheduleState()
+        rooms = tuple(f"C{100 + i}" for i in range(16))
+        state.reserve_all('Monday', '08:00-09:30', [('C100', {'course': 'X'})])
+        self.assertFalse(state.reserve_all('Monday', '08:00-09:30', [('C101', {}), ('C100', {})]))
+        self.assertFalse(state.is_room_taken('Monday', '08:00-09:30', 'C101'))  # All or nothing
+
+        barrier = threading.Barrier(18)
+        won = []
+
+        def reserve(n):
+            barrier.wait()
+            for time_str in ('09:00-10:30', '10:45-12:15', '13:15-14:45'):
+                room = state.reserve_first_free(rooms, 'Tuesday', time_str, {'course': n})
+                if room is not None:
+                    won.append((time_str, room, n))
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=reserve, args=(n,)) for n in range(18)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(len(won), 3 * len(rooms))
+        self.assertEqual(len({(time_str, room) for time_str, room, _ in won}), len(won))
+        for time_str, room, n in won:
+            self.assertEqual(state.booking('Tuesday', time_str, room), {'course': n})
+
+        print("✓ Test 1.16.3 passed: Check-and-book is atomic")
+
+
+class TestDiagnostics(unittest.TestCase):
+    """Test cases for unscheduled-session diagnostics"""
+    
+    def test_smallest_blocking_set(self):
+        """Test Case 1.17.1: The cheapest slot's blockers form the blocking set"""
+        diagnosis = SessionDiagnosis([('CSE', 2, 'A')], 'CS101', 'Lecture 1')
+        diagnosis.add_probe('Monday', '08:00-09:30', {('group_busy', 'a'), ('room_busy', 'b')})
+        diagnosis.add_probe('Tuesday', '08:00-09:30', {('room_busy', 'c')})
+        diagnosis.add_probe('Wednesday', '08:00-09:30', {('daily_limit', 'd')})
+        self.assertEqual(diagnosis.probes, 3)
+        self.assertEqual(diagnosis.reasons, {'room_busy': 2, 'group_busy': 1, 'daily_limit': 1})
+        self.assertEqual(diagnosis.blocking_set, [('room_busy', 'c')])
+        self.assertEqual(diagnosis.summary(), 'Tuesday 08:00-09:30: c')
+        
+        ctx = GenerationContext('CSE', 2, 'A', ['Monday'], [('08:00', '09:30')], ('13:00', '14:30'))
+        other = GenerationContext('CSE', 2, 'B', ['Monday'], [('08:00', '09:30')], ('13:00', '14:30'))
+        ctx.diagnoses['CS101 - Lecture 1'] = other.diagnoses['CS101 - Lecture 1'] = diagnosis
+        report = DiagnosticsReport.from_contexts([ctx, other, None])
+        self.assertEqual(report.to_dict()['unscheduled_sessions'], 1)
+        self.assertEqual(report.reason_totals()['room_busy'], 2)
+        
+        print("✓ Test 1.17.1 passed: Smallest blocking set chosen")
+    
+    def test_unscheduled_session_explained(self):
+        """Test Case 1.17.2: A session over the weekly capacity is blamed on the per-day limit"""
+        with tempfile.TemporaryDirectory() as tmp:
+            pd.DataFrame([
+                {'Course Code': 'CS101', 'Course Title': 'Core', 'Lectures': 6, 'Tutorials': 0, 'Practicals': 0,
+                 'Faculty': 'Dr. A', 'Classroom': 'C302', 'Semester': 2, 'Electives': 'F', 'Section': '2A'},
+            ]).to_csv(os.path.join(tmp, 'Even CSE.csv'), index=False)
+            core = SchedulingCore(SchedulerConfig(csv_folder=tmp, diagnose_unscheduled=True))
+            ctx = core.generate_context('CSE', 2, 'A')
+            plain = SchedulingCore(SchedulerConfig(csv_folder=tmp)).generate_context('CSE', 2, 'A')
+        
+        self.assertEqual(plain.diagnoses, {})  # Opt-in
+        self.assertEqual(ctx.unscheduled_courses, ['CS101 - Lecture 6'])
+        diagnosis = ctx.diagnoses['CS101 - Lecture 6']
+        self.assertEqual(diagnosis.reasons['daily_limit'], diagnosis.probes)
+        self.assertEqual(len(diagnosis.blocking_set), 1)
+        self.assertEqual(diagnosis.blocking_set[0][0], 'daily_limit')
+        
+        print("✓ Test 1.17.2 passed: Unscheduled session explained")
+
+
+class TestPipeline(unittest.TestCase):
+    """Test cases for pipelined generation and export"""
+    
+    def setUp(self):
+        self.csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator',
+                                       'input_files', 'sdtt_inputs')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.groups = [('CSE', 2, 'A'), ('CSE', 2, 'B'), ('DSAI', 4, 'A')]
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_pipeline_matches_batch_run(self):
+        """Test Case 1.18.1: Pipelined run writes every CSV and HTML file and matches generate_all"""
+        out = os.path.join(self.tmp.name, 'csv')
+        html = os.path.join(self.tmp.name, 'html')
+        generator = TimetableGenerator(csv_folder=self.csv_folder, output_dir=out)
+        converter = TimetableHTMLConverter(input_dir=out, output_dir=html, config=generator.config)
+        pipeline = GenerationPipeline(generator, converter, queue_size=1)
+        contexts = pipeline.run(self.groups)
+        
+        batch = TimetableGenerator(csv_folder=self.csv_folder).generate_all(self.groups)
+        self.assertEqual([c.timetable for c in contexts], [batch[g].timetable for g in self.groups])
+        self.assertEqual(len(pipeline.converted), 3)
+        for ctx in contexts:
+            stem = f"{ctx.department}_Sem{ctx.semester}_Section{ctx.section}_Timetable"
+            self.assertTrue(os.path.exists(os.path.join(out, stem + '.csv')))
+            self.assertTrue(os.path.exists(os.path.join(html, stem + '.html')))
+        with open(os.path.join(html, 'index.html'), encoding='utf-8') as f:
+            self.assertIn('DSAI_Sem4_SectionA_Timetable.html', f.read())
+        
+        print("✓ Test 1.18.1 passed: Pipelined run matches batch generation")
+    
+    def test_stage_failure_surfaces(self):
+        """Test Case 1.18.2: A failing stage drains its queue and the error reaches the caller"""
+        generator = TimetableGenerator(csv_folder=self.csv_folder, output_dir=self.tmp.name)
+        converter = TimetableHTMLConverter(input_dir=self.tmp.name, output_dir=self.tmp.name, config=generator.config)
+        
+        def broken(csv_file, html_file):
+            raise RuntimeError('conversion failed')
+        converter.csv_to_html = broken
+        
+        with self.assertRaises(RuntimeError):
+            GenerationPipeline(generator, converter, queue_size=1).run(self.groups)
+        
+        print("✓ Test 1.18.2 passed: Stage failure surfaced without blocking")
+
+
+class TestCheckpoints(unittest.TestCase):
+    """Test cases for stage checkpoints and resume"""
+    
+    def test_store_resumes_completed_stage(self):
+        """Test Case 1.19.1: A saved stage is loaded instead of recomputed; new inputs start over"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'input.csv')
+            with open(source, 'w') as f:
+                f.write('a,b\n1,2\n')
+            key = fingerprint([source], extra=('setting', 1))
+            calls = []
+            
+            def compute():
+                calls.append(1)
+                return {'rows': 1}
+            
+            root = os.path.join(tmp, 'ckpt')
+            self.assertEqual(CheckpointStore(root, 'timetable', key).stage('generate', compute), {'rows': 1})
+            self.assertEqual(CheckpointStore(root, 'timetable', key).stage('generate', compute), {'rows': 1})
+            self.assertEqual(len(calls), 1)
+            self.assertEqual([n for n in os.listdir(os.path.join(root, 'timetable', key))], ['generate.pkl'])
+            
+            with open(source, 'a') as f:
+                f.write('3,4\n')
+            changed = fingerprint([source], extra=('setting', 1))
+            self.assertNotEqual(changed, key)
+            CheckpointStore(root, 'timetable', changed).stage('generate', compute)
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(os.listdir(os.path.join(root, 'timetable')), [changed])  # Stale inputs pruned
+            
+            disabled = CheckpointStore(root, 'timetable', changed, enabled=False)
+            disabled.stage('generate', compute)
+            self.assertEqual(len(calls), 3)
+        
+        print("✓ Test 1.19.1 passed: Completed stage resumed from checkpoint")
+    
+    def test_generation_state_round_trips(self):
+        """Test Case 1.19.2: Contexts and the room ledger survive a checkpoint and keep working"""
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        generator = TimetableGenerator(csv_folder=csv_folder)
+        contexts = generator.generate_all([('CSE', 2, 'A')])
+        ctx, state = pickle.loads(pickle.dumps((contexts[('CSE', 2, 'A')], generator.core.state)))
+        
+        self.assertEqual(ctx.timetable, contexts[('CSE', 2, 'A')].timetable)
+        self.assertEqual(state.global_classroom_usage, generator.core.state.global_classroom_usage)
+        state.record_usage('Monday', '08:00-09:30', 'Lab-9', {'course': 'X'})  # Lock recreated
+        self.assertEqual(state.first_free(('Lab-9', 'Lab-8'), 'Monday', '08:00-09:30'), 'Lab-8')
+        self.assertEqual(generator.core.input_fingerprint(), TimetableGenerator(csv_folder=csv_folder).core.input_fingerprint())
+        
+        print("✓ Test 1.19.2 passed: Generation state checkpointed")
+
+class TestScheduleStore(unittest.TestCase):
+    """Test cases for the SQLite schedule store"""
+    
+    def setUp(self):
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        self.generator = TimetableGenerator(csv_folder=csv_folder)
+        self.contexts = self.generator.generate_all([('CSE', 6, 'A'), ('CSE', 6, 'B')])
+    
+    def test_store_round_trips_timetables(self):
+        """Test Case 1.20.1: Grids, electives and room bookings read back as generated"""
+        with tempfile.TemporaryDirectory() as tmp, ScheduleStore(os.path.join(tmp, 'schedule.db')) as store:
+            store.write_timetables(self.contexts.values(), self.generator.global_classroom_usage)
+            store.write_timetables(self.contexts.values(), self.generator.global_classroom_usage)  # Replaces
+            
+            self.assertEqual(store.conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(store.sections(), [('CSE', 6, 'A'), ('CSE', 6, 'B')])
+            ctx = self.contexts[('CSE', 6, 'A')]
+            grid = store.timetable_grid('CSE', 6, 'A')
+            self.assertEqual(grid.index, list(ctx.timetable))
+            self.assertEqual(grid.rows, Grid.from_nested(ctx.timetable).rows)
+            self.assertTrue(ctx.elective_courses)
+            listed = lambda baskets: {basket: [(c['code'], c['title'], c['classroom']) for c in courses]
+                                      for basket, courses in baskets.items()}
+            electives, rotated_out = store.electives('CSE', 6, 'A')
+            self.assertEqual(listed(electives), listed(ctx.elective_courses))
+            self.assertEqual(listed(rotated_out), listed(ctx.rotated_out_electives))
+            
+            ledger = self.generator.global_classroom_usage
+            day, slots = next((d, s) for d, s in ledger.items() if s)
+            slot, rooms = next(iter(slots.items()))
+            room = next(iter(rooms))
+            booking = store.room_bookings(room=room, day=day, slot=slot)[0]
+            self.assertEqual(booking['course'], rooms[room]['course'])
+            self.assertTrue(store.faculty_bookings(booking['faculty']))
+            # Same people and sessions as the faculty views, co-taught cells and spelling variants included
+            views = LedgerViewIndex(ledger)
+            for faculty in views.faculty():
+                if faculty != 'Unknown':
+                    self.assertEqual(len(store.faculty_bookings(faculty)), len(views.faculty_schedule(faculty)), faculty)
+            plan = store.conn.execute('EXPLAIN QUERY PLAN SELECT * FROM room_bookings WHERE faculty = ?', ('x',)).fetchall()
+            self.assertIn('idx_bookings_faculty', ' '.join(str(tuple(row)) for row in plan))
+        
+        print("✓ Test 1.20.1 passed: Timetables stored and queried")
+    
+    def test_html_from_store_matches_csv(self):
+        """Test Case 1.20.2: A timetable page rendered from the store equals the one rendered from its CSV"""
+        with tempfile.TemporaryDirectory() as tmp:
+            # The section's CSV and _Electives.txt, as export_to_csv writes them
+            timetable, electives, rotated_out = self.contexts[('CSE', 6, 'A')].result()
+            pd.DataFrame(timetable).T.to_csv(os.path.join(tmp, 'CSE_Sem6_SectionA_Timetable.csv'), index=True, encoding='utf-8')
+            if electives:
+                write_electives_file(os.path.join(tmp, 'CSE_Sem6_SectionA_Timetable_Electives.txt'), electives, rotated_out)
+            converter = TimetableHTMLConverter(input_dir=tmp, output_dir=os.path.join(tmp, 'html'))
+            from_csv, from_store = os.path.join(tmp, 'csv.html'), os.path.join(tmp, 'store.html')
+            with contextlib.redirect_stdout(StringIO()):
+                self.assertTrue(converter.csv_to_html(os.path.join(tmp, 'CSE_Sem6_SectionA_Timetable.csv'), from_csv))
+                with ScheduleStore(os.path.join(tmp, 'schedule.db')) as store:
+                    store.write_timetables(self.contexts.values(), self.generator.global_classroom_usage)
+                    self.assertTrue(converter.store_to_html(store, ('CSE', 6, 'A'), from_store))
+            with open(from_csv, encoding='utf-8') as a, open(from_store, encoding='utf-8') as b:
+                self.assertEqual(a.read(), b.read())
+        
+        print("✓ Test 1.20.2 passed: HTML rendered from the schedule store")
+
+class TestCsvCodec(unittest.TestCase):
+    """Test cases for the stdlib CSV codec that replaces pandas on the light paths"""
+    
+    def test_records_typed_like_pandas(self):
+        """Test Case 1.21.1: Records match read_csv(...).to_dict('records') on typed columns"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rooms.csv')
+            with open(path, 'w') as f:
+                f.write('ID,Seating Capacity,Ratio,Note\nC101,96,1.5,"a, b"\nC102,78,2,\n')
+            records = read_records(path)
+            expected = pd.read_csv(path).to_dict('records')
+        
+        self.assertEqual([r['Seating Capacity'] for r in records], [96, 78])
+        self.assertIsInstance(records[0]['Seating Capacity'], int)
+        self.assertEqual([r['Ratio'] for r in records], [1.5, 2.0])
+        self.assertEqual(records[0]['Note'], 'a, b')
+        self.assertIsNone(records[1]['Note'])  # pandas: NaN
+        self.assertTrue(pd.isna(expected[1]['Note']))
+        self.assertEqual([{k: v for k, v in r.items() if k != 'Note'} for r in records],
+                         [{k: v for k, v in r.items() if k != 'Note'} for r in expected])
+        
+        print("✓ Test 1.21.1 passed: CSV records typed per column")
+    
+    def test_grid_matches_pandas_csv(self):
+        """Test Case 1.21.2: write_grid writes what DataFrame(timetable).T.to_csv wrote, and reads back"""
+        timetable = {
+            'Monday': {'09:00-10:30': 'CS101 (Lecture)\nC101', '10:45-12:15': 'Free', '12:15-13:15': 'LUNCH BREAK'},
+            'Tuesday': {'09:00-10:30': 'Free', '10:45-12:15': 'MA101, "Tutorial"', '12:15-13:15': 'LUNCH BREAK'},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            ours, theirs = os.path.join(tmp, 'ours.csv'), os.path.join(tmp, 'theirs.csv')
+            write_grid(ours, Grid.from_nested(timetable))
+            pd.DataFrame(timetable).T.to_csv(theirs, index=True, encoding='utf-8')
+            with open(ours, 'rb') as a, open(theirs, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+            grid = read_grid(ours)
+        
+        self.assertEqual(grid.index, ['Monday', 'Tuesday'])
+        self.assertEqual(grid.columns, list(timetable['Monday']))
+        self.assertEqual(grid.cell('Tuesday', '10:45-12:15'), 'MA101, "Tutorial"')
+        
+        print("✓ Test 1.21.2 passed: Timetable grid CSV round-trips")
+
+class TestPartialRuns(unittest.TestCase):
+    """Test cases for regenerating a slice of the institute against the stored ledger"""
+    
+    def test_partial_run_keeps_other_bookings(self):
+        """Test Case 1.22.1: A section is regenerated with its cohort; other sections' rooms stay booked"""
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        groups = select_groups(semesters=[2, 4])
+        full = TimetableGenerator(csv_folder=csv_folder)
+        contexts = full.generate_all(groups)
+        
+        with tempfile.TemporaryDirectory() as tmp, ScheduleStore(os.path.join(tmp, 'schedule.db')) as store:
+            store.write_timetables(contexts.values(), full.global_classroom_usage)
+            owners = lambda: {(row['department'], row['semester'], row['section']) for row in store.room_bookings()}
+            before = owners()
+            
+            partial = TimetableGenerator(csv_folder=csv_folder)
+            closure = partial.core.cohort_closure([('CSE', 2, 'A')], groups)
+            self.assertIn(('CSE', 2, 'B'), closure)  # Shares the Semester 2 common courses
+            self.assertTrue(all(group[1] == 2 for group in closure))
+            kept = store.ledger(exclude=closure)
+            partial.core.state.seed(kept)
+            regenerated = partial.generate_all(closure)
+            
+            # No kept booking was overwritten by the regenerated sections
+            for day, slots in kept.items():
+                for time_str, rooms in slots.items():
+                    for room, record in rooms.items():
+                        self.assertEqual(partial.global_classroom_usage[day][time_str][room]['course'], record['course'])
+            
+            store.write_timetables(regenerated.values(), partial.global_classroom_usage, sections=closure)
+            self.assertEqual(store.sections(), sorted(groups))
+            sem4 = [row for row in store.room_bookings() if row['semester'] == 4]
+            self.assertEqual(len(sem4), sum(1 for booking in ledger_bookings(full) if booking[1] == 4))
+            self.assertEqual(owners(), before)
+        
+        print("✓ Test 1.22.1 passed: Partial run regenerated its cohort only")
+    
+    def test_cli_selectors(self):
+        """Test Case 1.22.2: CLI selectors narrow the groups and parse per subcommand"""
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+        import cli
+        
+        args = cli.build_parser().parse_args(['timetable', '--dept', 'CSE', 'ECE', '--sem', '4', '--section', 'A'])
+        self.assertEqual(cli._groups(args), [('CSE', 4, 'A'), ('ECE', 4, 'A')])
+        self.assertIsNone(cli._groups(cli.build_parser().parse_args(['timetable'])))
+        exam = cli.build_parser().parse_args(['exam', '--date', '15/04/2025', '--session', 'FN', '--room', 'C101'])
+        self.assertEqual((exam.date, exam.session, exam.room), (['15/04/2025'], ['FN'], ['C101']))
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(StringIO()):
+            cli.build_parser().parse_args(['exam', '--session', 'XX'])
+        self.assertEqual(len(select_groups()), 18)
+        self.assertEqual(what_if.DEFAULT_GROUPS, tuple(select_groups()))
+        
+        # Without the store a slice would overwrite the shared outputs as if it were the whole institute
+        import main
+        db = os.environ.pop(DB_ENV, None)
+        try:
+            with self.assertRaises(SystemExit):
+                main.main([('CSE', 4, 'A')])
+        finally:
+            if db is not None:
+                os.environ[DB_ENV] = db
+        
+        print("✓ Test 1.22.2 passed: CLI selectors parsed")
+
+
+class TestWatchMode(unittest.TestCase):
+    """Test cases for input change detection and the sections an edit affects"""
+    
+    def test_watcher_and_parsed_cache(self):
+        """Test Case 1.23.1: Only content changes are reported; unchanged files are not parsed again"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'courses.csv')
+            with open(path, 'w') as f:
+                f.write("Course Code,Semester\nCS101,2\n")
+            watcher = InputWatcher([path, os.path.join(tmp, 'missing.csv')])
+            cache = ParsedInputCache()
+            parses = []
+            
+            def parse(p):
+                parses.append(p)
+                return read_records(p)
+            
+            self.assertEqual(cache.get(path, parse), [{'Course Code': 'CS101', 'Semester': 2}])
+            self.assertEqual(watcher.poll(), [])
+            
+            # Touched but unchanged: no change, no reparse
+            os.utime(path, ns=(1, 1))
+            self.assertEqual(watcher.poll(), [])
+            cache.get(path, parse)
+            self.assertEqual(len(parses), 1)
+            
+            with open(path, 'a') as f:
+                f.write("CS102,4\n")
+            self.assertEqual(watcher.poll(), [path])
+            self.assertEqual(watcher.poll(), [])
+            self.assertEqual(len(cache.get(path, parse)), 2)
+            self.assertEqual(len(parses), 2)
+            
+            open(os.path.join(tmp, 'missing.csv'), 'w').close()
+            self.assertEqual(watcher.poll(), [os.path.join(tmp, 'missing.csv')])
+        
+        print("✓ Test 1.23.1 passed: Watcher reports content changes only")
+    
+    def test_changed_groups(self):
+        """Test Case 1.23.2: An edited course row maps to its section, or to every section of its semester"""
+        csv_file = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files',
+                                'sdtt_inputs', 'Even CSE.csv')
+        before = pd.read_csv(csv_file)
+        self.assertEqual(changed_groups('CSE', before, before.copy()), [])
+        
+        edited = before.copy()
+        row = edited.index[edited['Section'] == '4A'][0]
+        edited.loc[row, 'Faculty'] = 'Dr. New Faculty'
+        self.assertEqual(changed_groups('CSE', before, edited), [('CSE', 4, 'A')])
+        
+        # A common course (no section) of Semester 6 is taught to both sections
+        edited = before.copy()
+        row = edited.index[(edited['Semester'] == 6) & edited['Section'].isna()][0]
+        edited.loc[row, 'Classroom'] = 'C101'
+        self.assertEqual(changed_groups('CSE', before, edited), [('CSE', 6, 'A'), ('CSE', 6, 'B')])
+        
+        # Reordering changes the scheduling order; a new column touches every group
+        self.assertEqual(changed_groups('CSE', before, before.iloc[::-1]), select_groups(['CSE']))
+        self.assertEqual(changed_groups('CSE', before, before.assign(Notes='')), select_groups(['CSE']))
+        
+        print("✓ Test 1.23.2 passed: Edits mapped to the affected sections")
+
+
+class TestStudentTimetables(unittest.TestCase):
+    """Test cases for personal (section + chosen electives) timetables"""
+    
+    def setUp(self):
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        self.generator = TimetableGenerator(csv_folder=csv_folder)
+        self.contexts = self.generator.generate_all([('CSE', 6, 'A'), ('CSE', 6, 'B')])
+        electives = self.contexts[('CSE', 6, 'A')].elective_courses
+        self.basket = sorted(electives)[0]
+        self.course = electives[self.basket][-1]
+        self.students = [{'roll_number': f'22BCS10{i}', 'department': 'CSE', 'semester': 'Sem6', 'section': 'A',
+                          'student_name': f'Student {i}'} for i in range(3)]
+        self.students.append({'roll_number': '22BCS200', 'department': 'CSE', 'semester': 'Sem8', 'section': 'A',
+                              'student_name': 'No timetable'})
+        # Two students pick the same course; the third has no choices
+        self.choices = {'22BCS100': [self.course['code']], '22BCS101': [self.course['code'], 'XX999']}
+    
+    def test_electives_replace_placeholders(self):
+        """Test Case 1.24.1: A chosen course takes its basket's slots; choice sets share one encoding"""
+        timetables = StudentTimetables.from_contexts(self.contexts.values(), students=self.students,
+                                                     choices=self.choices)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'students.jsonl')
+            self.assertEqual(timetables.write_jsonl(path), 3)
+            with open(path) as f:
+                rows = [json.loads(line) for line in f]
+        
+        chose, same, none = rows
+        self.assertEqual(chose['electives'], {self.basket: self.course['code']})
+        self.assertEqual(chose['sessions'], same['sessions'])
+        placeholder = f"Elective ({self.basket})"
+        self.assertTrue(any(cell.startswith(placeholder) for _, _, cell in none['sessions']))
+        self.assertFalse(any(cell.startswith(placeholder) for _, _, cell in chose['sessions']))
+        picked = [cell for _, _, cell in chose['sessions'] if cell.startswith(self.course['code'])]
+        self.assertEqual(len(picked), sum(cell.startswith(placeholder) for _, _, cell in none['sessions']))
+        self.assertNotIn('Free', [cell for _, _, cell in none['sessions']])
+        # Rendered once per section and choice set, not per student
+        self.assertEqual(len(timetables.sections[('CSE', 6, 'A')]._sessions), 2)
+        
+        print("✓ Test 1.24.1 passed: Personal timetables merge the chosen electives")
+    
+    def test_store_source_and_pages(self):
+        """Test Case 1.24.2: The schedule store gives the same timetables; pages carry the student's name"""
+        with tempfile.TemporaryDirectory() as tmp, ScheduleStore(os.path.join(tmp, 'schedule.db')) as store:
+            store.write_timetables(self.contexts.values(), self.generator.global_classroom_usage)
+            outputs = []
+            for timetables in (StudentTimetables.from_contexts(self.contexts.values(), students=self.students,
+                                                               choices=self.choices),
+                               StudentTimetables.from_store(store, students=self.students, choices=self.choices)):
+                path = os.path.join(tmp, f'students{len(outputs)}.jsonl')
+                timetables.write_jsonl(path)
+                with open(path) as f:
+                    outputs.append(f.read())
+            self.assertEqual(outputs[0], outputs[1])
+            
+            html_dir = os.path.join(tmp, 'students')
+            self.assertEqual(timetables.write_html(html_dir), 3)
+            with open(os.path.join(html_dir, '22BCS100_SectionA.html'), encoding='utf-8') as f:
+                page = f.read()
+        self.assertIn('22BCS100 - Student 0', page)
+        # The chosen course's basket lists only that course
+        self.assertIn(f"<strong>{self.course['code']}: ", page)
+        others = self.contexts[('CSE', 6, 'A')].elective_courses[self.basket][:-1]
+        self.assertFalse(any(f"<strong>{course['code']}: " in page for course in others))
+        self.assertIn('href="../index.html"', page)
+        
+        print("✓ Test 1.24.2 passed: Store-backed personal timetables and pages")
+
+
+class TestCalendarExport(unittest.TestCase):
+    """Test cases for the iCalendar feeds built from the schedule store"""
+    
+    def setUp(self):
+        csv_folder = os.path.join(os.path.dirname(__file__), '..', 'timetable_generator', 'input_files', 'sdtt_inputs')
+        self.generator = TimetableGenerator(csv_folder=csv_folder)
+        self.contexts = self.generator.generate_all([('CSE', 6, 'A'), ('CSE', 6, 'B')])
+        self.students = [{'roll_number': '22BCS100', 'department': 'CSE', 'semester': 'Sem6', 'section': 'A',
+                          'student_name': 'Student 0'}]
+        self.exam = {'date': '21/04/2025', 'day': 'Monday', 'session': 'FN', 'time': '10:00 - 13:00',
+                     'course_code': 'CS304', 'course_name': 'Compiler Design', 'department': 'CSE',
+                     'semester': 'Sem6', 'student_count': 1, 'classrooms': ['C101']}
+        seat = {'roll_number': '22BCS100', 'department': 'CSE', 'semester': 'Sem6', 'section': 'A'}
+        self.plan = {'exam_date': '21/04/2025', 'session': 'FN', 'course_code': 'CS304', 'classroom': 'C101',
+                     'assigned_students': [seat], 'seating_matrix': [[None, None], [None, seat]]}
+    
+    def _export(self, store, output_dir):
+        exporter = CalendarExporter(store, students=StudentTimetables.from_store(
+            store, students=self.students, choices={}))
+        counts = exporter.export_all(output_dir)
+        feeds = {}
+        for root, _, files in os.walk(output_dir):
+            for name in files:
+                with open(os.path.join(root, name), 'rb') as f:
+                    feeds[os.path.relpath(os.path.join(root, name), output_dir)] = f.read()
+        return exporter, counts, feeds
+    
+    def test_weekly_events_and_exams(self):
+        """Test Case 1.25.1: One weekly RRULE event per session, exams as dated events, valid folded lines"""
+        with tempfile.TemporaryDirectory() as tmp, ScheduleStore(os.path.join(tmp, 'schedule.db')) as store:
+            store.write_timetables(self.contexts.values(), self.generator.global_classroom_usage)
+            store.write_exams([self.exam], [self.plan])
+            exporter, counts, feeds = self._export(store, os.path.join(tmp, 'calendars'))
+            grid = store.timetable_grid('CSE', 6, 'A')
+        
+        self.assertEqual((counts['sections'], counts['students']), (2, 1))
+        # The term runs until the day before the first exam
+        self.assertEqual(exporter.term.end.isoformat(), '2025-04-20')
+        section = feeds[os.path.join('sections', 'CSE_Sem6_SectionA.ics')].decode('utf-8')
+        sessions = sum(len(cell_sessions(cell, slot)) for cells in grid.rows.values()
+                       for slot, cell in zip(grid.columns, cells))
+        self.assertGreater(sessions, 0)
+        self.assertEqual(section.count('RRULE:FREQ=WEEKLY;UNTIL=20250420T182959Z'), sessions)
+        self.assertEqual(section.count('BEGIN:VEVENT'), sessions + 1)
+        self.assertIn('DTSTART;TZID=Asia/Kolkata:20250421T100000', section)
+        self.assertTrue(section.startswith('BEGIN:VCALENDAR\r\n') and section.endswith('END:VCALENDAR\r\n'))
+        for feed in feeds.values():
+            self.assertTrue(all(len(line) <= 75 for line in feed.split(b'\r\n')))
+        
+        student = feeds[os.path.join('students', '22BCS100_SectionA.ics')].decode('utf-8')
+        self.assertIn('SUMMARY:Exam: CS304 Compiler Design', student)
+        self.assertIn('DESCRIPTION:Row 2\\, Seat 2', student)
+        self.assertIn('Exam: CS304', feeds[os.path.join('rooms', 'C101.ics')].decode('utf-8'))
+        # Folding never splits a multi-byte character
+        folded = fold('SUMMARY:' + 'é' * 60)
+        self.assertEqual(''.join(folded.split('\r\n ')), 'SUMMARY:' + 'é' * 60 + '\r\n')
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in folded.split('\r\n')))
+        
+        print("✓ Test 1.25.1 passed: Weekly and exam events in the calendar feeds")
+    
+    def test_deterministic_feeds(self):
+        """Test Case 1.25.2: Re-exporting an unchanged schedule writes byte-identical feeds with unique UIDs"""
+        with tempfile.TemporaryDirectory() as tmp, ScheduleStore(os.path.join(tmp, 'schedule.db')) as store:
+            store.write_timetables(self.contexts.values(), self.generator.global_classroom_usage)
+            store.write_exams([self.exam], [self.plan])
+            _, _, first = self._export(store, os.path.join(tmp, 'first'))
+            _, _, second = self._export(store, os.path.join(tmp, 'second'))
+        
+        self.assertEqual(first, second)
+        for feed in first.values():
+            uids = [line for line in feed.decode('utf-8').split('\r\n') if line.startswith('UID:')]
+            self.assertEqual(len(uids), len(set(uids)))
+        
+        print("✓ Test 1.25.2 passed: Calendar feeds are deterministic")
+
+
+def ledger_bookings(generator):
+    """(dept, semester, section, course) of every booking in a generator's ledger, packed ones included"""
+    return [(part.get('dept'), part.get('semester'), part.get('section'), part.get('course'))
+            for slots in generator.global_classroom_usage.values() for rooms in slots.values()
+            for entry in rooms.values() for part in [entry] + entry.get('packed', [])]
 
 if __name__ == '__main__':
     # Create test suite
@@ -260,6 +1685,28 @@ if __name__ == '__main__':
     suite.addTests(loader.loadTestsFromTestCase(TestCourseLoading))
     suite.addTests(loader.loadTestsFromTestCase(TestTimeSlotAllocation))
     suite.addTests(loader.loadTestsFromTestCase(TestConflictDetection))
+    suite.addTests(loader.loadTestsFromTestCase(TestLedgerViews))
+    suite.addTests(loader.loadTestsFromTestCase(TestRoomAnalytics))
+    suite.addTests(loader.loadTestsFromTestCase(TestInstrumentation))
+    suite.addTests(loader.loadTestsFromTestCase(TestStructuredLogging))
+    suite.addTests(loader.loadTestsFromTestCase(TestSchedulingCore))
+    suite.addTests(loader.loadTestsFromTestCase(TestWhatIfRunner))
+    suite.addTests(loader.loadTestsFromTestCase(TestOptimizer))
+    suite.addTests(loader.loadTestsFromTestCase(TestTimeModel))
+    suite.addTests(loader.loadTestsFromTestCase(TestFlexPacking))
+    suite.addTests(loader.loadTestsFromTestCase(TestCourseOfferings))
+    suite.addTests(loader.loadTestsFromTestCase(TestElectivePlanner))
+    suite.addTests(loader.loadTestsFromTestCase(TestRoomAssignment))
+    suite.addTests(loader.loadTestsFromTestCase(TestFreeRoomPools))
+    suite.addTests(loader.loadTestsFromTestCase(TestDiagnostics))
+    suite.addTests(loader.loadTestsFromTestCase(TestPipeline))
+    suite.addTests(loader.loadTestsFromTestCase(TestCheckpoints))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduleStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestCsvCodec))
+    suite.addTests(loader.loadTestsFromTestCase(TestPartialRuns))
+    suite.addTests(loader.loadTestsFromTestCase(TestWatchMode))
+    suite.addTests(loader.loadTestsFromTestCase(TestStudentTimetables))
+    suite.addTests(loader.loadTestsFromTestCase(TestCalendarExport))
     
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,77 @@
+"""
+Cross-Department Course Offerings
+=================================
+
+Common (foundation) courses are listed in every department CSV that takes
+them: CS162 Optimization, taught by the same faculty, appears for both
+DSAI and ECE Semester 2, and a common course without a section is taken
+by sections A and B together. Generated one group at a time, each copy
+got its own slots and its own large room.
+
+CourseOfferingIndex groups the common-course rows of all groups by
+offering: (semester, course code, faculty, lectures, tutorials). An
+offering listed by more than one group is scheduled once for the combined
+cohort and written into every member's timetable. Labs are not shared;
+they stay with each section.
+
+Author: BeyondGames Team
+"""
+from dataclasses import dataclass, field
+
+from faculty_names import faculty_key, split_faculty
+
+
+def _faculty_key(faculty):
+    """'Dr. Jolly Thomas, IIT Dharwad' and 'Dr Jolly  Thomas' -> 'jollythomas'; co-teachers in any order"""
+    return '+'.join(sorted(faculty_key(name) for name in split_faculty(faculty)))
+
+
+@dataclass
+class CourseOffering:
+    """One common course as actually taught, and the groups that attend it"""
+
+    semester: int
+    course_code: str
+    faculty: str
+    lectures: int
+    tutorials: int
+    # (department, semester, section) in generation order
+    groups: list = field(default_factory=list)
+    # Classrooms the member groups list for it (a room of the cohort's own is preferred over other backups)
+    classrooms: list = field(default_factory=list)
+
+    @property
+    def key(self):
+        return self.semester, self.course_code, _faculty_key(self.faculty), self.lectures, self.tutorials
+
+    @property
+    def is_shared(self):
+        return len(self.groups) > 1
+
+
+class CourseOfferingIndex:
+    """Deduplicates identical common-course offerings across departments and sections"""
+
+    def __init__(self):
+        self.offerings = {}  # offering key -> CourseOffering
+
+    def add(self, group, course_code, faculty, lectures, tutorials, classroom=''):
+        """Register that group (department, semester, section) takes a common course; returns its offering"""
+        candidate = CourseOffering(group[1], course_code, faculty, lectures, tutorials)
+        offering = self.offerings.setdefault(candidate.key, candidate)
+        if group not in offering.groups:
+            offering.groups.append(group)
+        # 'C205/C004' lists two rooms
+        for room in classroom.split('/'):
+            room = room.strip()
+            if room and room not in offering.classrooms:
+                offering.classrooms.append(room)
+        return offering
+
+    def shared(self):
+        """Offerings attended by more than one group, in first-seen order"""
+        return [o for o in self.offerings.values() if o.is_shared]
+
+    def placements_saved(self):
+        """Lecture/tutorial placements avoided by scheduling each shared offering once"""
+        return sum((len(o.groups) - 1) * (o.lectures + o.tutorials) for o in self.shared())
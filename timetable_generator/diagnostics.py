@@ -0,0 +1,128 @@
+"""
+Unscheduled-Session Diagnostics
+===============================
+
+"Could not schedule CS310 - Lab 1" said nothing about why. When a session
+cannot be placed, the scheduler re-walks the (day, slot) probes it tried
+and, for each one, collects every blocker instead of stopping at the
+first failed rule:
+
+    not_teaching_day            a cohort member has no classes that day
+    daily_limit                 the course already has this session type that day
+    lecture_tutorial_same_day   the course has its other session type that day
+    group_busy                  the section already has a class in the slot
+    room_busy                   the nominated room is booked (and no alternative is free)
+    no_large_room               every large-classroom candidate is booked
+    no_lab_room                 every lab room is booked
+
+SessionDiagnosis keeps per-reason probe counters and the blocking set: the
+smallest set of blockers standing in the way of any one slot. Removing
+those blockers (moving those sessions, freeing that room) would have let
+the session be placed there. DiagnosticsReport gathers the diagnoses of
+a run and writes them as JSON next to the timetables.
+
+Author: BeyondGames Team
+"""
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+
+from structured_logging import get_logger
+
+log = get_logger('timetable.diagnostics')
+
+REPORT_FILE = 'unscheduled_diagnostics.json'
+
+
+def group_label(group):
+    """('CSE', 4, 'A') -> 'CSE S4-A'"""
+    department, semester, section = group
+    return f"{department} S{semester}-{section}"
+
+
+def booking_label(room, record):
+    """'C302 booked by CSE S4-A CS301' (ledger records may lack the group fields)"""
+    owner = record.get('course', '')
+    if 'dept' in record:
+        owner = f"{group_label((record['dept'], record.get('semester'), record.get('section')))} {owner}"
+    return f"{room} booked by {owner}".strip()
+
+
+@dataclass
+class SessionDiagnosis:
+    """Why one session could not be placed"""
+
+    groups: list  # (department, semester, section) of every cohort member
+    course_code: str
+    session: str  # e.g. 'Lecture 2'
+    probes: int = 0
+    reasons: Counter = field(default_factory=Counter)  # reason -> probes it rejected
+    blocking_set: list = field(default_factory=list)  # [(reason, detail)] of the cheapest slot to free
+    unblocks: str = ''  # '<day> <slot>' the blocking set stands in front of
+
+    def add_probe(self, day, time_str, blockers):
+        """Record one (day, slot) probe and the set of (reason, detail) blockers rejecting it"""
+        self.probes += 1
+        self.reasons.update({reason for reason, _ in blockers})
+        if not self.unblocks or len(blockers) < len(self.blocking_set):
+            self.blocking_set = sorted(blockers)
+            self.unblocks = f"{day} {time_str}"
+
+    def summary(self):
+        """One line: the blockers of the cheapest slot"""
+        if not self.probes:
+            return "no slot long enough for the session"
+        details = '; '.join(detail for _, detail in self.blocking_set) or 'no blocker found'
+        return f"{self.unblocks}: {details}"
+
+    def to_dict(self):
+        return {
+            'groups': [group_label(g) for g in self.groups],
+            'course': self.course_code,
+            'session': self.session,
+            'probes': self.probes,
+            'reasons': dict(self.reasons.most_common()),
+            'unblocks': self.unblocks,
+            'blocking_set': [{'reason': reason, 'detail': detail} for reason, detail in self.blocking_set],
+        }
+
+
+class DiagnosticsReport:
+    """Diagnoses of every unscheduled session in a run"""
+
+    def __init__(self, diagnoses):
+        self.diagnoses = list(diagnoses)
+
+    @classmethod
+    def from_contexts(cls, contexts):
+        """Collect from GenerationContexts; a cohort session's diagnosis is listed once"""
+        seen = {}
+        for ctx in contexts:
+            if ctx is None:
+                continue
+            for diagnosis in ctx.diagnoses.values():
+                seen.setdefault(id(diagnosis), diagnosis)
+        return cls(seen.values())
+
+    def reason_totals(self):
+        """Probes rejected per reason, over all unscheduled sessions"""
+        totals = Counter()
+        for diagnosis in self.diagnoses:
+            totals.update(diagnosis.reasons)
+        return dict(totals.most_common())
+
+    def to_dict(self):
+        return {
+            'unscheduled_sessions': len(self.diagnoses),
+            'reason_totals': self.reason_totals(),
+            'sessions': [d.to_dict() for d in self.diagnoses],
+        }
+
+    def export_json(self, output_dir='timetable_outputs'):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, REPORT_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        log.info("Unscheduled-session diagnostics saved: %s", path, extra={'file': path})
+        return path
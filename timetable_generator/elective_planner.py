@@ -0,0 +1,108 @@
+"""
+Cross-Section Elective Planner
+==============================
+
+Students of every section (and department) in a semester pick from the
+same elective basket, so a basket's sessions must sit in the same slots
+for all of them. Generated one section at a time, each section placed its
+own ELECTIVE_<basket> sessions and only reserved one room for them.
+
+ElectivePlanner gathers the baskets of all sections up front, keyed by
+(semester, basket). A basket is then scheduled once, in slots free for
+every member section, and every member course meeting in a session gets
+its own classroom reserved in the room ledger.
+
+Within a basket, a course with fewer lectures than the basket maximum
+meets in only some of the basket's sessions. meetings() picks those
+sessions so that two courses needing the same room avoid each other
+where possible.
+
+Author: BeyondGames Team
+"""
+from dataclasses import dataclass, field
+
+from room_assignment import NON_PHYSICAL_ROOMS
+
+
+def _first_room(classroom):
+    """'C205/C004' -> 'C205'; None for rooms that are not physical ('Online', '-', nan)"""
+    for room in str(classroom).split('/'):
+        room = room.strip()
+        if room.lower() not in NON_PHYSICAL_ROOMS:
+            return room
+    return None
+
+
+@dataclass
+class BasketCourse:
+    """One course offered in an elective basket"""
+
+    code: str
+    faculty: str
+    room: str  # None when the course has no physical room
+    lectures: int
+    tutorials: int
+
+    def sessions(self, session_type):
+        return self.lectures if session_type == 'Lecture' else self.tutorials
+
+
+@dataclass
+class ElectiveBasket:
+    """A basket's courses and the (department, semester, section) groups choosing from it"""
+
+    semester: int
+    basket: str
+    courses: dict = field(default_factory=dict)  # course code -> BasketCourse, first-seen order
+    groups: list = field(default_factory=list)
+
+    @property
+    def course_code(self):
+        """Identifier the scheduler uses for the basket's sessions"""
+        return f"ELECTIVE_{self.basket}"
+
+    def sessions(self, session_type):
+        """Basket sessions of one type: enough for its longest course"""
+        return max((c.sessions(session_type) for c in self.courses.values()), default=0)
+
+    def meetings(self, session_type):
+        """For each basket session of a type, the courses meeting in it"""
+        count = self.sessions(session_type)
+        sessions = [[] for _ in range(count)]
+        rooms = [set() for _ in range(count)]
+        # Longest courses first; the shorter ones then fill the sessions where their room is still free
+        for course in sorted(self.courses.values(), key=lambda c: -c.sessions(session_type)):
+            order = sorted(range(count), key=lambda i: (course.room in rooms[i], len(sessions[i])))
+            for i in sorted(order[:course.sessions(session_type)]):
+                sessions[i].append(course)
+                if course.room:
+                    rooms[i].add(course.room)
+        return sessions
+
+
+class ElectivePlanner:
+    """Collects elective baskets across sections, departments and semesters"""
+
+    def __init__(self):
+        self.baskets = {}  # (semester, basket) -> ElectiveBasket
+
+    def add(self, group, basket, course_code, faculty, classroom, lectures, tutorials):
+        """Register that group (department, semester, section) offers a course in a basket"""
+        key = (group[1], basket)
+        plan = self.baskets.setdefault(key, ElectiveBasket(group[1], basket))
+        if group not in plan.groups:
+            plan.groups.append(group)
+        course = plan.courses.get(course_code)
+        if course is None:
+            plan.courses[course_code] = BasketCourse(course_code, faculty, _first_room(classroom),
+                                                     lectures, tutorials)
+        else:
+            # Departments list some courses with different hours or rooms: keep the longest, first real room
+            course.lectures = max(course.lectures, lectures)
+            course.tutorials = max(course.tutorials, tutorials)
+            course.room = course.room or _first_room(classroom)
+        return plan
+
+    def plans(self):
+        """Baskets in first-seen order"""
+        return list(self.baskets.values())
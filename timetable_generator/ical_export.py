@@ -0,0 +1,361 @@
+"""
+iCalendar Export
+================
+
+Calendar feeds (.ics) of the generated schedule for sections, rooms, faculty
+and students, read from the schedule store (TIMETABLE_DB), which holds both
+the daily timetables and the exam schedule:
+
+    with ScheduleStore.from_env() as store:
+        CalendarExporter(store).export_all('timetable_outputs/calendars')
+
+    calendars/sections/CSE_Sem4_SectionA.ics   weekly sessions + the semester's exams
+    calendars/rooms/C004.ics                   sessions booked in the room + exams seated in it
+    calendars/faculty/Dr_Pavan.ics             sessions the faculty member teaches
+    calendars/students/24BCS101_SectionA.ics   personal timetable + the student's exam seats
+
+A weekly session is one VEVENT with a weekly RRULE running to the end of the
+teaching term rather than one event per week, and an exam is one event on
+its date. Feeds are written event by event as they are produced. Students
+sharing a section and elective choices share one encoded block of weekly
+events; only their exam seats are encoded per student.
+
+UIDs hash the feed owner, weekday, start time, summary and location, and
+DTSTAMP is the term start, so an unchanged schedule exports byte-identical
+feeds and a calendar re-importing one only sees the events that changed.
+
+Author: BeyondGames Team
+"""
+import hashlib
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from instrumentation import TRACER
+from structured_logging import get_logger
+
+from diagnostics import group_label
+from faculty_names import FacultyDirectory
+from scheduling_core import PACK_SEPARATOR, SchedulerConfig
+from student_timetables import StudentTimetables
+from time_model import parse_hhmm
+from timetable_to_html import DURATION_TAG, timetable_stem
+
+log = get_logger('timetable.calendar')
+
+# Even semester 2025: classes from 6 January until the end-semester exams
+TERM_START = date(2025, 1, 6)
+TERM_WEEKS = 15
+TIMEZONE = 'Asia/Kolkata'
+PRODID = '-//BeyondGames//IIIT Dharwad Timetable//EN'
+# IST has no daylight saving: one fixed-offset rule covers every date
+VTIMEZONE = ('BEGIN:VTIMEZONE', f'TZID:{TIMEZONE}', 'BEGIN:STANDARD', 'DTSTART:19700101T000000',
+             'TZOFFSETFROM:+0530', 'TZOFFSETTO:+0530', 'TZNAME:IST', 'END:STANDARD', 'END:VTIMEZONE')
+IST_OFFSET = timedelta(hours=5, minutes=30)
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+EMPTY_CELLS = ('', 'Free', 'LUNCH BREAK')
+# Cell tags ('[90min]', '[EVENING]'), left out of event summaries
+TAG = re.compile(r'\s*\[[^\]]*\]')
+
+
+def escape_text(value):
+    """TEXT value escaping (RFC 5545 3.3.11)"""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Content line folded at 75 octets (continuations start with a space), CRLF-terminated"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    chunks, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # Never split a UTF-8 sequence
+        chunks.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(chunks) + '\r\n'
+
+
+def file_name(value):
+    """'Dr. C. B. Akki' -> 'Dr_C_B_Akki'"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(value)).strip('_') or 'unnamed'
+
+
+def slot_bounds(slot):
+    """'14:30-16:30' -> (870, 990) minutes since midnight"""
+    start, end = slot.split('-')
+    return parse_hhmm(start), parse_hhmm(end)
+
+
+def cell_sessions(cell, slot):
+    """(start, end, summary, room) of each session in a timetable cell; packed sessions run back to back"""
+    if cell in EMPTY_CELLS:
+        return []
+    start, end = slot_bounds(slot)
+    sessions = []
+    for part in cell.split(PACK_SEPARATOR):
+        label, _, room = part.partition(' | ')
+        minutes = DURATION_TAG.search(label)
+        finish = min(start + int(minutes.group(1)), end) if minutes else end
+        sessions.append((start, finish, TAG.sub('', label).strip(), room.strip() or None))
+        start = finish
+    return sessions
+
+
+@dataclass(frozen=True)
+class CalendarTerm:
+    """Teaching weeks the weekly sessions repeat over (inclusive dates)"""
+    start: date
+    end: date
+
+    @classmethod
+    def before_exams(cls, exams, start=TERM_START):
+        """From `start` to the day before the first exam (TERM_WEEKS weeks when there are none)"""
+        dates = [datetime.strptime(exam['date'], '%d/%m/%Y').date() for exam in exams]
+        end = min(dates) - timedelta(days=1) if dates else start + timedelta(weeks=TERM_WEEKS, days=-1)
+        return cls(start, end)
+
+    def first(self, day):
+        """Date of the first `day` ('Monday', ...) of the term"""
+        return self.start + timedelta(days=(WEEKDAY_NAMES.index(day) - self.start.weekday()) % 7)
+
+    @property
+    def until(self):
+        # UNTIL is UTC when DTSTART has a TZID: the last local second of the term
+        last = datetime.combine(self.end, datetime.max.time().replace(microsecond=0)) - IST_OFFSET
+        return last.strftime('%Y%m%dT%H%M%SZ')
+
+    @property
+    def stamp(self):
+        return self.start.strftime('%Y%m%dT000000Z')
+
+
+def _local(day, minutes):
+    return f"{day.strftime('%Y%m%d')}T{minutes // 60:02d}{minutes % 60:02d}00"
+
+
+class CalendarWriter:
+    """One .ics file, written as events arrive"""
+
+    def __init__(self, path, name):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        header = ('BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+                  f'X-WR-CALNAME:{escape_text(name)}', f'X-WR-TIMEZONE:{TIMEZONE}') + VTIMEZONE
+        self.file.write(''.join(fold(line) for line in header))
+        self.events = 0
+
+    def write(self, events):
+        """Append encoded VEVENT text (event() output, possibly several joined)"""
+        self.file.write(events)
+        self.events += events.count('BEGIN:VEVENT')
+
+    def close(self):
+        self.file.write(fold('END:VCALENDAR'))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def event(owner, term, day, start, end, summary, location=None, description=None, weekly=True):
+    """
+    One VEVENT as text. `day` is a weekday name when weekly (repeats over the term)
+    or a date; start and end are minutes since midnight, local time.
+    """
+    when = term.first(day) if weekly else day
+    key = f"{owner}|{day}|{start}|{summary}|{location or ''}"
+    lines = ['BEGIN:VEVENT',
+             f"UID:{hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]}@beyondgames-timetable",
+             f'DTSTAMP:{term.stamp}',
+             f'DTSTART;TZID={TIMEZONE}:{_local(when, start)}',
+             f'DTEND;TZID={TIMEZONE}:{_local(when, end)}']
+    if weekly:
+        lines.append(f'RRULE:FREQ=WEEKLY;UNTIL={term.until}')
+    lines.append(f'SUMMARY:{escape_text(summary)}')
+    if location:
+        lines.append(f'LOCATION:{escape_text(location)}')
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+class CalendarExporter:
+    """Section, room, faculty and student feeds from a ScheduleStore"""
+
+    def __init__(self, store, term=None, config=None, students=None):
+        """
+        Args:
+            store: ScheduleStore holding the timetables (and the exams, for exam events)
+            term: CalendarTerm (default: TERM_START to the day before the first exam)
+            config: SchedulerConfig (session lengths and flexible slots of room bookings)
+            students: StudentTimetables for the student feeds (default: from the store)
+        """
+        self.store = store
+        self.exams = store.exams()
+        self.term = term or CalendarTerm.before_exams(self.exams)
+        self.config = config or SchedulerConfig.from_env()
+        self.students = students
+        self._flex = {f"{start}-{end}" for start, end in self.config.afternoon_flex_slots}
+        self._minutes = {'Lecture': self.config.lecture_minutes, 'Tutorial': self.config.tutorial_minutes,
+                         'Lab': self.config.lab_minutes}
+
+    # ------------------------------------------------------------------
+    # Event sources
+    # ------------------------------------------------------------------
+    def grid_events(self, owner, grid):
+        """Weekly events of a timetable grid (a section's, or a student's personal one)"""
+        return ''.join(event(owner, self.term, day, start, end, summary, room)
+                       for day, cells in grid.rows.items()
+                       for slot, cell in zip(grid.columns, cells)
+                       for start, end, summary, room in cell_sessions(cell, slot))
+
+    def _exam_times(self, exam):
+        start, _, end = str(exam['time']).partition('-')
+        return parse_hhmm(start), parse_hhmm(end)
+
+    def _exam_date(self, value):
+        return datetime.strptime(value, '%d/%m/%Y').date()
+
+    def exam_event(self, owner, exam, summary=None, location=None, description=None):
+        start, end = self._exam_times(exam)
+        summary = summary or f"Exam: {exam['course_code']} {exam.get('course_name') or ''}".strip()
+        return event(owner, self.term, self._exam_date(exam['date']), start, end, summary,
+                     location, description, weekly=False)
+
+    def section_exams(self, group):
+        """Exams of a section's department and semester (a mixed session lists several of each)"""
+        department, semester, _ = group
+        return [exam for exam in self.exams
+                if department in str(exam['department']).split('/')
+                and f"Sem{semester}" in str(exam['semester']).split('/')]
+
+    def bookings(self):
+        """
+        {'room': {room: [booking]}, 'faculty': {name: [booking]}} from the stored room ledger, where a
+        booking is (day, start, end, room, record); the event text is produced only when a feed is written
+        """
+        bookings = {'room': {}, 'faculty': {}}
+        ledger = self.store.ledger()
+        # Co-taught sessions go to every teacher, under one spelling of each name
+        directory = FacultyDirectory(part.get('faculty') for slots in ledger.values() for rooms in slots.values()
+                                     for entry in rooms.values() for part in [entry] + entry.get('packed', []))
+        for day, slots in ledger.items():
+            for slot, rooms in slots.items():
+                slot_start, slot_end = slot_bounds(slot)
+                for room, entry in rooms.items():
+                    start = slot_start
+                    for part in [entry] + entry.get('packed', []):
+                        # Flexible slots hold sessions of their own length; other slots are filled
+                        minutes = self._minutes.get(part.get('type')) if slot in self._flex else None
+                        end = min(start + minutes, slot_end) if minutes else slot_end
+                        booking = (day, start, end, room, part)
+                        bookings['room'].setdefault(room, []).append(booking)
+                        for name in directory.members(part.get('faculty')):
+                            bookings['faculty'].setdefault(name, []).append(booking)
+                        start = end
+        return bookings
+
+    def booking_event(self, owner, booking, with_faculty=False):
+        day, start, end, room, part = booking
+        cohort = part.get('cohort') or [(part.get('dept'), part.get('semester'), part.get('section'))]
+        summary = f"{part.get('course')} {part.get('type') or ''}".strip()
+        description = ', '.join(group_label(member) for member in cohort)
+        if with_faculty and part.get('faculty'):
+            description = f"{description}; {part['faculty']}"
+        return event(owner, self.term, day, start, end, summary, room, description)
+
+    # ------------------------------------------------------------------
+    # Feeds
+    # ------------------------------------------------------------------
+    def export_sections(self, output_dir):
+        count = 0
+        for group in map(tuple, self.store.sections()):
+            name = timetable_stem(group).replace('_Timetable', '')
+            with CalendarWriter(os.path.join(output_dir, f"{name}.ics"), f"{group_label(group)} timetable") as feed:
+                feed.write(self.grid_events(f"section:{name}", self.store.timetable_grid(*group)))
+                for exam in self.section_exams(group):
+                    feed.write(self.exam_event(f"section:{name}", exam, location=', '.join(exam['classrooms'])))
+            count += 1
+        return count
+
+    def export_rooms_and_faculty(self, room_dir, faculty_dir):
+        bookings = self.bookings()
+        exams = {(exam['date'], exam['session'], exam['course_code']): exam for exam in self.exams}
+        seatings = {}
+        for plan in self.store.seating_summary():
+            if (plan['exam_date'], plan['session'], plan['course_code']) in exams:
+                seatings.setdefault(plan['classroom'], []).append(plan)
+        rooms = sorted(set(bookings['room']) | set(seatings))
+        for room in rooms:
+            owner = f"room:{room}"
+            with CalendarWriter(os.path.join(room_dir, f"{file_name(room)}.ics"), f"Room {room}") as feed:
+                for booking in bookings['room'].get(room, []):
+                    feed.write(self.booking_event(owner, booking, with_faculty=True))
+                for plan in seatings.get(room, []):
+                    exam = exams[plan['exam_date'], plan['session'], plan['course_code']]
+                    feed.write(self.exam_event(owner, exam, location=room,
+                                               description=f"{plan['students_assigned']} students"))
+        for faculty, faculty_bookings in sorted(bookings['faculty'].items()):
+            owner = f"faculty:{faculty}"
+            with CalendarWriter(os.path.join(faculty_dir, f"{file_name(faculty)}.ics"), faculty) as feed:
+                for booking in faculty_bookings:
+                    feed.write(self.booking_event(owner, booking))
+        return len(rooms), len(bookings['faculty'])
+
+    def export_students(self, output_dir):
+        students = self.students or StudentTimetables.from_store(self.store)
+        names = {}
+        for exam in self.exams:
+            # A mixed session lists its courses and their names in the same order
+            for code, name in zip(str(exam['course_code']).split(' + '), str(exam.get('course_name') or '').split(' + ')):
+                names[code] = name
+        exams = {(exam['date'], exam['session']): exam for exam in self.exams}
+        seats = {}
+        for seat in self.store.seats():
+            seats.setdefault((seat['roll_number'], seat['section']), []).append(seat)
+
+        weekly = {}
+        count = 0
+        with TRACER.span('timetable.calendar.students'):
+            for student, section, choice_key in students:
+                roll = str(student.get('roll_number')).strip()
+                letter = section.group[2]
+                if (section.group, choice_key) not in weekly:
+                    owner = f"student:{timetable_stem(section.group)}:{choice_key}"
+                    weekly[section.group, choice_key] = self.grid_events(owner, section.personal_grid(choice_key))
+                path = os.path.join(output_dir, f"{file_name(roll)}_Section{letter}.ics")
+                with CalendarWriter(path, f"{roll} timetable") as feed:
+                    feed.write(weekly[section.group, choice_key])
+                    for seat in seats.get((roll, letter), []):
+                        exam = exams.get((seat['exam_date'], seat['session']))
+                        if exam is None:
+                            continue
+                        course = seat.get('course_key') or seat['course_code']
+                        feed.write(self.exam_event(
+                            f"student:{roll}:{letter}", exam, f"Exam: {course} {names.get(course, '')}".strip(),
+                            seat['classroom'], f"Row {seat['seat_row'] + 1}, Seat {seat['seat_col'] + 1}"))
+                count += 1
+        return count
+
+    def export_all(self, output_dir):
+        """Every feed under output_dir/{sections,rooms,faculty,students}; returns the number of feeds of each kind"""
+        with TRACER.span('timetable.calendar'):
+            counts = {'sections': self.export_sections(os.path.join(output_dir, 'sections'))}
+            counts['rooms'], counts['faculty'] = self.export_rooms_and_faculty(
+                os.path.join(output_dir, 'rooms'), os.path.join(output_dir, 'faculty'))
+            counts['students'] = self.export_students(os.path.join(output_dir, 'students'))
+        log.info("Calendars: %s written to %s/", ', '.join(f"{n} {kind}" for kind, n in counts.items()),
+                 output_dir, extra={'file': output_dir})
+        return counts
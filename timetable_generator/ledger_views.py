@@ -0,0 +1,328 @@
+"""
+Room and Faculty Timetable Views
+================================
+
+Pivots the global classroom usage ledger (global_classroom_usage) into
+per-room and per-faculty timetables. The ledger is walked exactly once to
+build both indexes; CSV, HTML and query lookups are all served from them,
+so no section timetable has to be re-read from disk.
+
+Author: BeyondGames Team
+"""
+import csv
+import html
+import os
+import re
+
+from structured_logging import get_logger
+
+from faculty_names import FacultyDirectory
+
+log = get_logger('timetable.views')
+
+WEEK_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _slot_sort_key(time_str):
+    """Sort 'HH:MM-HH:MM' keys by start then end time"""
+    start, _, end = time_str.partition('-')
+    return start, end
+
+
+def _safe_filename(name):
+    """Turn a room or faculty name into a file-system friendly stem"""
+    stem = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')
+    return stem or 'Unknown'
+
+
+class LedgerViewIndex:
+    """Indexed room/faculty views over a global classroom usage ledger"""
+
+    def __init__(self, ledger, time_slots=None, lunch_slot=None):
+        """
+        Args:
+            ledger: global_classroom_usage[day][time_str][room] = entry dict
+            time_slots: Ordered (start, end) tuples used for the grid columns
+            lunch_slot: (start, end) tuple rendered as LUNCH BREAK
+        """
+        self.lunch_str = f"{lunch_slot[0]}-{lunch_slot[1]}" if lunch_slot else None
+
+        # Index format: by_room[room][(day, time_str)] = entry
+        #               by_faculty[faculty][(day, time_str)] = [entry, ...]
+        self.by_room = {}
+        self.by_faculty = {}
+        days_seen = set()
+        slots_seen = set()
+
+        records = []
+        for day, day_usage in ledger.items():
+            days_seen.add(day)
+            for time_str, rooms in day_usage.items():
+                slots_seen.add(time_str)
+                for room, entry in rooms.items():
+                    # Sessions packed into a flexible slot after this one share its room
+                    parts = [dict(part, room=room, day=day, time=time_str)
+                             for part in [entry] + entry.get('packed', [])]
+                    self.by_room.setdefault(room, {})[(day, time_str)] = parts[0]
+                    records += parts
+
+        # Co-taught sessions go to every teacher, under one spelling of each name
+        self.directory = FacultyDirectory(record.get('faculty') for record in records)
+        for record in records:
+            for faculty in self.directory.members(record.get('faculty')) or ['Unknown']:
+                self.by_faculty.setdefault(faculty, {}).setdefault((record['day'], record['time']), []).append(record)
+
+        self.days = [d for d in WEEK_ORDER if d in days_seen] + sorted(days_seen - set(WEEK_ORDER))
+
+        columns = [f"{s[0]}-{s[1]}" for s in time_slots] if time_slots else []
+        columns += sorted(slots_seen - set(columns), key=_slot_sort_key)
+        self.time_columns = columns
+
+    @classmethod
+    def from_generator(cls, generator):
+        """Build the views from a TimetableGenerator after generation"""
+        return cls(generator.global_classroom_usage, generator.time_slots, generator.lunch_slot)
+
+    # ------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------
+
+    def rooms(self):
+        """All rooms that appear in the ledger"""
+        return sorted(self.by_room)
+
+    def faculty(self):
+        """All faculty that appear in the ledger"""
+        return sorted(self.by_faculty)
+
+    def room_schedule(self, room, day=None):
+        """Sessions held in a room, optionally restricted to one day, in time order"""
+        sessions = self.by_room.get(room, {})
+        keys = [k for k in sessions if day is None or k[0] == day]
+        keys.sort(key=lambda k: (self._day_rank(k[0]), _slot_sort_key(k[1])))
+        return [sessions[k] for k in keys]
+
+    def _faculty_sessions(self, faculty):
+        # Any spelling of the name finds the person ('Dr.Anushree K' -> 'Dr. Anushree Kini')
+        return self.by_faculty.get(faculty) or self.by_faculty.get(self.directory.canonical(faculty), {})
+
+    def faculty_schedule(self, faculty, day=None):
+        """Sessions taught by a faculty member (co-taught ones included), optionally restricted to one day"""
+        sessions = self._faculty_sessions(faculty)
+        keys = [k for k in sessions if day is None or k[0] == day]
+        keys.sort(key=lambda k: (self._day_rank(k[0]), _slot_sort_key(k[1])))
+        return [entry for k in keys for entry in sessions[k]]
+
+    def whats_in(self, room, day, time_str=None):
+        """Answer "what's in C203 on Tuesday?" (or in one specific slot)"""
+        if time_str is not None:
+            return self.by_room.get(room, {}).get((day, time_str))
+        return self.room_schedule(room, day)
+
+    def free_rooms(self, day, time_str, candidates=None):
+        """Rooms (from candidates, default all known rooms) not booked in a slot"""
+        candidates = self.rooms() if candidates is None else candidates
+        return [r for r in candidates if (day, time_str) not in self.by_room.get(r, {})]
+
+    def _day_rank(self, day):
+        return self.days.index(day) if day in self.days else len(self.days)
+
+    # ------------------------------------------------------------------
+    # Grid building
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _group_label(entry):
+        if entry.get('cohort'):
+            # A common-course session shared by several groups
+            return ', '.join(f"{dept} S{sem}-{sec}" for dept, sem, sec in entry['cohort'])
+        sem = entry.get('semester')
+        sec = entry.get('section')
+        dept = entry.get('dept') or entry.get('department') or ''
+        return f"{dept} S{sem}-{sec}"
+
+    def _room_cell(self, entry):
+        cells = []
+        for part in [entry] + entry.get('packed', []):
+            session_type = part.get('type') or ''
+            faculty = part.get('faculty') or ''
+            label = f"{part['course']} {session_type}".strip()
+            cell = f"{label} ({self._group_label(part)})"
+            cells.append(f"{cell} | {faculty}" if faculty else cell)
+        return ' / '.join(cells)
+
+    def _faculty_cell(self, entries):
+        cells = []
+        for entry in entries:
+            session_type = entry.get('type') or ''
+            label = f"{entry['course']} {session_type}".strip()
+            cells.append(f"{label} ({self._group_label(entry)}) | {entry['room']}")
+        return ' / '.join(cells)
+
+    def _grid(self, sessions, render):
+        grid = {}
+        for day in self.days:
+            grid[day] = {}
+            for time_str in self.time_columns:
+                if time_str == self.lunch_str:
+                    grid[day][time_str] = 'LUNCH BREAK'
+                elif (day, time_str) in sessions:
+                    grid[day][time_str] = render(sessions[(day, time_str)])
+                else:
+                    grid[day][time_str] = 'Free'
+        return grid
+
+    def room_grid(self, room):
+        """Day x time-slot grid for a room (same layout as section CSVs)"""
+        return self._grid(self.by_room.get(room, {}), self._room_cell)
+
+    def faculty_grid(self, faculty):
+        """Day x time-slot grid for a faculty member"""
+        return self._grid(self._faculty_sessions(faculty), self._faculty_cell)
+
+    def utilization(self):
+        """Booked slot count per room, excluding lunch"""
+        bookable = len(self.days) * len([t for t in self.time_columns if t != self.lunch_str])
+        return {
+            room: {'booked': len(sessions), 'bookable': bookable,
+                   'percent': round(100.0 * len(sessions) / bookable, 1) if bookable else 0.0}
+            for room, sessions in sorted(self.by_room.items())
+        }
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def _write_csv(self, grid, filepath):
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([''] + self.time_columns)
+            for day in self.days:
+                writer.writerow([day] + [grid[day][t] for t in self.time_columns])
+
+    def _grid_html(self, title, subtitle, grid):
+        rows = []
+        for day in self.days:
+            cells = []
+            for time_str in self.time_columns:
+                value = grid[day][time_str]
+                css = 'lunch' if value == 'LUNCH BREAK' else ('free' if value == 'Free' else 'busy')
+                cells.append(f'<td class="{css}">{html.escape(value)}</td>')
+            rows.append(f'<tr><td class="day">{day}</td>{"".join(cells)}</tr>')
+        header = ''.join(f'<th>{t}</th>' for t in self.time_columns)
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>{html.escape(title)}</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+               background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; }}
+        .container {{ max-width: 1400px; margin: 0 auto; background: white; border-radius: 20px; padding: 30px; }}
+        h1 {{ color: #667eea; margin-bottom: 5px; }}
+        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
+        th {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 10px; }}
+        td {{ padding: 10px; border: 1px solid #e5e7eb; text-align: center; font-size: 0.9em; }}
+        td.day {{ font-weight: bold; background: #f8f9fa; }}
+        td.busy {{ background: #dbeafe; }}
+        td.free {{ background: #f0f4f8; color: #9ca3af; }}
+        td.lunch {{ background: #fde68a; }}
+        a {{ color: #667eea; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <a href="index.html">&larr; All rooms and faculty</a>
+        <h1>{html.escape(title)}</h1>
+        <p>{html.escape(subtitle)}</p>
+        <table>
+            <thead><tr><th>Day/Time</th>{header}</tr></thead>
+            <tbody>
+            {''.join(rows)}
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>
+"""
+
+    def _index_html(self, room_files, faculty_files):
+        usage = self.utilization()
+        room_items = ''.join(
+            f'<li><a href="{room_files[r]}">{html.escape(r)}</a> &mdash; '
+            f'{usage[r]["booked"]}/{usage[r]["bookable"]} slots ({usage[r]["percent"]}%)</li>'
+            for r in self.rooms()
+        )
+        faculty_items = ''.join(
+            f'<li><a href="{faculty_files[name]}">{html.escape(name)}</a> &mdash; '
+            f'{len(self.by_faculty[name])} slots</li>'
+            for name in self.faculty()
+        )
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Room and Faculty Timetables</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+               background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; }}
+        .container {{ max-width: 1200px; margin: 0 auto; background: white; border-radius: 20px; padding: 30px;
+                      display: grid; grid-template-columns: 1fr 1fr; gap: 30px; }}
+        h2 {{ color: #667eea; }}
+        li {{ margin: 4px 0; }}
+        a {{ color: #764ba2; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div><h2>🏛️ Rooms</h2><ul>{room_items}</ul></div>
+        <div><h2>👩‍🏫 Faculty</h2><ul>{faculty_items}</ul></div>
+    </div>
+</body>
+</html>
+"""
+
+    def export_all(self, csv_dir='timetable_outputs', html_dir='timetable_html'):
+        """
+        Write one CSV and one HTML timetable per room and per faculty member,
+        plus an HTML index with room utilization.
+
+        Returns:
+            Dict with the number of room and faculty views written
+        """
+        room_csv_dir = os.path.join(csv_dir, 'room_timetables')
+        faculty_csv_dir = os.path.join(csv_dir, 'faculty_timetables')
+        views_html_dir = os.path.join(html_dir, 'views')
+        for directory in (room_csv_dir, faculty_csv_dir, views_html_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        room_files = {}
+        for room in self.rooms():
+            stem = f"Room_{_safe_filename(room)}"
+            grid = self.room_grid(room)
+            self._write_csv(grid, os.path.join(room_csv_dir, stem + '.csv'))
+            with open(os.path.join(views_html_dir, stem + '.html'), 'w', encoding='utf-8') as f:
+                f.write(self._grid_html(f"Room {room}", f"{len(self.by_room[room])} booked slots", grid))
+            room_files[room] = stem + '.html'
+
+        faculty_files = {}
+        used_stems = set()
+        for name in self.faculty():
+            stem = f"Faculty_{_safe_filename(name)}"
+            while stem in used_stems:
+                stem += '_'
+            used_stems.add(stem)
+            grid = self.faculty_grid(name)
+            self._write_csv(grid, os.path.join(faculty_csv_dir, stem + '.csv'))
+            with open(os.path.join(views_html_dir, stem + '.html'), 'w', encoding='utf-8') as f:
+                f.write(self._grid_html(name, f"{len(self.by_faculty[name])} teaching slots", grid))
+            faculty_files[name] = stem + '.html'
+
+        with open(os.path.join(views_html_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(self._index_html(room_files, faculty_files))
+
+        log.info("Room timetables saved: %s/ (%d rooms)", room_csv_dir, len(room_files), extra={'file': room_csv_dir})
+        log.info("Faculty timetables saved: %s/ (%d faculty)", faculty_csv_dir, len(faculty_files),
+                 extra={'file': faculty_csv_dir})
+        log.info("Room/faculty HTML views: %s/index.html", views_html_dir, extra={'file': views_html_dir})
+        return {'rooms': len(room_files), 'faculty': len(faculty_files)}
@@ -0,0 +1,303 @@
+"""
+Timetable Quality Optimizer
+===========================
+
+Improves the greedy timetables with simulated annealing. The greedy pass
+places every session at the first free slot; this stage then moves sessions
+between slots to lower a weighted soft-constraint objective:
+
+    evening     sessions in the evening overflow slot
+    gap         idle slots between a group's first and last class of a day
+    balance     squared deviation of each day's load from the group's mean
+    spacing     the same course on two consecutive days
+
+Hard rules are never broken: a move needs a Free cell, its room free in the
+global ledger, and the per-day lecture/tutorial/lab limits (labs stay in
+the afternoon flex slots); sessions packed together into one flexible slot
+and common-course sessions shared with other groups are not moved. The objective is a sum of per-(group, day) and
+per-(group, course) terms, so a move is scored by re-evaluating only the
+terms it touches (two days, one course): O(slots + days) per move,
+independent of the number of groups.
+
+Usage:
+    optimizer = TimetableOptimizer(generator.core, contexts, seed=0)
+    report = optimizer.run(time_budget=5.0)
+
+Author: BeyondGames Team
+"""
+import math
+import random
+import time
+
+from instrumentation import TRACER
+from structured_logging import get_logger
+from scheduling_core import slot_key
+
+log = get_logger('timetable.optimizer')
+
+DEFAULT_WEIGHTS = {
+    'evening': 10.0,
+    'gap': 3.0,
+    'balance': 1.0,
+    'spacing': 2.0,
+}
+
+
+class _Group:
+    """Per-context bookkeeping the objective needs: occupied slots, day loads, course days"""
+
+    def __init__(self, ctx, slots):
+        self.ctx = ctx
+        self.occupied = {day: [ctx.timetable[day][s] != 'Free' for s in slots] for day in ctx.days}
+        self.load = {day: sum(row) for day, row in self.occupied.items()}
+        self.mean_load = sum(self.load.values()) / len(ctx.days)
+        # course -> {day: lecture/tutorial count}, for the spacing term
+        self.course_days = {}
+        # (course_code, day, time_str) for every session the optimizer may move
+        self.sessions = []
+        for day in ctx.days:
+            for time_str, entries in ctx.used_slots[day].items():
+                for course_code, entry in entries.items():
+                    # Sessions packed into one flexible slot, or shared with other groups, stay where they are
+                    if len(entries) == 1 and not entry.get('shared'):
+                        self.sessions.append([course_code, day, time_str])
+                    if entry['type'] != 'Lab':
+                        days = self.course_days.setdefault(course_code, dict.fromkeys(ctx.days, 0))
+                        days[day] += 1
+
+
+class TimetableOptimizer:
+    """Simulated annealing over the sessions of already generated timetables"""
+
+    def __init__(self, core, contexts, weights=None, seed=0):
+        """
+        Args:
+            core: The SchedulingCore that generated the contexts (config + shared room ledger)
+            contexts: GenerationContext objects to optimize (None entries are skipped)
+            weights: Overrides for DEFAULT_WEIGHTS
+            seed: Seed for move selection and acceptance
+        """
+        self.core = core
+        self.config = core.config
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.rng = random.Random(seed)
+
+        self.time_model = self.config.time_model
+        lunch = slot_key(self.config.lunch_slot)
+        self.slots = [slot_key(ts) for ts in self.config.time_slots if slot_key(ts) != lunch]
+        self.slot_index = {s: i for i, s in enumerate(self.slots)}
+        self.lab_slots = [s.key for s in self.time_model.fits(self.config.lab_minutes, ('flex',))]
+        self.evening_index = [i for i, s in enumerate(self.slots) if self.time_model.kind_of(s) == 'evening']
+
+        self.groups = [_Group(ctx, self.slots) for ctx in contexts if ctx is not None]
+        self.groups = [g for g in self.groups if g.sessions]
+
+    # ------------------------------------------------------------------
+    # Objective
+    # ------------------------------------------------------------------
+    def _day_cost(self, group, day):
+        row = group.occupied[day]
+        w = self.weights
+        cost = w['evening'] * sum(row[i] for i in self.evening_index)
+        busy = [i for i, used in enumerate(row) if used]
+        if busy:
+            cost += w['gap'] * ((busy[-1] - busy[0] + 1) - len(busy))
+        cost += w['balance'] * (group.load[day] - group.mean_load) ** 2
+        return cost
+
+    def _spacing_cost(self, group, course_code):
+        days = group.course_days.get(course_code)
+        if not days:
+            return 0.0
+        order = group.ctx.days
+        adjacent = sum(1 for a, b in zip(order, order[1:]) if days[a] and days[b])
+        return self.weights['spacing'] * adjacent
+
+    def cost(self):
+        """Full objective, computed from scratch"""
+        total = 0.0
+        for group in self.groups:
+            total += sum(self._day_cost(group, day) for day in group.ctx.days)
+            total += sum(self._spacing_cost(group, course) for course in group.course_days)
+        return total
+
+    def breakdown(self):
+        """Evening sessions and idle gaps across all groups (for reporting)"""
+        evening = gaps = 0
+        for group in self.groups:
+            for row in group.occupied.values():
+                evening += sum(row[i] for i in self.evening_index)
+                busy = [i for i, used in enumerate(row) if used]
+                if busy:
+                    gaps += (busy[-1] - busy[0] + 1) - len(busy)
+        return {'evening_sessions': evening, 'idle_gaps': gaps}
+
+    # ------------------------------------------------------------------
+    # Moves
+    # ------------------------------------------------------------------
+    def _local_cost(self, group, course_code, days):
+        return sum(self._day_cost(group, d) for d in days) + self._spacing_cost(group, course_code)
+
+    def _schedule_for(self, ctx, session_type):
+        if session_type == 'Lab':
+            return ctx.lab_schedule, self.config.max_labs_per_day
+        if session_type == 'Tutorial':
+            return ctx.tutorial_schedule, self.config.max_tutorials_per_day
+        return ctx.lecture_schedule, self.config.max_lectures_per_day
+
+    def _is_feasible(self, ctx, entry, day, time_str, new_day, new_time):
+        """Hard constraints for moving one session to (new_day, new_time)"""
+        if ctx.timetable[new_day][new_time] != 'Free':
+            return False
+        if self.core.state.is_room_taken(new_day, new_time, entry['room']):
+            return False
+        if entry['type'] == 'Lab' and new_time not in self.lab_slots:
+            return False
+        if entry['duration_minutes'] > self.time_model.capacity(new_time):
+            return False
+        if new_day != day:
+            course = entry['course']
+            schedule, max_per_day = self._schedule_for(ctx, entry['type'])
+            if schedule[course][new_day] >= max_per_day:
+                return False
+            if entry['type'] == 'Lecture' and ctx.tutorial_schedule[course][new_day] > 0:
+                return False
+            if entry['type'] == 'Tutorial' and ctx.lecture_schedule[course][new_day] > 0:
+                return False
+        return True
+
+    def _cell_text(self, entry, time_str):
+        """Rebuild a timetable cell the way the scheduler writes it for that slot tier"""
+        capacity = self.time_model.capacity(time_str)
+        if entry['type'] == 'Lab':
+            return f"{entry['label']} [{entry['duration_minutes']}min] | {entry['room']}", capacity
+        kind = self.time_model.kind_of(time_str)
+        if kind == 'regular':
+            tag = ''
+        elif kind == 'evening':
+            tag = ' [EVENING]'
+        else:
+            tag = f" [{entry['duration_minutes']}min]"
+        if entry['is_elective'] and entry['basket']:
+            return f"{entry['label']}{tag}", capacity
+        return f"{entry['label']}{tag} | {entry['room']}", capacity
+
+    def _apply(self, group, session, new_day, new_time):
+        """Move a session (timetable cell, bookkeeping and global ledger); returns the undo arguments"""
+        ctx = group.ctx
+        course_code, day, time_str = session
+        entry = ctx.used_slots[day][time_str].pop(course_code)
+        if not ctx.used_slots[day][time_str]:
+            del ctx.used_slots[day][time_str]
+        ctx.timetable[day][time_str] = 'Free'
+        packable = ctx.flex_minutes[day].pop(time_str, None) is not None
+
+        text, capacity = self._cell_text(entry, new_time)
+        entry['slot_capacity_minutes'] = capacity
+        ctx.timetable[new_day][new_time] = text
+        ctx.used_slots[new_day].setdefault(new_time, {})[course_code] = entry
+        if packable and self.time_model.kind_of(new_time) == 'flex':
+            ctx.flex_minutes[new_day][new_time] = entry['duration_minutes']
+
+        state = self.core.state
+        record = state.release_usage(day, time_str, entry['room'])
+        state.record_usage(new_day, new_time, entry['room'], record)
+
+        if entry['type'] == 'Lab':
+            ctx.lab_usage[day][time_str].remove(entry['room'])
+            ctx.lab_usage[new_day].setdefault(new_time, []).append(entry['room'])
+        schedule, _ = self._schedule_for(ctx, entry['type'])
+        schedule[entry['course']][day] -= 1
+        schedule[entry['course']][new_day] += 1
+
+        group.occupied[day][self.slot_index[time_str]] = False
+        group.occupied[new_day][self.slot_index[new_time]] = True
+        group.load[day] -= 1
+        group.load[new_day] += 1
+        if entry['type'] != 'Lab':
+            days = group.course_days[course_code]
+            days[day] -= 1
+            days[new_day] += 1
+
+        session[1], session[2] = new_day, new_time
+        return day, time_str
+
+    # ------------------------------------------------------------------
+    # Annealing
+    # ------------------------------------------------------------------
+    def run(self, time_budget=5.0, max_iterations=None, initial_temperature=5.0, final_temperature=0.05):
+        """
+        Anneal until the wall-clock budget (seconds) or max_iterations runs out.
+        The temperature falls geometrically with progress through whichever limit is tighter.
+        The timetables are left in the best state found; returns a report with the objective before and after.
+        """
+        with TRACER.span('timetable.optimize', groups=len(self.groups)):
+            return self._run(time_budget, max_iterations, initial_temperature, final_temperature)
+
+    def _run(self, time_budget, max_iterations, initial_temperature, final_temperature):
+        if not time_budget and not max_iterations:
+            raise ValueError("TimetableOptimizer.run needs a time_budget or max_iterations")
+        start = time.perf_counter()
+        initial_cost = current = self.cost()
+        before = self.breakdown()
+        best = current
+        since_best = []  # accepted moves after the best state, undone at the end
+        iterations = accepted = 0
+        ratio = final_temperature / initial_temperature
+
+        while self.groups:
+            elapsed = time.perf_counter() - start
+            progress = elapsed / time_budget if time_budget else 0.0
+            if max_iterations:
+                progress = max(progress, iterations / max_iterations)
+            if progress >= 1.0:
+                break
+            temperature = initial_temperature * ratio ** progress
+            iterations += 1
+
+            group = self.rng.choice(self.groups)
+            session = self.rng.choice(group.sessions)
+            course_code, day, time_str = session
+            entry = group.ctx.used_slots[day][time_str][course_code]
+            new_day = self.rng.choice(group.ctx.days)
+            new_time = self.rng.choice(self.lab_slots if entry['type'] == 'Lab' else self.slots)
+            if (new_day, new_time) == (day, time_str):
+                continue
+            if not self._is_feasible(group.ctx, entry, day, time_str, new_day, new_time):
+                continue
+
+            TRACER.count('optimizer.moves_evaluated')
+            touched = {day, new_day}
+            old_local = self._local_cost(group, course_code, touched)
+            undo = self._apply(group, session, new_day, new_time)
+            delta = self._local_cost(group, course_code, touched) - old_local
+
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                current += delta
+                accepted += 1
+                TRACER.count('optimizer.moves_accepted')
+                since_best.append((group, session, undo))
+                if current < best - 1e-9:
+                    best = current
+                    since_best.clear()
+            else:
+                self._apply(group, session, *undo)
+
+        # Return to the best state seen
+        for group, session, undo in reversed(since_best):
+            self._apply(group, session, *undo)
+        current = best
+
+        after = self.breakdown()
+        report = {
+            'initial_cost': round(initial_cost, 3),
+            'final_cost': round(current, 3),
+            'iterations': iterations,
+            'accepted_moves': accepted,
+            'seconds': round(time.perf_counter() - start, 3),
+            'evening_sessions': (before['evening_sessions'], after['evening_sessions']),
+            'idle_gaps': (before['idle_gaps'], after['idle_gaps']),
+        }
+        log.info("Optimizer: cost %.1f -> %.1f in %d iterations (%d accepted, %.2fs)",
+                 initial_cost, current, iterations, accepted, report['seconds'], extra=report)
+        return report
@@ -0,0 +1,116 @@
+"""
+Pipelined Generation
+====================
+
+main() used to generate every section, then write every CSV, and the HTML
+converter ran as a separate script after that. GenerationPipeline runs the
+three as concurrent stages joined by bounded queues:
+
+    generate (caller thread) -> CSV export (thread) -> HTML + index.html (thread)
+
+A section moves down the pipeline as soon as it is placed, and index.html
+is rewritten after each conversion, so finished timetables can be opened
+while later ones are still being generated. The queues are bounded so a
+slow stage holds the producer back instead of buffering the whole run.
+
+Elective baskets and shared common courses are placed for all groups
+before the first section is handed on (SchedulingCore.iter_generate); the
+optimizer needs every timetable at once, so it is not run in this mode.
+
+Author: BeyondGames Team
+"""
+import os
+import queue
+import threading
+from pathlib import Path
+
+from instrumentation import TRACER
+from structured_logging import get_logger
+
+from timetable_to_html import TimetableHTMLConverter
+
+log = get_logger('timetable.pipeline')
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class GenerationPipeline:
+    """Generate -> CSV -> HTML, overlapping the stages across sections"""
+
+    def __init__(self, generator, converter=None, queue_size=4):
+        """
+        Args:
+            generator: TimetableGenerator (its core generates, its export_to_csv writes)
+            converter: TimetableHTMLConverter reading the generator's output_dir (created if None)
+            queue_size: Sections each queue may hold before the stage feeding it waits
+        """
+        self.generator = generator
+        self.converter = converter or TimetableHTMLConverter(input_dir=generator.output_dir, config=generator.config)
+        self.queue_size = queue_size
+        self.converted = []  # CSV files converted so far, in completion order
+        self.errors = []
+
+    def run(self, groups):
+        """Generate and export the groups; returns their GenerationContexts (groups with no courses omitted)"""
+        to_csv = queue.Queue(maxsize=self.queue_size)
+        to_html = queue.Queue(maxsize=self.queue_size)
+        stages = [
+            threading.Thread(target=self._stage, args=('csv', self._export_csv, to_csv, to_html), daemon=True),
+            threading.Thread(target=self._stage, args=('html', self._export_html, to_html, None), daemon=True),
+        ]
+        for thread in stages:
+            thread.start()
+
+        generated = []
+        try:
+            with TRACER.span('pipeline.generate', groups=len(groups)):
+                for _, ctx in self.generator.core.iter_generate(groups):
+                    if ctx is not None:
+                        generated.append(ctx)
+                        to_csv.put(ctx)
+        finally:
+            to_csv.put(_DONE)
+            for thread in stages:
+                thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+        log.info("Pipeline: %d timetables generated, %d converted to HTML", len(generated), len(self.converted))
+        return generated
+
+    def _stage(self, name, work, inbox, outbox):
+        """Apply `work` to every item until _DONE; after a failure, keep draining so upstream never blocks"""
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if self.errors:
+                continue
+            try:
+                with TRACER.span(f'pipeline.{name}'):
+                    result = work(item)
+                if outbox is not None:
+                    outbox.put(result)
+            except Exception as exc:  # surfaced by run()
+                log.error("Pipeline %s stage failed: %s", name, exc)
+                self.errors.append(exc)
+        if outbox is not None:
+            outbox.put(_DONE)
+
+    def _export_csv(self, ctx):
+        timetable, electives, rotated_out = ctx.result()
+        self.generator.print_timetable(timetable)
+        filename = f"{ctx.department}_Sem{ctx.semester}_Section{ctx.section}_Timetable.csv"
+        self.generator.export_to_csv(timetable, filename, electives, rotated_out)
+        return os.path.join(self.generator.output_dir, filename)
+
+    def _export_html(self, csv_file):
+        filename = Path(csv_file).stem
+        html_file = os.path.join(self.converter.output_dir, filename + '.html')
+        with TRACER.span('timetable.export_html', file=filename):
+            if self.converter.csv_to_html(csv_file, html_file):
+                self.converted.append(csv_file)
+        # Refresh the index so every finished timetable is reachable right away
+        self.converter.create_index_page(self.converted)
+        return csv_file
@@ -0,0 +1,294 @@
+"""
+Room Utilization Analytics
+==========================
+
+Computes room occupancy from the generated state (the global classroom
+usage ledger) as a single room x day x slot occupancy tensor, then derives
+per-room, per-slot and per-day occupancy, peak-contention slots and the
+large-room fallback rates recorded by _find_available_large_classroom.
+Results are written as CSV plus an HTML heatmap.
+
+Author: BeyondGames Team
+"""
+import csv
+import html
+import os
+
+import numpy as np
+
+from structured_logging import get_logger
+
+from room_assignment import NON_PHYSICAL_ROOMS
+
+log = get_logger('timetable.analytics')
+
+WEEK_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+class RoomUtilizationReport:
+    """Occupancy analytics over a global classroom usage ledger"""
+
+    def __init__(self, ledger, days, time_slots, lunch_slot=None, large_auditorium=None,
+                 backup_large_classrooms=(), lab_rooms=(), large_room_stats=None, unscheduled_count=0):
+        """
+        Args:
+            ledger: global_classroom_usage[day][time_str][room] = entry dict
+            days: Teaching days to report on (days only seen in the ledger are added)
+            time_slots: Ordered (start, end) tuples; lunch_slot is excluded
+            large_auditorium / backup_large_classrooms / lab_rooms: room groups to summarise
+            large_room_stats: Per-session counters recorded by SchedulingCore._schedule_session
+            unscheduled_count: Sessions that could not be placed in this run
+        """
+        lunch_str = f"{lunch_slot[0]}-{lunch_slot[1]}" if lunch_slot else None
+        ledger_days = set(ledger)
+        self.days = [d for d in WEEK_ORDER if d in set(days) | ledger_days]
+        self.slots = [f"{s[0]}-{s[1]}" for s in time_slots if f"{s[0]}-{s[1]}" != lunch_str]
+
+        self.large_auditorium = large_auditorium
+        self.backup_large_classrooms = list(backup_large_classrooms)
+        self.lab_rooms = list(lab_rooms)
+        self.large_room_stats = dict(large_room_stats or {})
+        self.unscheduled_count = unscheduled_count
+
+        # Known rooms are always reported, even if they were never booked
+        rooms = set(self.backup_large_classrooms) | set(self.lab_rooms)
+        if large_auditorium:
+            rooms.add(large_auditorium)
+        for day_usage in ledger.values():
+            for slot_rooms in day_usage.values():
+                rooms.update(r for r in slot_rooms if str(r).strip().lower() not in NON_PHYSICAL_ROOMS)
+        self.rooms = sorted(rooms)
+
+        room_idx = {r: i for i, r in enumerate(self.rooms)}
+        day_idx = {d: i for i, d in enumerate(self.days)}
+        slot_idx = {s: i for i, s in enumerate(self.slots)}
+
+        # occupancy[room, day, slot] = 1 when the room is booked
+        self.occupancy = np.zeros((len(self.rooms), len(self.days), len(self.slots)), dtype=np.uint8)
+        for day, day_usage in ledger.items():
+            for time_str, slot_rooms in day_usage.items():
+                if time_str not in slot_idx:
+                    continue
+                for room in slot_rooms:
+                    if room in room_idx:
+                        self.occupancy[room_idx[room], day_idx[day], slot_idx[time_str]] = 1
+
+    @classmethod
+    def from_config(cls, config, state, unscheduled_count=0):
+        """Build the report from a SchedulerConfig and the ScheduleState it generated into"""
+        return cls(
+            state.global_classroom_usage,
+            list(config.weekdays),
+            config.time_slots,
+            lunch_slot=config.lunch_slot,
+            large_auditorium=config.large_auditorium,
+            backup_large_classrooms=config.backup_large_classrooms,
+            lab_rooms=config.lab_rooms,
+            large_room_stats=state.large_room_stats,
+            unscheduled_count=unscheduled_count,
+        )
+
+    @classmethod
+    def from_generator(cls, generator, unscheduled_count=0):
+        """Build the report from a TimetableGenerator after generation"""
+        return cls.from_config(generator.config, generator.core.state, unscheduled_count)
+
+    # ------------------------------------------------------------------
+    # Occupancy matrices
+    # ------------------------------------------------------------------
+
+    def room_occupancy(self):
+        """Fraction of bookable (day, slot) cells used, per room"""
+        if self.occupancy.size == 0:
+            return np.zeros(len(self.rooms))
+        return self.occupancy.mean(axis=(1, 2))
+
+    def room_slot_matrix(self):
+        """rooms x slots: fraction of days each room is booked in each slot"""
+        if not self.days:
+            return np.zeros((len(self.rooms), len(self.slots)))
+        return self.occupancy.mean(axis=1)
+
+    def contention_matrix(self):
+        """days x slots: number of rooms booked at the same time"""
+        return self.occupancy.sum(axis=0)
+
+    def day_occupancy(self):
+        """Fraction of all room-slots used, per day"""
+        if not self.rooms or not self.slots:
+            return np.zeros(len(self.days))
+        return self.occupancy.mean(axis=(0, 2))
+
+    def group_occupancy(self):
+        """Mean occupancy for the auditorium, backup large rooms and labs"""
+        occupancy = self.room_occupancy()
+        index = {r: i for i, r in enumerate(self.rooms)}
+        groups = {
+            'auditorium': [self.large_auditorium] if self.large_auditorium else [],
+            'backup_large': self.backup_large_classrooms,
+            'labs': self.lab_rooms,
+        }
+        return {
+            name: float(occupancy[[index[r] for r in rooms]].mean()) if rooms else 0.0
+            for name, rooms in groups.items()
+        }
+
+    def peak_contention_slots(self, top=5):
+        """The (day, slot, busy_rooms) cells with the most simultaneous bookings"""
+        contention = self.contention_matrix()
+        if contention.size == 0:
+            return []
+        flat = np.argsort(contention, axis=None, kind='stable')[::-1][:top]
+        peaks = []
+        for pos in flat:
+            d, s = np.unravel_index(pos, contention.shape)
+            peaks.append((self.days[d], self.slots[s], int(contention[d, s])))
+        return peaks
+
+    def large_room_fallback_rates(self):
+        """How often common-course sessions fell back from their best-fit large room, or were not placed at all"""
+        requests = self.large_room_stats.get('requests', 0)
+        backup = self.large_room_stats.get('backup', 0)
+        none = self.large_room_stats.get('none', 0)
+        return {
+            'requests': requests,
+            'primary': self.large_room_stats.get('primary', 0),
+            'backup': backup,
+            'none': none,
+            'backup_rate': backup / requests if requests else 0.0,
+            'none_rate': none / requests if requests else 0.0,
+        }
+
+    def room_class(self, room):
+        """Classify a room into auditorium / large / lab / regular"""
+        if room == self.large_auditorium:
+            return 'auditorium'
+        if room in self.backup_large_classrooms:
+            return 'large'
+        if room in self.lab_rooms:
+            return 'lab'
+        return 'regular'
+
+    def summary(self):
+        """Headline numbers as a plain dict"""
+        return {
+            'rooms': len(self.rooms),
+            'days': len(self.days),
+            'slots_per_day': len(self.slots),
+            'overall_occupancy': float(self.occupancy.mean()) if self.occupancy.size else 0.0,
+            'group_occupancy': self.group_occupancy(),
+            'day_occupancy': dict(zip(self.days, map(float, self.day_occupancy()))),
+            'peak_contention': self.peak_contention_slots(),
+            'large_room_fallback': self.large_room_fallback_rates(),
+            'unscheduled_sessions': self.unscheduled_count,
+        }
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def export_csv(self, output_dir='timetable_outputs'):
+        """Write per-room occupancy and the room x day/slot heatmap as CSV"""
+        os.makedirs(output_dir, exist_ok=True)
+        occupancy = self.room_occupancy()
+        per_day = self.occupancy.mean(axis=2) if self.slots else np.zeros((len(self.rooms), len(self.days)))
+
+        rooms_file = os.path.join(output_dir, 'room_utilization.csv')
+        with open(rooms_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Room', 'Class', 'Booked_Slots', 'Bookable_Slots', 'Occupancy_%']
+                            + [f"{d}_%" for d in self.days])
+            bookable = len(self.days) * len(self.slots)
+            for i, room in enumerate(self.rooms):
+                writer.writerow([room, self.room_class(room), int(self.occupancy[i].sum()), bookable,
+                                 round(100 * occupancy[i], 1)] + [round(100 * v, 1) for v in per_day[i]])
+
+        heatmap_file = os.path.join(output_dir, 'room_slot_heatmap.csv')
+        with open(heatmap_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Room'] + [f"{d} {s}" for d in self.days for s in self.slots])
+            for i, room in enumerate(self.rooms):
+                writer.writerow([room] + self.occupancy[i].reshape(-1).tolist())
+
+        log.info("Room utilization saved: %s", rooms_file, extra={'file': rooms_file})
+        log.info("Room heatmap data saved: %s", heatmap_file, extra={'file': heatmap_file})
+        return rooms_file, heatmap_file
+
+    @staticmethod
+    def _heat_cell(value, label):
+        # Map 0..1 to a white -> purple scale matching the timetable theme
+        alpha = 0.1 + 0.9 * float(value) if value > 0 else 0.0
+        color = 'white' if value > 0.6 else '#1f2937'
+        return (f'<td style="background: rgba(118, 75, 162, {alpha:.2f}); color: {color};">'
+                f'{html.escape(label)}</td>')
+
+    def export_html(self, output_file='timetable_html/room_utilization.html'):
+        """Write an HTML heatmap report"""
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        summary = self.summary()
+        room_slot = self.room_slot_matrix()
+        contention = self.contention_matrix()
+        max_busy = max(int(contention.max()) if contention.size else 0, 1)
+
+        header = ''.join(f'<th>{s}</th>' for s in self.slots)
+        room_rows = ''.join(
+            f'<tr><td class="label">{html.escape(room)} <small>({self.room_class(room)})</small></td>'
+            + ''.join(self._heat_cell(v, f"{round(100 * v)}%") for v in room_slot[i])
+            + '</tr>'
+            for i, room in enumerate(self.rooms)
+        )
+        day_rows = ''.join(
+            f'<tr><td class="label">{day}</td>'
+            + ''.join(self._heat_cell(c / max_busy, str(int(c))) for c in contention[d])
+            + '</tr>'
+            for d, day in enumerate(self.days)
+        )
+        fallback = summary['large_room_fallback']
+        groups = summary['group_occupancy']
+        peaks = ''.join(f'<li>{d} {s}: {n} rooms busy</li>' for d, s, n in summary['peak_contention'])
+
+        content = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Room Utilization Report</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+               background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 20px; }}
+        .container {{ max-width: 1400px; margin: 0 auto; background: white; border-radius: 20px; padding: 30px; }}
+        h1, h2 {{ color: #667eea; }}
+        .stats {{ display: flex; gap: 20px; flex-wrap: wrap; }}
+        .stat {{ background: #f8f9fa; border-radius: 15px; padding: 15px 25px; }}
+        .stat b {{ font-size: 1.6em; color: #764ba2; display: block; }}
+        table {{ border-collapse: collapse; margin: 15px 0; }}
+        th {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 8px; }}
+        td {{ padding: 6px 10px; border: 1px solid #e5e7eb; text-align: center; font-size: 0.85em; }}
+        td.label {{ text-align: left; font-weight: bold; background: #f8f9fa; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🏛️ Room Utilization Report</h1>
+        <div class="stats">
+            <div class="stat"><b>{round(100 * summary['overall_occupancy'], 1)}%</b>Overall occupancy</div>
+            <div class="stat"><b>{round(100 * groups['auditorium'], 1)}%</b>{html.escape(str(self.large_auditorium))} occupancy</div>
+            <div class="stat"><b>{round(100 * groups['backup_large'], 1)}%</b>Backup large rooms</div>
+            <div class="stat"><b>{round(100 * groups['labs'], 1)}%</b>Lab rooms</div>
+            <div class="stat"><b>{round(100 * fallback['backup_rate'], 1)}%</b>Large-room fallback rate ({fallback['backup']}/{fallback['requests']})</div>
+            <div class="stat"><b>{fallback['none']}</b>No large room available</div>
+            <div class="stat"><b>{summary['unscheduled_sessions']}</b>Unscheduled sessions</div>
+        </div>
+        <h2>Peak contention slots</h2>
+        <ul>{peaks}</ul>
+        <h2>Rooms busy per day and slot</h2>
+        <table><thead><tr><th>Day</th>{header}</tr></thead><tbody>{day_rows}</tbody></table>
+        <h2>Room occupancy per slot (share of days booked)</h2>
+        <table><thead><tr><th>Room</th>{header}</tr></thead><tbody>{room_rows}</tbody></table>
+    </div>
+</body>
+</html>
+"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        log.info("Room utilization heatmap saved: %s", output_file, extra={'file': output_file})
+        return output_file
@@ -0,0 +1,163 @@
+"""
+Capacity-Aware Room Assignment
+==============================
+
+The course CSVs nominate one classroom per course and common courses try
+C004 and then the backup rooms in a fixed order, without ever comparing a
+cohort's size with a room's seats. When the nominated room was busy the
+slot was simply given up.
+
+RoomCatalog keeps a capacity index (rooms sorted by seats) built from the
+exam timetable's classroom.csv, so a best-fit query is a bisect rather than
+a scan. Enrolment per (department, semester, section) is counted from the
+exam timetable's students.csv. The scheduler uses both to:
+
+    - order large-room candidates for common courses by fit for the cohort
+    - move a session to another free room, no smaller than the nominated
+      one, when the nominated room is booked in that slot
+
+Missing files leave the catalog empty, and the scheduler then behaves as
+before (fixed room order, no moves).
+
+Author: BeyondGames Team
+"""
+import bisect
+import csv
+import os
+import re
+
+# Classroom values that are recorded in the ledger but are not physical rooms
+NON_PHYSICAL_ROOMS = {'', 'nan', 'none', '-', 'online'}
+
+
+class RoomCatalog:
+    """Seating capacities with best-fit room queries"""
+
+    def __init__(self, capacities=None):
+        self.capacities = {}
+        self._index = []  # (capacity, room), ascending
+        for room, capacity in (capacities or {}).items():
+            self.add(room, capacity)
+
+    @classmethod
+    def load(cls, path, extra=()):
+        """Read an 'ID,Seating Capacity' CSV; `extra` (room, capacity) pairs cover rooms the file omits"""
+        catalog = cls()
+        if path and os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    room = str(row.get('ID', '')).strip()
+                    capacity = str(row.get('Seating Capacity', '')).strip()
+                    if room and capacity:
+                        catalog.add(room, int(float(capacity)))
+        for room, capacity in extra:
+            if room not in catalog.capacities:
+                catalog.add(room, capacity)
+        return catalog
+
+    def __len__(self):
+        return len(self.capacities)
+
+    def add(self, room, capacity):
+        if room in self.capacities:
+            self._index.remove((self.capacities[room], room))
+        self.capacities[room] = capacity
+        bisect.insort(self._index, (capacity, room))
+
+    def capacity(self, room):
+        """Seats in a room, or None if the catalog does not know it"""
+        return self.capacities.get(room)
+
+    def best_fit(self, need, minimum=0, pool=None):
+        """
+        Rooms with at least `minimum` seats, best fit first.
+
+        Rooms seating `need` come first, smallest first; rooms too small for
+        `need` follow, largest first. With a `pool`, only its rooms are
+        considered; equal capacities keep pool order and pool rooms of
+        unknown capacity go last.
+        """
+        low = bisect.bisect_left(self._index, (minimum, ''))
+        split = max(low, bisect.bisect_left(self._index, (need, '')))
+        fitting = [room for _, room in self._index[split:]]
+        short = [room for _, room in sorted(self._index[low:split], key=lambda e: (-e[0], e[1]))]
+        if pool is None:
+            return fitting + short
+
+        rank = {room: i for i, room in enumerate(pool)}
+        fitting = sorted((r for r in fitting if r in rank), key=lambda r: (self.capacities[r], rank[r]))
+        short = sorted((r for r in short if r in rank), key=lambda r: (-self.capacities[r], rank[r]))
+        unknown = [room for room in pool if room not in self.capacities]
+        return fitting + short + unknown
+
+
+def semester_number(value):
+    """'Sem4' / '4' -> 4"""
+    digits = re.sub(r'\D', '', str(value))
+    return int(digits) if digits else None
+
+
+def load_enrolment(path):
+    """Students per (department, semester, section) from a roll list CSV; {} when the file is missing"""
+    enrolment = {}
+    if not path or not os.path.exists(path):
+        return enrolment
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            group = (str(row.get('department', '')).strip(), semester_number(row.get('semester', '')),
+                     str(row.get('section', '')).strip())
+            enrolment[group] = enrolment.get(group, 0) + 1
+    return enrolment
+
+
+class RoomAssigner:
+    """Chooses rooms for sessions from a RoomCatalog and group enrolment"""
+
+    def __init__(self, catalog, enrolment=None, reserved=()):
+        """
+        Args:
+            catalog: RoomCatalog of seating capacities
+            enrolment: {(department, semester, section): students}
+            reserved: Rooms never offered as an alternative for a busy room (e.g. the large auditorium)
+        """
+        self.catalog = catalog
+        self.enrolment = enrolment or {}
+        self.reserved = set(reserved)
+        self._orders = {}  # memoized room orders (tuples, usable as free-room pools)
+
+    def cohort_size(self, groups):
+        """Students in the (department, semester, section) groups; 0 when any of them is unknown"""
+        sizes = [self.enrolment.get(tuple(group)) for group in groups]
+        return 0 if not sizes or None in sizes else sum(sizes)
+
+    def large_room_order(self, groups, pool):
+        """Large-room candidates for a common-course cohort, best fit first (pool order without sizes)"""
+        key = ('large', tuple(groups), tuple(pool))
+        if key not in self._orders:
+            need = self.cohort_size(groups)
+            order = self.catalog.best_fit(need, pool=pool) if self.catalog and need else pool
+            self._orders[key] = tuple(order)
+        return self._orders[key]
+
+    def alternatives(self, nominated, groups=()):
+        """
+        Rooms to try when the nominated room is busy: none smaller than the
+        nominated room, best fit for the groups first. A nominated room of
+        unknown size can only move to rooms known to seat the groups.
+        """
+        key = ('alternatives', nominated, tuple(groups))
+        if key not in self._orders:
+            self._orders[key] = tuple(self._alternatives(nominated, groups))
+        return self._orders[key]
+
+    def _alternatives(self, nominated, groups):
+        if str(nominated).strip().lower() in NON_PHYSICAL_ROOMS:
+            return []
+        need = self.cohort_size(groups)
+        minimum = self.catalog.capacity(nominated)
+        if minimum is None:
+            if not need:
+                return []
+            minimum = need
+        return [room for room in self.catalog.best_fit(need, minimum)
+                if room != nominated and room not in self.reserved]
@@ -0,0 +1,92 @@
+"""
+Per-Slot Free-Room Pools
+========================
+
+Finding a free room used to walk a room list and probe the ledger once
+per room, for every candidate slot. FreeRoomIndex keeps, for each room
+pool (an ordered tuple of rooms such as the lab rooms or the large-room
+candidates of a cohort) and each (day, slot), a bitmask of the pool's
+booked rooms. Bit i stands for the pool's i-th room, so the most
+preferred free room is the lowest clear bit: a lookup is a few integer
+operations whatever the number of rooms, and a booking or release flips
+one bit in every pool holding that room.
+
+A pool's mask for a slot is built from the ledger the first time the
+slot is queried, so pools can be registered at any point of a run.
+
+Author: BeyondGames Team
+"""
+
+
+class RoomPool:
+    """Rooms in preference order; bit i of a mask is rooms[i]"""
+
+    def __init__(self, rooms):
+        self.rooms = tuple(rooms)
+        self.bits = {room: 1 << i for i, room in enumerate(self.rooms)}
+        self.full = (1 << len(self.rooms)) - 1
+
+    def mask(self, rooms):
+        """Bits of the given rooms that belong to this pool"""
+        mask = 0
+        for room in rooms:
+            mask |= self.bits.get(room, 0)
+        return mask
+
+    def first_free(self, taken):
+        """Most preferred room whose bit is clear in `taken`, or None"""
+        free = ~taken & self.full
+        if not free:
+            return None
+        return self.rooms[(free & -free).bit_length() - 1]
+
+
+class FreeRoomIndex:
+    """Booked-room masks per pool and (day, slot), kept in step with a room ledger"""
+
+    def __init__(self):
+        self.pools = {}  # rooms tuple -> RoomPool
+        self.masks = {}  # rooms tuple -> {(day, time_str): mask}
+        self._pools_of = {}  # room -> [rooms tuple of every pool holding it]
+
+    def pool(self, rooms):
+        """The pool for an ordered room tuple, registered on first use"""
+        rooms = tuple(rooms)
+        pool = self.pools.get(rooms)
+        if pool is None:
+            pool = self.pools[rooms] = RoomPool(rooms)
+            self.masks[rooms] = {}
+            for room in rooms:
+                self._pools_of.setdefault(room, []).append(rooms)
+        return pool
+
+    def taken(self, pool, day, time_str, booked):
+        """Mask of the pool's rooms booked in a slot; `booked` is the ledger's room dict for that slot"""
+        masks = self.masks[pool.rooms]
+        mask = masks.get((day, time_str))
+        if mask is None:
+            mask = masks[(day, time_str)] = pool.mask(booked)
+        return mask
+
+    def reserve(self, day, time_str, room):
+        self._flip(day, time_str, room, True)
+
+    def release(self, day, time_str, room):
+        self._flip(day, time_str, room, False)
+
+    def _flip(self, day, time_str, room, booked):
+        for rooms in self._pools_of.get(room, ()):
+            masks = self.masks[rooms]
+            mask = masks.get((day, time_str))
+            if mask is None:
+                continue  # Built from the ledger when first queried
+            bit = self.pools[rooms].bits[room]
+            masks[(day, time_str)] = mask | bit if booked else mask & ~bit
+
+    def copy(self):
+        """Independent index with the same pools and masks (masks are ints, so a shallow copy per pool)"""
+        fork = FreeRoomIndex()
+        fork.pools = dict(self.pools)
+        fork.masks = {rooms: dict(masks) for rooms, masks in self.masks.items()}
+        fork._pools_of = {room: list(keys) for room, keys in self._pools_of.items()}
+        return fork
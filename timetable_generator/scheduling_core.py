@@ -0,0 +1,1260 @@
+"""
+BeyondGames Timetable Scheduling Core
+=====================================
+
+The scheduling algorithm shared by both front-ends (main.py and
+main_functional.py):
+
+    SchedulerConfig    immutable settings: slots, rooms, rotation, Saturday rule
+    ScheduleState      results shared across generations: the global room ledger
+                       (thread-safe, with copy-on-write snapshots for what-if runs)
+    GenerationContext  everything one department/semester/section run mutates
+    SchedulingCore     the algorithm, reading config and writing state/context
+
+Author: BeyondGames Team
+"""
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+from functools import cached_property
+
+# Shared helpers (instrumentation, logging) live in the top-level common/ folder
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from checkpoints import fingerprint
+from csv_codec import Grid, is_missing, write_grid
+from input_watch import PARSED_INPUTS
+from instrumentation import TRACER
+from structured_logging import get_logger
+
+from course_offerings import CourseOfferingIndex
+from diagnostics import SessionDiagnosis, booking_label, group_label
+from elective_planner import ElectivePlanner
+from room_assignment import RoomAssigner, RoomCatalog, load_enrolment
+from room_pools import FreeRoomIndex
+from time_model import TimeModel
+
+log = get_logger('timetable.core')
+
+# Path to a JSON slot grid (see time_model.py) replacing the default slots
+TIME_GRID_ENV = 'TIMETABLE_TIME_GRID'
+# Set to 1 to explain every unscheduled session (diagnose_unscheduled)
+DIAGNOSE_ENV = 'TIMETABLE_DIAGNOSE'
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+# Joins the sessions packed back to back into one flexible-slot cell
+PACK_SEPARATOR = ' + '
+
+
+def slot_key(time_slot):
+    """('08:00', '09:30') -> '08:00-09:30' (the key used in timetables and the ledger)"""
+    return f"{time_slot[0]}-{time_slot[1]}"
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    """Immutable scheduling settings; derive variants with with_changes()"""
+
+    csv_folder: str = 'input_files/sdtt_inputs'
+    output_dir: str = 'timetable_outputs'
+
+    # Monday to Friday, plus Saturday for the (department, semester) groups listed here
+    weekdays: tuple = WEEKDAYS
+    saturday_groups: frozenset = frozenset({('ECE', 4)})  # ECE Sem 4 has the highest course load
+
+    # Elective rotation: only these baskets are scheduled per semester, the rest
+    # are listed as "After Midsems"
+    elective_rotation: tuple = (
+        (2, ('B1', 'B3', 'B4', 'E1')),  # Semester 2: Allow B4 for now (HS courses)
+        (4, ('B1', 'B3', 'Minor')),     # Semester 4: Core electives + Minor
+        (6, ('B1', 'B3', 'E1')),        # Semester 6: Advanced electives
+    )
+
+    # Morning/Regular time slots (1.5 hours each) for lectures and tutorials
+    regular_slots: tuple = (('08:00', '09:30'), ('09:45', '11:15'), ('11:30', '13:00'))
+    lunch_slot: tuple = ('13:00', '14:30')
+    # Afternoon 2-hour flexible slots: labs (2h), lectures (1.5h) or tutorials (1h)
+    afternoon_flex_slots: tuple = (('14:30', '16:30'), ('16:30', '18:30'))
+    # Evening slot (1.5 hours) - for overflow classes
+    evening_slot: tuple = (('18:30', '20:00'),)
+
+    # Session lengths; a session only goes into slots at least this long
+    lecture_minutes: int = 90
+    tutorial_minutes: int = 60
+    lab_minutes: int = 120
+    # Pack several short sessions (e.g. two 1-hour tutorials) into one flexible slot when they fit
+    pack_flex_slots: bool = True
+    # generate_all(): schedule a common course listed by several groups once, for the combined cohort
+    share_common_offerings: bool = True
+    # Schedule each elective basket once for all its sections, reserving every member course's room
+    plan_elective_baskets: bool = True
+
+    large_auditorium: str = 'C004'  # 240-seater for common courses (primary)
+    # Backup large classrooms for common courses when C004 is unavailable
+    backup_large_classrooms: tuple = ('C101', 'C102', 'C103', 'C202', 'C203', 'C204', 'C205')
+    lab_rooms: tuple = ('Lab-1', 'Lab-2', 'Lab-3', 'Lab-4', 'Lab-5')
+
+    # Seating capacities and roll lists (shared with the exam timetable) for capacity-aware room choice
+    room_capacity_file: str = os.path.join('..', 'exam_timetable', 'inputs', 'classroom.csv')
+    enrolment_file: str = os.path.join('..', 'exam_timetable', 'inputs', 'students.csv')
+    # Rooms missing from room_capacity_file
+    extra_room_capacities: tuple = (('C004', 240),)
+    # Move a session to another free room at least as large when its nominated room is busy
+    reassign_busy_rooms: bool = True
+    # Explain every unscheduled session: rejection counters and the smallest blocking set. Off by default:
+    # each unscheduled session's slots are probed again (about 2 s on the large benchmark)
+    diagnose_unscheduled: bool = False
+
+    # Strict scheduling rules: max 1 lecture/tutorial/lab per course per day
+    # (lecture+lab or tutorial+lab on the same day is allowed)
+    max_lectures_per_day: int = 1
+    max_tutorials_per_day: int = 1
+    max_labs_per_day: int = 1
+
+    @classmethod
+    def from_time_grid(cls, path, **changes):
+        """Config whose slots come from a JSON slot grid file"""
+        return cls(**{**TimeModel.load(path).tiers(), **changes})
+
+    @classmethod
+    def from_env(cls):
+        """Default config, or one using the slot grid named by TIMETABLE_TIME_GRID; TIMETABLE_DIAGNOSE=1 diagnoses"""
+        changes = {}
+        if os.environ.get(DIAGNOSE_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on'):
+            changes['diagnose_unscheduled'] = True
+        path = os.environ.get(TIME_GRID_ENV)
+        return cls.from_time_grid(path, **changes) if path else cls(**changes)
+
+    @property
+    def time_slots(self):
+        """All slots in display order (including lunch)"""
+        return list(self.regular_slots) + [self.lunch_slot] + list(self.afternoon_flex_slots) + list(self.evening_slot)
+
+    @cached_property
+    def time_model(self):
+        """Minute-resolution view of the slots (capacities, overlap and fit queries)"""
+        return TimeModel.from_tiers(self.regular_slots, self.lunch_slot, self.afternoon_flex_slots, self.evening_slot)
+
+    @cached_property
+    def room_assigner(self):
+        """Capacity index and enrolment used to pick rooms by fit"""
+        catalog = RoomCatalog.load(self.room_capacity_file, self.extra_room_capacities)
+        enrolment = PARSED_INPUTS.get(self.enrolment_file, load_enrolment) if self.enrolment_file else {}
+        return RoomAssigner(catalog, enrolment, reserved=(self.large_auditorium,))
+
+    def days_for(self, department, semester):
+        """Teaching days for one department/semester"""
+        if (department, semester) in self.saturday_groups:
+            return list(self.weekdays) + ['Saturday']
+        return list(self.weekdays)
+
+    def rotation_for(self, semester):
+        """Baskets allowed in this semester, or None when the semester has no rotation"""
+        for sem, baskets in self.elective_rotation:
+            if sem == semester:
+                return baskets
+        return None
+
+    def with_changes(self, **changes):
+        """Copy of this config with some fields replaced"""
+        return replace(self, **changes)
+
+
+class ScheduleState:
+    """
+    State shared by every generation in a run: the global room ledger and large-room counters.
+
+    snapshot() forks the state cheaply: the fork shares the per-day and
+    per-slot dicts with its parent, and whichever side writes to a shared
+    dict first copies it (copy-on-write). Many what-if scenarios can
+    therefore start from one base ledger, in parallel, without copying it
+    up front and without seeing each other's bookings.
+
+    Free-room queries go through a FreeRoomIndex (per-slot bitmasks of
+    booked rooms for each room pool), updated on every booking and release.
+    """
+
+    def __init__(self):
+        # Format: global_classroom_usage[day][time_str][classroom] = {'dept': ..., 'semester': ..., 'section': ...,
+        #                                                              'course': ..., 'faculty': ..., 'type': ...}
+        self.global_classroom_usage = {}
+        # Where common-course sessions needing a large room ended up, one count per session (utilization analytics)
+        self.large_room_stats = {'requests': 0, 'primary': 0, 'backup': 0, 'none': 0}
+        self.free_rooms = FreeRoomIndex()
+        # Day / (day, slot) dicts this state owns outright; anything else may be shared with a snapshot
+        self._owned_days = set()
+        self._owned_slots = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Checkpoints pickle the state; the lock is recreated on load
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def is_room_taken(self, day, time_str, room):
+        return room in self.global_classroom_usage.get(day, {}).get(time_str, {})
+
+    def booking(self, day, time_str, room):
+        """The ledger record for a room in a slot, or None if it is free"""
+        return self.global_classroom_usage.get(day, {}).get(time_str, {}).get(room)
+
+    def first_free(self, rooms, day, time_str, exclude=()):
+        """First room of `rooms` (preference order) that is free in a slot and not in `exclude`, or None"""
+        with self._lock:
+            return self._first_free(rooms, day, time_str, exclude)
+
+    def _first_free(self, rooms, day, time_str, exclude=()):
+        pool = self.free_rooms.pool(rooms)
+        booked = self.global_classroom_usage.get(day, {}).get(time_str, {})
+        taken = self.free_rooms.taken(pool, day, time_str, booked)
+        return pool.first_free(taken | pool.mask(exclude) if exclude else taken)
+
+    def reserve_first_free(self, rooms, day, time_str, record, exclude=()):
+        """
+        Book the first free room of `rooms` (as first_free()) under the same lock acquisition; returns
+        the room, or None if none is free. Another thread cannot book the room between check and booking.
+        """
+        with self._lock:
+            room = self._first_free(rooms, day, time_str, exclude)
+            if room is not None:
+                self._book(day, time_str, room, record)
+            return room
+
+    def reserve_all(self, day, time_str, records):
+        """Book every (room, record) pair if all the rooms are free in the slot, else none; returns True if booked"""
+        with self._lock:
+            booked = self.global_classroom_usage.get(day, {}).get(time_str, {})
+            if any(room in booked for room, _ in records):
+                return False
+            for room, record in records:
+                self._book(day, time_str, room, record)
+            return True
+
+    def _writable_slot(self, day, time_str):
+        """The ledger dict for one slot, copied first if it is shared with a snapshot (caller holds the lock)"""
+        ledger = self.global_classroom_usage
+        if day not in self._owned_days:
+            ledger[day] = dict(ledger.get(day, {}))
+            self._owned_days.add(day)
+        if (day, time_str) not in self._owned_slots:
+            ledger[day][time_str] = dict(ledger[day].get(time_str, {}))
+            self._owned_slots.add((day, time_str))
+        return ledger[day][time_str]
+
+    def _book(self, day, time_str, room, record):
+        self._writable_slot(day, time_str)[room] = record
+        self.free_rooms.reserve(day, time_str, room)
+
+    def record_usage(self, day, time_str, room, record):
+        """Book a room without checking it is free (seeding a saved ledger, moving a session)"""
+        with self._lock:
+            self._book(day, time_str, room, record)
+
+    def seed(self, ledger):
+        """Book every entry of a saved ledger, e.g. the sections a partial run leaves in place"""
+        for day, slots in ledger.items():
+            for time_str, rooms in slots.items():
+                for room, record in rooms.items():
+                    self.record_usage(day, time_str, room, record)
+
+    def pack_usage(self, day, time_str, room, record):
+        """Add a session packed after the room's existing booking in a flexible slot"""
+        with self._lock:
+            slot = self._writable_slot(day, time_str)
+            existing = slot[room]
+            # New dict: the old one may still be shared with a snapshot
+            slot[room] = {**existing, 'packed': existing.get('packed', []) + [record]}
+
+    def release_usage(self, day, time_str, room):
+        """Remove one booking (used when an optimizer moves a session); returns the removed record"""
+        with self._lock:
+            self.free_rooms.release(day, time_str, room)
+            return self._writable_slot(day, time_str).pop(room, None)
+
+    def count_large_room(self, outcome):
+        """Count one common-course session placed in its best-fit large room ('primary'), another one ('backup'),
+        or left unscheduled ('none')"""
+        with self._lock:
+            self.large_room_stats['requests'] += 1
+            self.large_room_stats[outcome] += 1
+
+    def snapshot(self):
+        """Copy-on-write fork of this state (O(days + cached free-room masks), not O(bookings))"""
+        with self._lock:
+            fork = ScheduleState()
+            fork.global_classroom_usage = dict(self.global_classroom_usage)
+            fork.large_room_stats = dict(self.large_room_stats)
+            fork.free_rooms = self.free_rooms.copy()
+            # Everything is shared now, so both sides copy before their next write
+            self._owned_days.clear()
+            self._owned_slots.clear()
+            return fork
+
+
+class GenerationContext:
+    """Everything a single department/semester/section generation reads and writes"""
+
+    def __init__(self, department, semester, section, days, time_slots, lunch_slot):
+        self.department = department
+        self.semester = semester
+        self.section = section
+        self.days = days
+
+        # Initialize timetable
+        self.timetable = {}
+        for day in days:
+            self.timetable[day] = {}
+            for time_slot in time_slots:
+                self.timetable[day][slot_key(time_slot)] = 'LUNCH BREAK' if time_slot == lunch_slot else 'Free'
+
+        self.used_slots = {day: {} for day in days}  # {day: {time_slot: {course: {'room': ..., ...}}}}
+        self.lab_usage = {day: {slot_key(ts): [] for ts in time_slots} for day in days}  # {day: {time_slot: [labs]}}
+        # Minutes used in flexible-slot cells that can still take packed sessions: {day: {time_slot: minutes}}
+        self.flex_minutes = {day: {} for day in days}
+        # Sessions per course per day, by type
+        self.lecture_schedule = {}
+        self.tutorial_schedule = {}
+        self.lab_schedule = {}
+
+        # Set once generate_all() has placed this group's labs ahead of everything else
+        self.labs_placed = False
+
+        self.unscheduled_courses = []
+        # Unscheduled item ('CS101 - Lecture 2') -> SessionDiagnosis
+        self.diagnoses = {}
+        # Common courses whose lectures/tutorials were placed once for a multi-group cohort
+        self.shared_courses = set()
+        # Elective baskets whose lectures/tutorials the elective planner placed
+        self.planned_baskets = set()
+        self.elective_courses = {}
+        self.rotated_out_electives = {}  # Electives rotated out for "After Midsems"
+
+    def result(self):
+        return self.timetable, self.elective_courses, self.rotated_out_electives
+
+
+def read_course_table(csv_file):
+    """One department's course CSV as a DataFrame with stripped column names"""
+    # pandas only loads here: the course tables are the one place a DataFrame is needed
+    import pandas as pd
+    df = pd.read_csv(csv_file)
+    # Clean column names
+    df.columns = df.columns.str.strip()
+    return df
+
+
+class SchedulingCore:
+    """
+    Greedy timetable scheduler: common courses first, then section courses, earliest free slot.
+
+    Reentrant: per-call data lives in a GenerationContext and the only shared
+    object is the ScheduleState. Rooms are booked with reserve_first_free() /
+    reserve_all(), which check and book under one lock acquisition, so threads
+    generating different groups on one core never double-book a room.
+    """
+
+    def __init__(self, config=None, state=None):
+        self.config = config or SchedulerConfig()
+        self.state = state or ScheduleState()
+
+    def input_fingerprint(self):
+        """Fingerprint of the course CSVs, room/enrolment files and settings (keys checkpoints)"""
+        config = self.config
+        folder = config.csv_folder
+        paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                 if name.endswith('.csv')] if os.path.isdir(folder) else []
+        paths += [config.room_capacity_file, config.enrolment_file]
+        # Sets are sorted so the fingerprint does not depend on string hash randomization
+        settings = tuple((f.name, sorted(value) if isinstance(value, frozenset) else value)
+                         for f in fields(config) for value in [getattr(config, f.name)])
+        return fingerprint(paths, extra=settings)
+
+    def fork(self, **config_changes):
+        """Independent core for a what-if run: changed config, copy-on-write snapshot of the ledger"""
+        config = self.config.with_changes(**config_changes) if config_changes else self.config
+        return SchedulingCore(config, self.state.snapshot())
+
+    def generate_all(self, groups):
+        """
+        Generate (department, semester, section) groups in order; returns {group: GenerationContext}.
+
+        With either option below, every group's labs are placed first (they only fit the
+        afternoon flexible slots). With plan_elective_baskets, each elective basket is
+        then placed once for all its groups (its rooms are fixed, so it goes before anything
+        that can fall back to another room). With share_common_offerings, common courses
+        listed by several of the groups are then placed once per offering, into every
+        attending group's timetable. The remaining lectures and tutorials are scheduled
+        group by group.
+        """
+        return dict(self.iter_generate(groups))
+
+    def iter_generate(self, groups):
+        """
+        Like generate_all(), but yields (group, GenerationContext or None) as each group
+        is finished, so callers can export early groups while later ones are placed.
+        """
+        prepared = {group: self._prepare(*group) for group in groups}
+        ready = {group: p for group, p in prepared.items() if p}
+        if self.config.plan_elective_baskets or self.config.share_common_offerings:
+            # Labs can only go in the afternoon flexible slots: place every group's labs before the
+            # baskets and shared offerings, which would otherwise fill those slots in every member section
+            with TRACER.span('timetable.place_labs', groups=len(ready)):
+                for ctx, common_courses, section_courses in ready.values():
+                    self._schedule_courses(ctx, common_courses, is_common=True, labs_only=True)
+                    self._schedule_courses(ctx, section_courses, is_common=False, labs_only=True)
+                    ctx.labs_placed = True
+        if self.config.plan_elective_baskets:
+            self._schedule_elective_baskets(ready)
+        if self.config.share_common_offerings:
+            self._schedule_shared_offerings(ready)
+        for group in groups:
+            yield group, self._place(*prepared[group]) if prepared[group] else None
+
+    # ------------------------------------------------------------------
+    # Input loading and course classification
+    # ------------------------------------------------------------------
+    def load_department_data(self, department):
+        """Load CSV data for a specific department"""
+        csv_file = os.path.join(self.config.csv_folder, f'Even {department}.csv')
+        if not os.path.exists(csv_file):
+            log.warning("Warning: %s not found", csv_file)
+            return None
+
+        # Parsed once per content: every group of a run (and every rerun in watch mode) shares it
+        return PARSED_INPUTS.get(csv_file, read_course_table)
+
+    @staticmethod
+    def get_courses_by_semester(df, semester):
+        """Filter courses for a specific semester"""
+        return df[df['Semester'] == semester].copy()
+
+    @staticmethod
+    def is_common_course(row):
+        """Check if course is common across sections"""
+        elective = str(row.get('Electives', '')).strip().upper()
+        section = row.get('Section', '')
+        # An empty Section cell is read as NaN
+        section = '' if is_missing(section) else str(section).strip()
+
+        # Common if it's a foundation course (F) without specific section
+        return elective == 'F' and section == ''
+
+    @staticmethod
+    def is_elective_course(row):
+        """Check if course is an elective (Type elective)"""
+        elective = str(row.get('Electives', '')).strip().upper()
+        return elective == 'T'
+
+    @staticmethod
+    def get_elective_basket(row):
+        """Get the basket name for elective course"""
+        return str(row.get('Basket', '')).strip()
+
+    @staticmethod
+    def _faculty_name(row):
+        """Faculty column with whitespace collapsed ('' when missing)"""
+        faculty = row.get('Faculty', '')
+        return '' if is_missing(faculty) else ' '.join(str(faculty).split())
+
+    @staticmethod
+    def parse_ltpsc(row):
+        """Parse LTPSC values"""
+        lectures = int(row.get('Lectures', 0))
+        tutorials = int(row.get('Tutorials', 0))
+        practicals = int(row.get('Practicals', 0))
+        return lectures, tutorials, practicals
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    def generate(self, department, semester, section='A'):
+        """Generate one timetable; returns (timetable, electives, rotated_out) or None"""
+        ctx = self.generate_context(department, semester, section)
+        return ctx.result() if ctx else None
+
+    def generate_context(self, department, semester, section='A'):
+        """Generate one timetable and return its GenerationContext (None if there is nothing to schedule)"""
+        group = (department, semester, section)
+        return self.generate_all([group])[group]
+
+    def _prepare(self, department, semester, section):
+        """Load and classify one group's courses; returns (ctx, common_courses, section_courses) or None"""
+        config = self.config
+        log.info("\n%s", '=' * 80)
+        log.info("Generating Timetable: %s - Semester %s - Section %s", department, semester, section,
+                 extra={'department': department, 'semester': semester, 'section': section})
+        log.info("%s", '=' * 80)
+
+        # Dynamic Saturday scheduling for high-load groups
+        days = config.days_for(department, semester)
+        if 'Saturday' in days:
+            log.info(">> Saturday classes enabled for %s Semester %s (high load optimization)", department, semester)
+
+        courses = self._courses_for(department, semester, section)
+        if courses is None:
+            return None
+
+        ctx = GenerationContext(department, semester, section, days, config.time_slots, config.lunch_slot)
+        return (ctx,) + courses
+
+    def _courses_for(self, department, semester, section):
+        """One group's (common_courses, section_courses), or None if it has no courses"""
+        with TRACER.span('timetable.load', department=department):
+            df = self.load_department_data(department)
+        if df is None:
+            return None
+
+        courses_df = self.get_courses_by_semester(df, semester)
+        if courses_df.empty:
+            log.warning("No courses found for Semester %s", semester)
+            return None
+
+        with TRACER.span('timetable.classify', department=department, semester=semester, section=section):
+            # First, schedule common courses (both sections together)
+            common_courses = courses_df[courses_df.apply(self.is_common_course, axis=1)]
+            section_courses = courses_df[~courses_df.apply(self.is_common_course, axis=1)]
+
+            # Filter section-specific courses
+            if not section_courses.empty and 'Section' in section_courses.columns:
+                section_letter = str(semester) + section
+                section_courses = section_courses[
+                    (section_courses['Section'].str.strip() == section_letter) |
+                    (section_courses['Section'].str.strip() == '') |
+                    (section_courses['Section'].isna())
+                ]
+
+        return common_courses, section_courses
+
+    def cohort_closure(self, groups, candidates):
+        """
+        `groups` plus every candidate group sharing a common course or an elective basket
+        with them (transitively), in candidate order. A partial run regenerates the whole
+        closure so shared sessions stay in the same slots for every member.
+        """
+        selected = list(dict.fromkeys(groups))
+        semesters = {group[1] for group in selected}
+        classified = {}
+        for group in candidates:
+            if group[1] in semesters:
+                courses = self._courses_for(*group)
+                if courses is not None:
+                    classified[group] = courses
+
+        cohorts = [set(offering.groups) for offering in self._offering_index(classified).shared()]
+        cohorts += [set(plan.groups) for plan in self._elective_planner(classified).plans()]
+        closure = set(selected)
+        changed = True
+        while changed:
+            changed = False
+            for cohort in cohorts:
+                if closure & cohort and not cohort <= closure:
+                    closure |= cohort
+                    changed = True
+        return [g for g in candidates if g in closure] + [g for g in selected if g not in candidates]
+
+    def _place(self, ctx, common_courses, section_courses):
+        """Schedule one prepared group's courses and report what could not be placed"""
+        department, semester, section = ctx.department, ctx.semester, ctx.section
+        log.debug("\nTotal courses to schedule:")
+        log.debug("   Common courses: %d", len(common_courses))
+        log.debug("   Section-specific courses: %d", len(section_courses))
+
+        with TRACER.span('timetable.place', department=department, semester=semester, section=section):
+            # Schedule common courses first
+            self._schedule_courses(ctx, common_courses, is_common=True)
+            # Schedule section-specific courses
+            self._schedule_courses(ctx, section_courses, is_common=False)
+        TRACER.count('timetable.unscheduled_sessions', len(ctx.unscheduled_courses))
+
+        # Report unscheduled courses
+        if ctx.unscheduled_courses:
+            log.warning("\nWARNING: %d sessions could not be scheduled (%s Sem %s Section %s):",
+                        len(ctx.unscheduled_courses), department, semester, section,
+                        extra={'department': department, 'semester': semester, 'section': section,
+                               'unscheduled': len(ctx.unscheduled_courses)})
+            for item in ctx.unscheduled_courses:
+                diagnosis = ctx.diagnoses.get(item)
+                if diagnosis:
+                    log.warning("   - %s (blocked at %s)", item, diagnosis.summary())
+                else:
+                    log.warning("   - %s", item)
+        else:
+            log.info("\nAll courses scheduled successfully!")
+
+        return ctx
+
+    def _offering_index(self, classified):
+        """CourseOfferingIndex of the common courses in {group: (common_courses, section_courses)}"""
+        index = CourseOfferingIndex()
+        for group, (common_courses, _) in classified.items():
+            for _, course in common_courses.iterrows():
+                lectures, tutorials, _ = self.parse_ltpsc(course)
+                index.add(group, course['Course Code'].strip(), self._faculty_name(course), lectures, tutorials,
+                          classroom=str(course.get('Classroom', '')).strip())
+        return index
+
+    def _schedule_shared_offerings(self, prepared):
+        """Place each common course taken by several groups once, for the whole cohort"""
+        index = self._offering_index({group: p[1:] for group, p in prepared.items()})
+        shared = index.shared()
+        TRACER.count('timetable.shared_offerings', len(shared))
+        TRACER.count('timetable.shared_placements_saved', index.placements_saved())
+        with TRACER.span('timetable.place_shared', offerings=len(shared)):
+            for offering in shared:
+                self._schedule_offering(offering, [prepared[group][0] for group in offering.groups])
+
+    def _schedule_offering(self, offering, cohort):
+        """Schedule one shared offering's lectures and tutorials into every cohort member's timetable"""
+        course_code = offering.course_code
+        log.debug("\n   Scheduling shared: %s for %s", course_code,
+                  ', '.join(f"{d} S{s}-{sec}" for d, s, sec in offering.groups))
+        for ctx in cohort:
+            ctx.shared_courses.add(course_code)
+            self._init_course(ctx, course_code)
+
+        for session_type, count in (('Lecture', offering.lectures), ('Tutorial', offering.tutorials)):
+            for num in range(count):
+                if not self._schedule_session(cohort[0], course_code, None, session_type, True, False, None,
+                                              faculty=offering.faculty, cohort=cohort,
+                                              preferred_rooms=offering.classrooms):
+                    self._report_unscheduled(cohort, course_code, session_type, num, None, True,
+                                             preferred_rooms=offering.classrooms)
+
+    def _elective_planner(self, classified):
+        """ElectivePlanner of the rotated-in elective baskets in {group: (common_courses, section_courses)}"""
+        planner = ElectivePlanner()
+        for group, (_, section_courses) in classified.items():
+            rotation = self.config.rotation_for(group[1])
+            for _, course in section_courses.iterrows():
+                if not self.is_elective_course(course):
+                    continue
+                basket = self.get_elective_basket(course)
+                if not basket or (rotation is not None and basket not in rotation):
+                    continue
+                lectures, tutorials, _ = self.parse_ltpsc(course)
+                planner.add(group, basket, course['Course Code'].strip(), self._faculty_name(course),
+                            course.get('Classroom', ''), lectures, tutorials)
+        return planner
+
+    def _schedule_elective_baskets(self, prepared):
+        """Place each elective basket once, in slots shared by every group choosing from it"""
+        plans = self._elective_planner({group: p[1:] for group, p in prepared.items()}).plans()
+        TRACER.count('timetable.elective_baskets', len(plans))
+        with TRACER.span('timetable.place_electives', baskets=len(plans)):
+            for plan in plans:
+                self._schedule_basket(plan, [prepared[group][0] for group in plan.groups])
+
+    def _schedule_basket(self, plan, cohort):
+        """Schedule one basket's lectures and tutorials for its whole cohort, booking each course's room"""
+        course_code = plan.course_code
+        log.debug("\n   Scheduling basket: %s (Semester %s) for %s", plan.basket, plan.semester,
+                  ', '.join(f"{d} S{s}-{sec}" for d, s, sec in plan.groups))
+        for ctx in cohort:
+            ctx.planned_baskets.add(plan.basket)
+            self._init_course(ctx, course_code)
+
+        for session_type in ('Lecture', 'Tutorial'):
+            for num, courses in enumerate(plan.meetings(session_type)):
+                bookings = []
+                for course in courses:
+                    if course.room is None:
+                        continue
+                    clash = next((b for b in bookings if b[0] == course.room), None)
+                    if clash:
+                        # Both courses are listed in the same room and neither can move to another session
+                        TRACER.count('timetable.elective_room_clashes')
+                        log.warning("Basket %s (Semester %s) %s %d: %s and %s both need %s",
+                                    plan.basket, plan.semester, session_type, num + 1,
+                                    clash[1], course.code, course.room)
+                        continue
+                    bookings.append((course.room, course.code, course.faculty))
+
+                if not self._schedule_session(cohort[0], course_code, None, session_type, False, True, plan.basket,
+                                              cohort=cohort, bookings=bookings):
+                    self._report_unscheduled(cohort, course_code, session_type, num, None, False, bookings=bookings)
+
+    def _get_day_priority_order(self, ctx):
+        """
+        Days sorted by number of free slots (most free first).
+        This helps fill underutilized days like Friday.
+        """
+        lunch_key = slot_key(self.config.lunch_slot)
+        day_free_count = {}
+        for day in ctx.days:
+            day_free_count[day] = sum(1 for time_str, cell in ctx.timetable[day].items()
+                                      if time_str != lunch_key and cell == 'Free')
+        return sorted(ctx.days, key=lambda d: day_free_count[d], reverse=True)
+
+    @staticmethod
+    def _usage_record(ctx, course_code, faculty, session_type, cohort=None):
+        """Global ledger record of one session, which prevents double-booking across semesters"""
+        record = {
+            'dept': ctx.department,
+            'semester': ctx.semester,
+            'section': ctx.section,
+            'course': course_code,
+            'faculty': faculty,
+            'type': session_type
+        }
+        if cohort:
+            # Every (dept, semester, section) attending a shared common-course session
+            record['cohort'] = cohort
+        return record
+
+    @staticmethod
+    def _is_own_booking(ctx, booking):
+        """True if a ledger record belongs to the department/semester/section being generated"""
+        return (booking['dept'], booking['semester'], booking['section']) == (ctx.department, ctx.semester,
+                                                                               ctx.section)
+
+    def _large_room_candidates(self, preferred=(), groups=()):
+        """
+        Large classrooms for a common course, most suitable first: C004, then the backups.
+        Rooms in `preferred` (a shared offering's own classrooms from the CSV) go before the backups.
+        With room capacities known, the candidates are ordered best fit first for the groups' enrolment.
+        """
+        large = self.config.large_auditorium
+        backups = tuple(r for r in preferred if r != large) + \
+            tuple(r for r in self.config.backup_large_classrooms if r not in preferred)
+        return self.config.room_assigner.large_room_order(groups, (large,) + backups)
+
+    def _find_available_large_classroom(self, day, time_str, candidates):
+        """The first free room of `candidates` in a slot, or None if every large classroom is taken"""
+        TRACER.count('timetable.room_conflict_checks')
+        room = self.state.first_free(candidates, day, time_str)
+        if room is None:
+            TRACER.count('timetable.large_room_exhausted')
+        return room
+
+    def _find_alternative_room(self, day, time_str, nominated, members):
+        """A free room at least as large as the busy nominated one, best fit for the members, or None"""
+        groups = tuple((m.department, m.semester, m.section) for m in members)
+        TRACER.count('timetable.room_conflict_checks')
+        return self.state.first_free(self.config.room_assigner.alternatives(nominated, groups), day, time_str)
+
+    def _reassign_bookings(self, day, time_str, bookings):
+        """
+        Planned basket bookings with every busy room swapped for a free one no smaller;
+        None if some course has nowhere to go.
+        """
+        taken = {room for room, _, _ in bookings}
+        moved = []
+        for room, course, faculty in bookings:
+            if self.state.is_room_taken(day, time_str, room):
+                room = self.state.first_free(self.config.room_assigner.alternatives(room), day, time_str,
+                                             exclude=taken)
+                if room is None:
+                    return None
+                taken.add(room)
+            moved.append((room, course, faculty))
+        TRACER.count('timetable.room_reassignments', sum(a[0] != b[0] for a, b in zip(bookings, moved)))
+        return moved
+
+    def _schedule_courses(self, ctx, courses_df, is_common=False, labs_only=False):
+        """Schedule courses into the context's timetable (only their labs with labs_only)"""
+        rotation = self.config.rotation_for(ctx.semester)
+
+        # Track which baskets we've already scheduled
+        scheduled_baskets = set()
+
+        for _, course in courses_df.iterrows():
+            course_code = course['Course Code'].strip()
+            course_title = course['Course Title'].strip()
+            classroom = str(course.get('Classroom', '')).strip()
+            faculty = self._faculty_name(course)
+
+            # Check if this is an elective course
+            is_elective = self.is_elective_course(course)
+            basket = self.get_elective_basket(course) if is_elective else None
+            entry = {
+                'code': course_code,
+                'title': course_title,
+                'classroom': classroom,
+                'section': ctx.section,
+                'semester': ctx.semester
+            }
+
+            # ELECTIVE ROTATION: Skip baskets not allowed for this semester
+            if is_elective and basket and rotation is not None and basket not in rotation:
+                log.debug("   Skipping %s (rotated out for Semester %s)", basket, ctx.semester)
+                # Store rotated out elective for "After Midsems" display (once: not in the labs pass)
+                if not labs_only:
+                    ctx.rotated_out_electives.setdefault(basket, []).append(entry)
+                continue
+
+            # Store elective info for later display
+            if is_elective and basket:
+                if not labs_only:
+                    ctx.elective_courses.setdefault(basket, []).append(entry)
+
+                # Skip scheduling if we've already scheduled this basket
+                if basket in scheduled_baskets:
+                    continue
+
+                # Mark basket as scheduled and use basket name as "course code" for scheduling
+                scheduled_baskets.add(basket)
+                course_code = f"ELECTIVE_{basket}"  # Use basket as unique identifier
+
+            # Common courses get a large classroom found dynamically during scheduling
+            if is_common:
+                classroom = None
+
+            # Electives use the course's own L, T, P (not the maximum across the basket)
+            lectures, tutorials, practicals = self.parse_ltpsc(course)
+            if is_common and course_code in ctx.shared_courses:
+                # Lectures/tutorials were placed with the other groups taking this offering; labs stay per section
+                lectures = tutorials = 0
+            elif is_elective and basket in ctx.planned_baskets:
+                # The elective planner placed the basket's lectures/tutorials for every section
+                lectures = tutorials = 0
+
+            if labs_only:
+                # Lectures and tutorials follow once the baskets and shared offerings are placed
+                lectures = tutorials = 0
+            elif ctx.labs_placed:
+                practicals = 0
+
+            self._init_course(ctx, course_code)
+
+            log.debug("\n   Scheduling: %s - L:%s T:%s P:%s", course_code, lectures, tutorials, practicals)
+
+            # Schedule lectures (1.5 hours each)
+            for lec_num in range(lectures):
+                if not self._schedule_session(ctx, course_code, classroom, 'Lecture',
+                                              is_common, is_elective, basket, faculty=faculty):
+                    self._report_unscheduled([ctx], course_code, 'Lecture', lec_num, classroom, is_common)
+
+            # Schedule tutorials (1 hour - use 1 slot)
+            for tut_num in range(tutorials):
+                if not self._schedule_session(ctx, course_code, classroom, 'Tutorial',
+                                              is_common, is_elective, basket, faculty=faculty):
+                    self._report_unscheduled([ctx], course_code, 'Tutorial', tut_num, classroom, is_common)
+
+            # Schedule practicals/labs: 2 credits = 1 lab session (2 hours), 4 credits = 2 lab sessions
+            num_lab_sessions = practicals // 2
+            for prac_num in range(num_lab_sessions):
+                if not self._schedule_lab_session(ctx, course_code, is_common, is_elective, basket,
+                                                  faculty=faculty):
+                    self._report_unscheduled([ctx], course_code, 'Lab', prac_num, None, is_common)
+
+    @staticmethod
+    def _init_course(ctx, course_code):
+        """Start per-day session counts for a course (no-op if already tracked)"""
+        if course_code not in ctx.lecture_schedule:
+            for schedule in (ctx.lecture_schedule, ctx.tutorial_schedule, ctx.lab_schedule):
+                schedule[course_code] = {day: 0 for day in ctx.days}
+
+    def _create_session_label(self, course_code, session_type, section, is_common, is_elective, basket):
+        """Create a label for a session"""
+        if is_elective and basket:
+            return f"Elective ({basket})"
+        elif is_common:
+            return f"{course_code} (Common)"
+        elif session_type == 'Tutorial':
+            return f"{course_code}-T-{section}"
+        else:
+            return f"{course_code}-{section}"
+
+    def _session_rules(self, session_type):
+        """(schedule tracker attribute, max per course per day, minutes) for a Lecture or Tutorial"""
+        config = self.config
+        if session_type == 'Lecture':
+            return 'lecture_schedule', config.max_lectures_per_day, config.lecture_minutes
+        if session_type == 'Tutorial':
+            return 'tutorial_schedule', config.max_tutorials_per_day, config.tutorial_minutes
+        return 'lecture_schedule', 1, config.lecture_minutes  # Fallback
+
+    def _schedule_session(self, ctx, course_code, classroom, session_type, is_common, is_elective, basket,
+                          faculty=None, cohort=None, preferred_rooms=(), bookings=None):
+        """
+        Schedule a single Lecture or Tutorial: morning slots, then afternoon flex slots, then evening.
+        A cohort (list of contexts, ctx first) gets one session in the same slot and room for all of them;
+        preferred_rooms are backup large classrooms to try first. A planned elective basket session
+        passes bookings, (room, course, faculty) for every member course, instead of one classroom.
+        With reassign_busy_rooms, a busy nominated room is swapped for a free one at least as large.
+        """
+        config = self.config
+        members = cohort or [ctx]
+        shared = len(members) > 1
+        schedule_name, max_per_day, duration_minutes = self._session_rules(session_type)
+        # Common courses without a classroom (classroom=None) get a large classroom in each slot they try
+        large_rooms = None
+        if bookings is None and is_common and classroom is None:
+            large_rooms = self._large_room_candidates(preferred_rooms, [(m.department, m.semester, m.section)
+                                                                        for m in members])
+
+        is_basket = bool(is_elective and basket)
+        # Basket cells name no room and cohort cells must stay identical, so neither is packed
+        can_pack = config.pack_flex_slots and not is_basket and not shared
+
+        # (slots long enough for the session, cell tag, fallback counter, packable) in the order they are tried
+        time_model = config.time_model
+        tiers = (
+            (time_model.fits(duration_minutes, ('regular',)), '', None, False),
+            (time_model.fits(duration_minutes, ('flex',)), f" [{duration_minutes}min]",
+             'timetable.flex_slot_fallbacks', can_pack),
+            (time_model.fits(duration_minutes, ('evening',)), " [EVENING]", 'timetable.evening_fallbacks', False),
+        )
+
+        # Try days with priority order - prioritize underutilized days like Friday
+        for day in self._get_day_priority_order(ctx):
+            if shared and any(day not in member.days for member in members):
+                continue
+
+            # Enforce strict rule: max 1 lecture/tutorial per course per day
+            if any(getattr(member, schedule_name)[course_code][day] >= max_per_day for member in members):
+                continue
+
+            # A lecture and a tutorial of the same course never share a day
+            if session_type == 'Lecture' and any(m.tutorial_schedule[course_code][day] > 0 for m in members):
+                continue
+            elif session_type == 'Tutorial' and any(m.lecture_schedule[course_code][day] > 0 for m in members):
+                continue
+
+            for slots, tag, fallback_counter, packable in tiers:
+                if packable:
+                    # Fill partly used flexible slots before opening a free one
+                    slots = sorted(slots, key=lambda s: ctx.timetable[day][s.key] == 'Free')
+                for slot in slots:
+                    time_str = slot.key
+                    TRACER.count('timetable.slot_probes')
+
+                    # Check if slot is free, or (flexible slots) has enough minutes left to pack this session
+                    cell = ctx.timetable[day][time_str]
+                    packing = cell != 'Free'
+                    used_minutes = ctx.flex_minutes[day].get(time_str, 0)
+                    if packing and not (packable and time_str in ctx.flex_minutes[day]
+                                        and used_minutes + duration_minutes <= slot.capacity_minutes):
+                        continue
+                    if shared and any(m.timetable[day][time_str] != 'Free' for m in members[1:]):
+                        continue
+
+                    if bookings is not None:
+                        # Planned basket: every member course's room has to be free
+                        TRACER.count('timetable.room_conflict_checks')
+                        conflict = any(self.state.is_room_taken(day, time_str, room) for room, _, _ in bookings)
+                        if conflict and config.reassign_busy_rooms:
+                            moved = self._reassign_bookings(day, time_str, bookings)
+                            if moved is not None:
+                                bookings, conflict = moved, False
+                        actual_classroom = bookings[0][0] if bookings else None
+                        booking = None
+                    else:
+                        # For common courses (classroom=None), find an available large classroom dynamically
+                        actual_classroom = classroom
+                        if large_rooms is not None:
+                            actual_classroom = self._find_available_large_classroom(day, time_str, large_rooms)
+                            if actual_classroom is None:
+                                continue  # No large classroom available in this slot
+
+                        # Check classroom conflict: locally within this timetable, then globally
+                        TRACER.count('timetable.room_conflict_checks')
+                        booking = self.state.booking(day, time_str, actual_classroom)
+                        if packing:
+                            # Packed sessions run back to back, so they may reuse this section's own room
+                            conflict = booking is not None and not self._is_own_booking(ctx, booking)
+                        else:
+                            conflict = booking is not None or any(
+                                existing.get('room') == actual_classroom
+                                for member in members
+                                for existing in member.used_slots[day].get(time_str, {}).values())
+                            if conflict and config.reassign_busy_rooms and not is_common:
+                                # The nominated room is busy: move to another room of sufficient size
+                                alternative = self._find_alternative_room(day, time_str, actual_classroom, members)
+                                if alternative is not None:
+                                    TRACER.count('timetable.room_reassignments')
+                                    actual_classroom, conflict = alternative, False
+                    if conflict:
+                        TRACER.count('timetable.room_conflicts')
+                        continue
+
+                    # Record GLOBAL classroom usage; the room is checked again as it is booked, so a
+                    # generation running in another thread cannot have taken it since the check above
+                    cohort_keys = [(m.department, m.semester, m.section) for m in members]
+                    if bookings is not None:
+                        booked = self.state.reserve_all(day, time_str, [
+                            (room, self._usage_record(ctx, member_course, member_faculty, session_type, cohort_keys))
+                            for room, member_course, member_faculty in bookings])
+                    else:
+                        record = self._usage_record(ctx, course_code, faculty, session_type,
+                                                    cohort_keys if shared else None)
+                        if packing and booking is not None:
+                            # This section's own booking: no other generation writes to it
+                            self.state.pack_usage(day, time_str, actual_classroom, record)
+                            booked = True
+                        else:
+                            booked = self.state.reserve_first_free((actual_classroom,), day, time_str,
+                                                                   record) is not None
+                    if not booked:
+                        TRACER.count('timetable.room_conflicts')
+                        continue
+                    if large_rooms is not None:
+                        # Counted once per placed session, against the best-fit room rather than per slot tried
+                        if actual_classroom == large_rooms[0]:
+                            self.state.count_large_room('primary')
+                        else:
+                            self.state.count_large_room('backup')
+                            TRACER.count('timetable.large_room_fallbacks')
+
+                    if fallback_counter:
+                        TRACER.count(fallback_counter)
+                    for member in members:
+                        label = self._create_session_label(course_code, session_type, member.section,
+                                                           is_common, is_elective, basket)
+                        part = f"{label}{tag}" if is_basket else f"{label}{tag} | {actual_classroom}"
+                        if packing:
+                            TRACER.count('timetable.flex_packed_sessions')
+                            member.timetable[day][time_str] = f"{cell}{PACK_SEPARATOR}{part}"
+                        else:
+                            member.timetable[day][time_str] = part
+                        if packable:
+                            member.flex_minutes[day][time_str] = used_minutes + duration_minutes
+
+                        member.used_slots[day].setdefault(time_str, {})[course_code] = {
+                            'room': actual_classroom,
+                            'course': course_code,
+                            'label': label,
+                            'type': session_type,
+                            'duration_minutes': duration_minutes,
+                            'slot_capacity_minutes': slot.capacity_minutes,
+                            'offset_minutes': used_minutes if packing else 0,
+                            'is_elective': is_elective,
+                            'basket': basket,
+                            # Sessions placed for a cohort or a planned basket move only as a whole
+                            'shared': shared or bookings is not None
+                        }
+                        getattr(member, schedule_name)[course_code][day] += 1
+                    return True
+
+        if large_rooms is not None:
+            self.state.count_large_room('none')
+        log.debug("      WARNING: Could not schedule %s - %s", course_code, session_type)
+        return False
+
+    def _schedule_lab_session(self, ctx, course_code, is_common, is_elective, basket, faculty=None):
+        """Schedule a 2-hour lab session in the afternoon flexible slots"""
+        config = self.config
+
+        # Get day priority order (prioritize underutilized days like Friday)
+        for day in self._get_day_priority_order(ctx):
+            # Enforce: Max 1 lab session per course per day
+            if ctx.lab_schedule[course_code][day] >= config.max_labs_per_day:
+                continue
+
+            # Try afternoon flexible slots long enough for a lab
+            for slot in config.time_model.fits(config.lab_minutes, ('flex',)):
+                time_str = slot.key
+                TRACER.count('timetable.lab_slot_probes')
+
+                # Check if slot is free
+                if ctx.timetable[day][time_str] != 'Free':
+                    continue
+
+                # Book an available lab room (every lab this context booked is in the ledger too)
+                TRACER.count('timetable.room_conflict_checks')
+                available_lab = self.state.reserve_first_free(
+                    config.lab_rooms, day, time_str, self._usage_record(ctx, course_code, faculty, 'Lab'))
+                if not available_lab:
+                    continue
+
+                # Create label for lab session
+                if is_elective and basket:
+                    label = f"Elective Lab ({basket})"
+                elif is_common:
+                    label = f"{course_code}-Lab (Common)"
+                else:
+                    label = f"{course_code}-Lab-{ctx.section}"
+
+                # Schedule the lab (full 2 hours)
+                ctx.timetable[day][time_str] = f"{label} [{config.lab_minutes}min] | {available_lab}"
+                ctx.lab_usage[day].setdefault(time_str, []).append(available_lab)
+
+                ctx.used_slots[day].setdefault(time_str, {})[course_code] = {
+                    'room': available_lab,
+                    'course': course_code,
+                    'label': label,
+                    'type': 'Lab',
+                    'duration_minutes': config.lab_minutes,
+                    'offset_minutes': 0,
+                    'slot_capacity_minutes': slot.capacity_minutes,
+                    'is_elective': is_elective,
+                    'basket': basket,
+                    'shared': False
+                }
+
+                ctx.lab_schedule[course_code][day] += 1
+                return True
+
+        log.debug("      WARNING: Could not schedule lab for %s", course_code)
+        return False
+
+    # ------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------
+    def _report_unscheduled(self, members, course_code, session_type, num, classroom, is_common,
+                            preferred_rooms=(), bookings=None):
+        """Add a session every member failed to place to their unscheduled lists, with its diagnosis"""
+        item = f"{course_code} - {session_type} {num+1}"
+        diagnosis = None
+        if self.config.diagnose_unscheduled:
+            with TRACER.span('timetable.diagnose', course=course_code):
+                diagnosis = self._diagnose(members, course_code, f"{session_type} {num+1}", classroom, is_common,
+                                           preferred_rooms, bookings)
+        for member in members:
+            member.unscheduled_courses.append(item)
+            if diagnosis:
+                member.diagnoses[item] = diagnosis
+
+    def _diagnose(self, members, course_code, session, classroom, is_common, preferred_rooms, bookings):
+        """Re-walk a failed session's (day, slot) probes, collecting every blocker of each"""
+        config = self.config
+        session_type = session.split()[0]
+        if session_type == 'Lab':
+            schedule_name, max_per_day, duration = 'lab_schedule', config.max_labs_per_day, config.lab_minutes
+            slots = config.time_model.fits(duration, ('flex',))
+            other = None
+        else:
+            schedule_name, max_per_day, duration = self._session_rules(session_type)
+            slots = [slot for kinds in (('regular',), ('flex',), ('evening',))
+                     for slot in config.time_model.fits(duration, kinds)]
+            other = {'Lecture': 'Tutorial', 'Tutorial': 'Lecture'}.get(session_type)
+
+        diagnosis = SessionDiagnosis([(m.department, m.semester, m.section) for m in members], course_code, session)
+        for day in members[0].days:
+            day_blockers = set()
+            for member in members:
+                group = group_label((member.department, member.semester, member.section))
+                if day not in member.days:
+                    day_blockers.add(('not_teaching_day', f"{group} has no classes on {day}"))
+                    continue
+                if getattr(member, schedule_name)[course_code][day] >= max_per_day:
+                    day_blockers.add(('daily_limit', f"{group} already has {course_code} {session_type} on {day}"))
+                if other and getattr(member, f"{other.lower()}_schedule")[course_code][day] > 0:
+                    day_blockers.add(('lecture_tutorial_same_day', f"{group} has {course_code} {other} on {day}"))
+
+            for slot in slots:
+                time_str = slot.key
+                blockers = set(day_blockers)
+                for member in members:
+                    if day not in member.days or member.timetable[day][time_str] == 'Free':
+                        continue
+                    group = group_label((member.department, member.semester, member.section))
+                    courses = list(member.used_slots[day].get(time_str, {})) or [member.timetable[day][time_str]]
+                    for course in courses:
+                        blockers.add(('group_busy', f"{group} has {course} at {day} {time_str}"))
+                blockers |= self._room_blockers(members, day, time_str, session_type, classroom, is_common,
+                                                preferred_rooms, bookings)
+                diagnosis.add_probe(day, time_str, blockers)
+        return diagnosis
+
+    def _room_blockers(self, members, day, time_str, session_type, classroom, is_common, preferred_rooms, bookings):
+        """(reason, detail) for every room problem of a session in one slot"""
+        state = self.state
+        assigner = self.config.room_assigner
+        groups = tuple((m.department, m.semester, m.section) for m in members)
+        if session_type == 'Lab':
+            if state.first_free(self.config.lab_rooms, day, time_str) is None:
+                return {('no_lab_room', f"all {len(self.config.lab_rooms)} lab rooms booked at {day} {time_str}")}
+            return set()
+        if bookings is not None:
+            nominated = [room for room, _, _ in bookings]
+        elif is_common and classroom is None:
+            large = self.config.large_auditorium
+            pool = (large,) + tuple(r for r in preferred_rooms if r != large) + \
+                tuple(r for r in self.config.backup_large_classrooms if r not in preferred_rooms)
+            if state.first_free(assigner.large_room_order(groups, pool), day, time_str) is None:
+                return {('no_large_room', f"all {len(pool)} large classrooms booked at {day} {time_str}")}
+            return set()
+        else:
+            nominated = [classroom]
+
+        blockers = set()
+        for room in nominated:
+            record = state.booking(day, time_str, room)
+            if record is None:
+                continue
+            if self.config.reassign_busy_rooms and not is_common and \
+                    state.first_free(assigner.alternatives(room, () if bookings is not None else groups),
+                                     day, time_str, exclude=nominated) is not None:
+                continue
+            blockers.add(('room_busy', booking_label(room, record)))
+        return blockers
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def export_to_csv(self, timetable, filename, electives=None, rotated_out=None):
+        """Export timetable to CSV (plus an _Electives.txt listing baskets and After Midsems courses)"""
+        if timetable is None:
+            return False
+
+        with TRACER.span('timetable.export_csv', file=filename):
+            os.makedirs(self.config.output_dir, exist_ok=True)
+            filepath = os.path.join(self.config.output_dir, filename)
+            write_grid(filepath, Grid.from_nested(timetable))
+
+            if electives:
+                write_electives_file(filepath.replace('.csv', '_Electives.txt'), electives, rotated_out)
+
+        log.info("Timetable saved: %s", filepath, extra={'file': filepath})
+        return True
+
+
+def run_what_if(base, scenarios, groups, max_workers=None):
+    """
+    Evaluate what-if scenarios in parallel threads, each on its own fork of `base`.
+
+    scenarios: {name: {config field: value}}, e.g. {'no_saturday': {'saturday_groups': frozenset()}}
+    groups:    (department, semester, section) tuples generated in order by every scenario
+    Returns {name: (core, {group: GenerationContext})}; `base` itself is never modified.
+    """
+    forks = {name: base.fork(**changes) for name, changes in scenarios.items()}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(core.generate_all, groups) for name, core in forks.items()}
+        return {name: (forks[name], future.result()) for name, future in futures.items()}
+
+
+def format_electives(electives, rotated_out=None):
+    """The basket listing that accompanies a timetable CSV, as text"""
+    lines = ["=" * 80, "ELECTIVE COURSES - Choose ONE from each basket", "=" * 80, ""]
+
+    for basket, courses in sorted(electives.items()):
+        lines += [f"Basket {basket}:", "-" * 40]
+        for course in courses:
+            lines += [f"  • {course['code']}: {course['title']}", f"    Classroom: {course['classroom']}"]
+        lines.append("")
+
+    # Add "After Midsems" section for rotated-out electives
+    if rotated_out:
+        lines += ["", "=" * 80, "AFTER MIDSEMS - These electives will be offered after mid-semester exams", "=" * 80, ""]
+
+        for basket, courses in sorted(rotated_out.items()):
+            lines += [f"Basket {basket} (After Midsems):", "-" * 40]
+            for course in courses:
+                lines += [f"  • {course['code']}: {course['title']}", f"    Classroom: {course['classroom']}"]
+            lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_electives_file(path, electives, rotated_out=None):
+    """Write the basket listing that accompanies a timetable CSV"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(format_electives(electives, rotated_out))
+
+
+def log_timetable(timetable, logger=log):
+    """Log the timetable grid (only built when DEBUG logging is on)"""
+    if timetable is None or not logger.isEnabledFor(logging.DEBUG):
+        return
+    import pandas as pd  # Only for the DEBUG grid printout
+    logger.debug("\n%s", pd.DataFrame(timetable).T)
+    logger.debug("\n%s", '=' * 80)
@@ -0,0 +1,226 @@
+"""
+Personal Student Timetables
+===========================
+
+Each student's week: their section's timetable with every elective basket
+placeholder ("Elective (B1)") replaced by the course they chose from that
+basket, so nobody has to merge *_Timetable.csv with _Electives.txt by hand.
+
+    timetables = StudentTimetables.from_store(store)      # or .from_contexts(contexts)
+    timetables.write_jsonl('timetable_outputs/student_timetables.jsonl')
+    timetables.write_html('timetable_html/students')
+
+Students come from the exam timetable's roll list (students.csv) and their
+choices from input_files/elective_choices.csv (roll_number, course_code; one
+row per chosen course). Without a choice for a basket the placeholder stays.
+
+Students are joined to their section by key, and the work is done once per
+section and set of choices rather than once per student: a section has only
+a handful of distinct choice sets, so their sessions (JSON) and pages (HTML)
+are rendered once and every student sharing them gets a copy with their own
+roll number. Output is streamed, one student at a time, so memory stays flat
+however many students there are.
+
+Author: BeyondGames Team
+"""
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from csv_codec import Grid, is_missing, read_records
+from input_watch import PARSED_INPUTS
+from instrumentation import TRACER
+from structured_logging import get_logger
+
+from room_assignment import semester_number
+from scheduling_core import PACK_SEPARATOR, SchedulerConfig, format_electives
+from timetable_to_html import TimetableHTMLConverter, timetable_stem
+
+log = get_logger('timetable.students')
+
+ELECTIVE_CHOICES_FILE = os.path.join('input_files', 'elective_choices.csv')
+STUDENTS_JSONL = 'student_timetables.jsonl'
+# Set to 1 for the JSON Lines file after each main.py run, or to "html" for per-student pages too
+STUDENTS_ENV = 'TIMETABLE_STUDENTS'
+
+# A basket placeholder part of a cell: "Elective (B1)", optionally tagged ("Elective (B1) [90min]")
+PLACEHOLDER = re.compile(r'^Elective \((?P<basket>[^)]+)\)(?P<tag>.*)$')
+NO_ROOM = ('', '-', 'nan', 'None')
+# Marks the subtitle of a rendered page, replaced by each student's roll number and name
+SUBTITLE_MARK = '\x00student\x00'
+
+
+def _clean(value):
+    return '' if is_missing(value) else str(value).strip()
+
+
+def load_students(path=None):
+    """Roll list records (roll_number, department, semester, section, student_name) from students.csv"""
+    path = path or SchedulerConfig.enrolment_file
+    if not os.path.exists(path):
+        log.warning("Roll list %s not found: no personal timetables", path)
+        return []
+    return PARSED_INPUTS.get(path, read_records)
+
+
+def load_choices(path=ELECTIVE_CHOICES_FILE):
+    """{roll_number: [course_code, ...]} from the elective choices CSV ({} when missing)"""
+    choices = defaultdict(list)
+    if os.path.exists(path):
+        for row in PARSED_INPUTS.get(path, read_records):
+            choices[_clean(row.get('roll_number'))].append(_clean(row.get('course_code')))
+    return choices
+
+
+class SectionTimetable:
+    """One section's generated grid and elective baskets, with its renders cached by choice set"""
+
+    def __init__(self, group, grid, electives):
+        self.group = group
+        self.grid = grid
+        self.electives = electives
+        # course code -> (basket, course) over the baskets scheduled this semester
+        self.basket_of = {course['code']: (basket, course)
+                          for basket, courses in electives.items() for course in courses}
+        self._sessions = {}
+        self._pages = {}
+
+    def chosen(self, codes):
+        """Choice set key: ((basket, code), ...) for the codes that belong to one of this section's baskets"""
+        picked = {}
+        for code in codes:
+            if code in self.basket_of:
+                picked.setdefault(self.basket_of[code][0], code)
+        return tuple(sorted(picked.items()))
+
+    def _personal_cell(self, cell, chosen):
+        parts = []
+        for part in cell.split(PACK_SEPARATOR):
+            match = PLACEHOLDER.match(part)
+            code = chosen.get(match.group('basket')) if match else None
+            if code is None:
+                parts.append(part)
+                continue
+            room = _clean(self.basket_of[code][1].get('classroom'))
+            label = f"{code}{match.group('tag')}"
+            parts.append(label if room in NO_ROOM else f"{label} | {room}")
+        return PACK_SEPARATOR.join(parts)
+
+    def personal_grid(self, choice_key):
+        chosen = dict(choice_key)
+        return Grid(self.grid.columns, {day: [self._personal_cell(cell, chosen) for cell in cells]
+                                        for day, cells in self.grid.rows.items()})
+
+    def sessions_json(self, choice_key):
+        """JSON list of [day, slot, cell] for every taught slot, encoded once per choice set"""
+        if choice_key not in self._sessions:
+            grid = self.personal_grid(choice_key)
+            sessions = [[day, slot, cell] for day, cells in grid.rows.items()
+                        for slot, cell in zip(grid.columns, cells) if cell not in ('', 'Free', 'LUNCH BREAK')]
+            self._sessions[choice_key] = json.dumps(sessions, separators=(',', ':'))
+        return self._sessions[choice_key]
+
+    def page(self, choice_key, converter):
+        """HTML page for a choice set, with SUBTITLE_MARK where the student's name goes"""
+        if choice_key not in self._pages:
+            chosen = dict(choice_key)
+            baskets = {basket: [course for course in courses if course['code'] == chosen[basket]]
+                       if basket in chosen else courses for basket, courses in self.electives.items()}
+            electives_html = converter._load_electives(None, content=format_electives(baskets)) if baskets else ""
+            self._pages[choice_key] = converter.render_html(self.personal_grid(choice_key), timetable_stem(self.group),
+                                                            electives_html, subtitle=SUBTITLE_MARK, base='../')
+        return self._pages[choice_key]
+
+
+class StudentTimetables:
+    """Joins the roll list and elective choices to the generated section timetables"""
+
+    def __init__(self, sections, students=None, choices=None):
+        """
+        Args:
+            sections: {(department, semester, section): SectionTimetable}
+            students: roll list records (default: load_students())
+            choices: {roll_number: [course_code]} (default: load_choices())
+        """
+        self.sections = sections
+        self.students = load_students() if students is None else students
+        self.choices = load_choices() if choices is None else choices
+
+    @classmethod
+    def from_contexts(cls, contexts, **kwargs):
+        """From GenerationContexts of a run"""
+        sections = {}
+        for ctx in contexts:
+            timetable, electives, _ = ctx.result()
+            group = (ctx.department, ctx.semester, ctx.section)
+            sections[group] = SectionTimetable(group, Grid.from_nested(timetable), electives or {})
+        return cls(sections, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        """From the timetables in a ScheduleStore"""
+        sections = {}
+        for group in store.sections():
+            group = tuple(group)
+            electives, _ = store.electives(*group)
+            sections[group] = SectionTimetable(group, store.timetable_grid(*group), electives)
+        return cls(sections, **kwargs)
+
+    def __iter__(self):
+        """(student record, SectionTimetable, choice key) per student whose section was generated"""
+        missing = 0
+        for student in self.students:
+            group = (_clean(student.get('department')), semester_number(student.get('semester')),
+                     _clean(student.get('section')))
+            section = self.sections.get(group)
+            if section is None:
+                missing += 1
+                continue
+            roll = _clean(student.get('roll_number'))
+            yield student, section, section.chosen(self.choices.get(roll, ()))
+        if missing:
+            log.warning("%d students belong to sections without a generated timetable", missing)
+
+    def write_jsonl(self, path):
+        """One compact JSON object per line and student; returns the number of students written"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        count = 0
+        with TRACER.span('timetable.students.jsonl'), open(path, 'w', encoding='utf-8') as f:
+            for student, section, choice_key in self:
+                department, semester, section_letter = section.group
+                head = json.dumps({'roll_number': _clean(student.get('roll_number')),
+                                   'name': _clean(student.get('student_name')),
+                                   'department': department, 'semester': semester, 'section': section_letter,
+                                   'electives': dict(choice_key)}, separators=(',', ':'))
+                # The sessions are already encoded (shared by the choice set): splice them in
+                f.write(f'{head[:-1]},"sessions":{section.sessions_json(choice_key)}}}\n')
+                count += 1
+        log.info("Personal timetables: %d students written to %s", count, path, extra={'file': path})
+        return count
+
+    def write_html(self, output_dir, converter=None):
+        """One page per student and section (<roll_number>_Section<X>.html); returns the number written"""
+        converter = converter or TimetableHTMLConverter()
+        os.makedirs(output_dir, exist_ok=True)
+        count = 0
+        with TRACER.span('timetable.students.html'):
+            for student, section, choice_key in self:
+                roll = _clean(student.get('roll_number'))
+                subtitle = f"{roll} - {_clean(student.get('student_name'))}"
+                # Roll numbers are only unique within a section in the roll list
+                html_file = os.path.join(output_dir, f"{roll}_Section{section.group[2]}.html")
+                with open(html_file, 'w', encoding='utf-8') as f:
+                    f.write(section.page(choice_key, converter).replace(SUBTITLE_MARK, subtitle))
+                count += 1
+        log.info("Personal timetable pages: %d written to %s/", count, output_dir, extra={'file': output_dir})
+        return count
+
+    def export(self, output_dir='timetable_outputs', html_dir=None):
+        """The JSON Lines file in output_dir, plus per-student pages in html_dir if given"""
+        count = self.write_jsonl(os.path.join(output_dir, STUDENTS_JSONL))
+        if html_dir:
+            self.write_html(html_dir)
+        return count
@@ -0,0 +1,182 @@
+"""
+Time Model
+==========
+
+Minute-resolution model of the teaching day. Each slot is a [start, end)
+interval in minutes since midnight with a kind:
+
+    regular   morning lecture/tutorial slots
+    lunch     the lunch break (never scheduled)
+    flex      afternoon flexible slots (labs, or shorter sessions)
+    evening   overflow slots
+
+Slots are kept sorted by start time with parallel start/end arrays, so
+overlap and lookup queries are answered with bisect in O(log n) (plus the
+number of matches). Capacities come from the slot lengths instead of
+constants in the scheduler; fits() bisects per-kind lists sorted by capacity
+and memoizes each (duration, kinds) answer, since the scheduler asks the
+same few questions for every session.
+
+A slot grid can be loaded from JSON (see input_files/time_grid.json):
+
+    {"slots": [{"start": "08:00", "end": "09:30", "kind": "regular"}, ...]}
+
+Author: BeyondGames Team
+"""
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+SLOT_KINDS = ('regular', 'lunch', 'flex', 'evening')
+
+
+def parse_hhmm(value):
+    """'08:30' -> 510 (minutes since midnight)"""
+    hours, minutes = str(value).strip().split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def format_hhmm(minutes):
+    """510 -> '08:30'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@dataclass(frozen=True, order=True)
+class Slot:
+    """One [start, end) teaching slot, in minutes since midnight"""
+
+    start: int
+    end: int
+    kind: str = 'regular'
+
+    @property
+    def key(self):
+        """'08:00-09:30', the key used in timetables and the room ledger"""
+        return f"{format_hhmm(self.start)}-{format_hhmm(self.end)}"
+
+    @property
+    def capacity_minutes(self):
+        return self.end - self.start
+
+    def as_tuple(self):
+        """('08:00', '09:30'), the form used by SchedulerConfig"""
+        return format_hhmm(self.start), format_hhmm(self.end)
+
+    def overlaps(self, start, end):
+        return self.start < end and start < self.end
+
+
+class TimeModel:
+    """Sorted, non-overlapping slot grid with O(log n) interval queries"""
+
+    def __init__(self, slots):
+        self.slots = sorted(slots)
+        for slot in self.slots:
+            if slot.kind not in SLOT_KINDS:
+                raise ValueError(f"Unknown slot kind '{slot.kind}' for {slot.key}")
+            if slot.end <= slot.start:
+                raise ValueError(f"Slot {slot.key} ends before it starts")
+        for prev, slot in zip(self.slots, self.slots[1:]):
+            if slot.start < prev.end:
+                raise ValueError(f"Slots {prev.key} and {slot.key} overlap")
+
+        self._starts = [s.start for s in self.slots]
+        self._ends = [s.end for s in self.slots]
+        self._by_key = {s.key: s for s in self.slots}
+        # kind (None for every slot) -> (sorted capacities, slots in the same order)
+        self._by_capacity = {}
+        for kind in (None,) + SLOT_KINDS:
+            ranked = sorted((s for s in self.slots if kind is None or s.kind == kind),
+                            key=lambda s: s.capacity_minutes)
+            self._by_capacity[kind] = ([s.capacity_minutes for s in ranked], ranked)
+        self._fits = {}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_tiers(cls, regular=(), lunch=None, flex=(), evening=()):
+        """Build from ('HH:MM', 'HH:MM') tuples grouped by kind (the SchedulerConfig fields)"""
+        slots = []
+        for kind, tuples in (('regular', regular), ('lunch', [lunch] if lunch else []),
+                             ('flex', flex), ('evening', evening)):
+            slots.extend(Slot(parse_hhmm(a), parse_hhmm(b), kind) for a, b in tuples)
+        return cls(slots)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from {"slots": [{"start": "08:00", "end": "09:30", "kind": "regular"}, ...]}"""
+        return cls([Slot(parse_hhmm(s['start']), parse_hhmm(s['end']), s.get('kind', 'regular'))
+                    for s in data['slots']])
+
+    @classmethod
+    def load(cls, path):
+        """Load a slot grid from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {'slots': [{'start': format_hhmm(s.start), 'end': format_hhmm(s.end), 'kind': s.kind}
+                          for s in self.slots]}
+
+    def tiers(self):
+        """SchedulerConfig field values: regular_slots, lunch_slot, afternoon_flex_slots, evening_slot"""
+        lunch = self.by_kind('lunch')
+        if len(lunch) != 1:
+            raise ValueError("A slot grid needs exactly one lunch slot")
+        return {
+            'regular_slots': tuple(s.as_tuple() for s in self.by_kind('regular')),
+            'lunch_slot': lunch[0].as_tuple(),
+            'afternoon_flex_slots': tuple(s.as_tuple() for s in self.by_kind('flex')),
+            'evening_slot': tuple(s.as_tuple() for s in self.by_kind('evening')),
+        }
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def get(self, key):
+        """Slot for a '08:00-09:30' key (None if the key is not in the grid)"""
+        return self._by_key.get(key)
+
+    def kind_of(self, key):
+        slot = self._by_key.get(key)
+        return slot.kind if slot else None
+
+    def capacity(self, key):
+        """Length of a slot in minutes"""
+        return self._by_key[key].capacity_minutes
+
+    def by_kind(self, kind):
+        return [s for s in self.slots if s.kind == kind]
+
+    def slot_at(self, minute):
+        """The slot containing a minute of the day, or None"""
+        i = bisect_right(self._starts, minute) - 1
+        if i >= 0 and minute < self._ends[i]:
+            return self.slots[i]
+        return None
+
+    def overlapping(self, start, end):
+        """Slots intersecting [start, end), in time order"""
+        # Ends are sorted too (slots do not overlap): first slot ending after `start`
+        first = bisect_right(self._ends, start)
+        last = bisect_left(self._starts, end)
+        return self.slots[first:last]
+
+    def fits(self, duration_minutes, kinds=None):
+        """Slots long enough for a session, optionally limited to some kinds, in time order"""
+        key = (duration_minutes, None if kinds is None else tuple(kinds))
+        found = self._fits.get(key)
+        if found is None:
+            matches = []
+            for kind in (None,) if kinds is None else key[1]:
+                capacities, ranked = self._by_capacity.get(kind, ((), ()))
+                matches.extend(ranked[bisect_left(capacities, duration_minutes):])
+            found = self._fits[key] = tuple(sorted(set(matches)))
+        return found
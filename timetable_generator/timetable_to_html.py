@@ -1,31 +1,86 @@
 """Convert Excel timetables to HTML format with interactive viewer"""
-import pandas as pd
 import os
+import re
+import sys
 from pathlib import Path
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from csv_codec import read_grid
+from instrumentation import TRACER
+from schedule_store import ScheduleStore
+from structured_logging import configure_logging
+
+from scheduling_core import PACK_SEPARATOR, SchedulerConfig, format_electives
+
+# "[90min]"-style duration tags written into flexible-slot cells
+DURATION_TAG = re.compile(r'\[(\d+)min\]')
+
+
+def timetable_stem(group):
+    """('CSE', 4, 'A') -> 'CSE_Sem4_SectionA_Timetable', the name of the section's CSV/HTML files"""
+    department, semester, section = group
+    return f"{department}_Sem{semester}_Section{section}_Timetable"
+
 class TimetableHTMLConverter:
-    def __init__(self, input_dir='timetable_outputs', output_dir='timetable_html'):
+    def __init__(self, input_dir='timetable_outputs', output_dir='timetable_html', config=None, store=None):
         self.input_dir = input_dir
         self.output_dir = output_dir
+        # Optional ScheduleStore: when it holds timetables, convert_all() reads them instead of the CSVs
+        self.store = store
+        # Slot kinds and session lengths come from the scheduler's time model
+        self.config = config or SchedulerConfig.from_env()
+        self.time_model = self.config.time_model
         os.makedirs(output_dir, exist_ok=True)
         
     def csv_to_html(self, csv_file, html_file):
         """Convert CSV timetable to beautiful HTML"""
         try:
-            df = pd.read_csv(csv_file, index_col=0)
-            
-            # Get timetable info from filename
-            filename = Path(csv_file).stem
-            parts = filename.replace('_Timetable', '').split('_')
-            dept = parts[0]
-            semester = parts[1]
-            section = parts[2]
+            grid = read_grid(csv_file)
             
             # Load elective information if available
             elective_file = csv_file.replace('.csv', '_Electives.txt')
             electives_html = self._load_electives(elective_file)
             
-            html_content = f"""
+            return self._write_html(grid, Path(csv_file).stem, electives_html, html_file)
+        except Exception as e:
+            print(f"Error converting {csv_file}: {e}")
+            return False
+    
+    def store_to_html(self, store, group, html_file):
+        """Convert one section's timetable read from a ScheduleStore (see common/schedule_store.py)"""
+        department, semester, section = group
+        try:
+            grid = store.timetable_grid(department, semester, section)
+            electives, rotated_out = store.electives(department, semester, section)
+            electives_html = ""
+            if electives:
+                electives_html = self._load_electives(store.path, content=format_electives(electives, rotated_out))
+            return self._write_html(grid, timetable_stem(group), electives_html, html_file)
+        except Exception as e:
+            print(f"Error converting {timetable_stem(group)} from {store.path}: {e}")
+            return False
+    
+    def _write_html(self, grid, filename, electives_html, html_file):
+        """Write the page of a timetable grid (days x slots) named like its CSV file"""
+        with open(html_file, 'w', encoding='utf-8') as f:
+            f.write(self.render_html(grid, filename, electives_html))
+        
+        return True
+    
+    def render_html(self, grid, filename, electives_html, subtitle=None, base=''):
+        """
+        Page of a timetable grid (days x slots) named like its CSV file, as text.
+        
+        subtitle replaces the "SemN - SectionX" line; base prefixes the page's relative
+        links (back to the index, CSV download) for pages one folder further down.
+        """
+        # Get timetable info from filename
+        parts = filename.replace('_Timetable', '').split('_')
+        dept = parts[0]
+        semester = parts[1]
+        section = parts[2]
+        
+        html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -488,6 +543,22 @@ class TimetableHTMLConverter:
             border-left: 4px solid #047857;
         }}
         
+        /* Several sessions packed into one flexible slot, side by side */
+        .packed-slot {{
+            gap: 4px;
+        }}
+        
+        .packed-slot .duration-bar {{
+            width: auto;
+            padding: 16px 6px;
+        }}
+        
+        .spare-duration {{
+            background: #f1f5f9;
+            color: #64748b;
+            border: 1px dashed #cbd5e1;
+        }}
+        
         .duration-tag {{
             background: rgba(255, 255, 255, 0.25);
             padding: 4px 12px;
@@ -565,15 +636,15 @@ class TimetableHTMLConverter:
     <div class="container">
         <div class="header">
             <h1>🎓 {dept} Timetable</h1>
-            <div class="subtitle">{semester} - {section}</div>
+            <div class="subtitle">{subtitle or f"{semester} - {section}"}</div>
         </div>
         
-        <a href="index.html" class="back-button">← Back to Selection</a>
+        <a href="{base}index.html" class="back-button">← Back to Selection</a>
         
         <div class="download-section">
             <h3>📥 Download Timetable</h3>
             <div class="download-buttons">
-                <a href="../timetable_outputs/{filename}.csv" class="download-btn csv-btn" download="{filename}.csv">
+                <a href="{base}../timetable_outputs/{filename}.csv" class="download-btn csv-btn" download="{filename}.csv">
                     📊 Download CSV
                 </a>
                 <button class="download-btn image-btn" onclick="downloadAsImage()">
@@ -610,7 +681,7 @@ class TimetableHTMLConverter:
         </div>
         
         <div class="timetable-wrapper">
-            {self._generate_table(df)}
+            {self._generate_table(grid)}
         </div>
         
         {electives_html}
@@ -618,23 +689,17 @@ class TimetableHTMLConverter:
 </body>
 </html>
 """
-            
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            return True
-        except Exception as e:
-            print(f"Error converting {csv_file}: {e}")
-            return False
+        return html_content
     
-    def _load_electives(self, elective_file):
-        """Load elective information from text file and format as HTML"""
-        if not os.path.exists(elective_file):
+    def _load_electives(self, elective_file, content=None):
+        """Load elective information from text file (or its text, when given) and format as HTML"""
+        if content is None and not os.path.exists(elective_file):
             return ""  # No electives for this timetable
         
         try:
-            with open(elective_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(elective_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
             # Parse the elective file
             html = """
@@ -772,27 +837,27 @@ class TimetableHTMLConverter:
             print(f"Warning: Could not load electives from {elective_file}: {e}")
             return ""
     
-    def _generate_table(self, df):
-        """Generate HTML table from DataFrame with duration bar support"""
+    def _generate_table(self, grid):
+        """Generate HTML table from a timetable Grid with duration bar support"""
         html = '<table>\n<thead>\n<tr>\n'
         
         # Header row
         html += '<th style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">Day/Time</th>\n'
-        for col in df.columns:
+        for col in grid.columns:
             # Check if this is an afternoon flexible slot
             if self._is_afternoon_flex_slot(col):
-                html += f'<th class="time-slot" style="background: linear-gradient(135deg, #8b5cf6 0%, #6d28d9 100%);">⏰ {col} <br><small style="font-size:0.8em;opacity:0.9">📦 2-Hour Flexible</small></th>\n'
+                hours = self.time_model.capacity(col.strip()) / 60
+                html += f'<th class="time-slot" style="background: linear-gradient(135deg, #8b5cf6 0%, #6d28d9 100%);">⏰ {col} <br><small style="font-size:0.8em;opacity:0.9">📦 {hours:g}-Hour Flexible</small></th>\n'
             else:
                 html += f'<th class="time-slot">⏰ {col}</th>\n'
         html += '</tr>\n</thead>\n<tbody>\n'
         
         # Data rows
-        for day in df.index:
+        for day, cells in grid.rows.items():
             html += '<tr>\n'
             html += f'<td class="day-column">{day}</td>\n'
             
-            for col in df.columns:
-                cell_value = str(df.loc[day, col])
+            for col, cell_value in zip(grid.columns, cells):
                 
                 # Check if this is an afternoon flexible slot
                 if self._is_afternoon_flex_slot(col):
@@ -809,59 +874,74 @@ class TimetableHTMLConverter:
         return html
     
     def _is_afternoon_flex_slot(self, time_slot):
-        """Check if a time slot is an afternoon flexible slot (2 hours)"""
-        # Afternoon flexible slots: 14:30-16:30 and 16:30-18:30
-        flex_patterns = ['14:30-16:30', '16:30-18:30']
-        return any(pattern in time_slot for pattern in flex_patterns)
+        """Check if a time slot is an afternoon flexible slot in the time model"""
+        return self.time_model.kind_of(str(time_slot).strip()) == 'flex'
+    
+    def _duration_style(self, minutes):
+        """(bar class, label) for a session length, e.g. 90 -> ('lecture-duration', '1.5 Hours')"""
+        if minutes >= self.config.lab_minutes:
+            duration_class = 'lab-duration'
+        elif minutes >= self.config.lecture_minutes:
+            duration_class = 'lecture-duration'
+        else:
+            duration_class = 'tutorial-duration'
+        hours = minutes / 60
+        return duration_class, f"{hours:g} Hour{'' if hours == 1 else 's'}"
+    
+    def _session_minutes(self, session):
+        """Length of one session in a flexible slot cell: its "[90min]" tag, else inferred from the label"""
+        tag = DURATION_TAG.search(session)
+        if tag:
+            return int(tag.group(1))
+        elif 'Lab' in session or 'lab' in session:
+            return self.config.lab_minutes
+        elif '-T-' in session or 'Tutorial' in session:
+            return self.config.tutorial_minutes
+        return self.config.lecture_minutes
+    
+    def _duration_bar(self, display_value, minutes, duration_class=None, style=''):
+        """One duration bar; packed bars get a flex style proportional to their length"""
+        default_class, duration_label = self._duration_style(minutes)
+        return f'''            <div class="duration-bar {duration_class or default_class}"{style}>
+                <div class="course-info">{display_value}</div>
+                <div class="duration-tag">{duration_label}</div>
+            </div>'''
     
     def _render_flex_slot_cell(self, cell_value, time_slot):
-        """Render a flexible afternoon slot cell with duration bar"""
+        """Render a flexible afternoon slot cell with one duration bar per (packed) session"""
         # Check for free slot or lunch
         if cell_value.lower() == 'free':
             return '<td class="free-slot">Free</td>\n'
         elif 'lunch' in cell_value.lower():
             return '<td class="lunch-break">🍽️ LUNCH BREAK</td>\n'
         
-        # Parse duration from cell value (e.g., "[120min]", "[90min]", "[60min]")
-        duration_minutes = 120  # Default to full slot
-        duration_class = 'lab-duration'  # Default
-        duration_label = '2 Hours'
-        
-        if '[120min]' in cell_value:
-            duration_minutes = 120
-            duration_class = 'lab-duration'
-            duration_label = '2 Hours'
-        elif '[90min]' in cell_value:
-            duration_minutes = 90
-            duration_class = 'lecture-duration'
-            duration_label = '1.5 Hours'
-        elif '[60min]' in cell_value:
-            duration_minutes = 60
-            duration_class = 'tutorial-duration'
-            duration_label = '1 Hour'
-        elif 'Lab' in cell_value or 'lab' in cell_value:
-            duration_class = 'lab-duration'
-            duration_label = '2 Hours'
-        elif '-T-' in cell_value or 'Tutorial' in cell_value:
-            duration_class = 'tutorial-duration'
-            duration_minutes = 60
-            duration_label = '1 Hour'
-        else:
-            duration_class = 'lecture-duration'
-            duration_minutes = 90
-            duration_label = '1.5 Hours'
-        
-        # Clean cell value for display (remove duration markers and EVENING label)
-        display_value = cell_value.replace('[120min]', '').replace('[90min]', '').replace('[60min]', '').replace('[EVENING]', '').strip()
-        
-        # Generate cell HTML with duration bar
+        sessions = cell_value.split(PACK_SEPARATOR)
+        bars = []
+        used_minutes = 0
+        for session in sessions:
+            # Parse duration from the session (e.g., "[120min]", "[90min]", "[60min]"), else infer it
+            minutes = self._session_minutes(session)
+            used_minutes += minutes
+            # Clean session for display (remove duration markers and EVENING label)
+            display_value = DURATION_TAG.sub('', session).replace('[EVENING]', '').strip()
+            style = f' style="flex: {minutes} 1 0"' if len(sessions) > 1 else ''
+            bars.append(self._duration_bar(display_value, minutes, style=style))
+        
+        wrapper_class = 'duration-bar-wrapper'
+        if len(sessions) > 1:
+            wrapper_class += ' packed-slot'
+            # Show what is left of the slot after the packed sessions
+            spare_minutes = self.time_model.capacity(str(time_slot).strip()) - used_minutes
+            if spare_minutes > 0:
+                bars.append(self._duration_bar('Free', spare_minutes, 'spare-duration',
+                                               f' style="flex: {spare_minutes} 1 0"'))
+        bars_html = '\n'.join(bars)
+        
+        # Generate cell HTML with the duration bars
         cell_html = f'''<td class="afternoon-flex-slot">
     <div class="session-container">
-        <div class="duration-bar-wrapper">
-            <div class="duration-bar {duration_class}">
-                <div class="course-info">{display_value}</div>
-                <div class="duration-tag">{duration_label}</div>
-            </div>
+        <div class="{wrapper_class}">
+{bars_html}
         </div>
     </div>
 </td>
@@ -1129,8 +1209,11 @@ class TimetableHTMLConverter:
         print(f"Created index page: {index_file}")
         return index_file
     
-    def convert_all(self):
-        """Convert all CSV timetables to HTML"""
+    def convert_all(self, groups=None):
+        """Convert all CSV timetables to HTML (only those of `groups`, if given; the index still lists all)"""
+        if self.store is not None and self.store.sections():
+            return self.convert_store(groups)
+        
         csv_files = []
         
         # Find all CSV files
@@ -1142,33 +1225,66 @@ class TimetableHTMLConverter:
             print("No timetable CSV files found!")
             return False
         
-        print(f"\nConverting {len(csv_files)} timetables to HTML...")
+        targets = csv_files
+        if groups is not None:
+            stems = {timetable_stem(group) for group in groups}
+            targets = [csv_file for csv_file in csv_files if Path(csv_file).stem in stems]
+        print(f"\nConverting {len(targets)} timetables to HTML...")
         
         converted = 0
-        for csv_file in csv_files:
+        for csv_file in targets:
             filename = Path(csv_file).stem
             html_file = os.path.join(self.output_dir, filename + '.html')
             
-            if self.csv_to_html(csv_file, html_file):
+            with TRACER.span('timetable.export_html', file=filename):
+                ok = self.csv_to_html(csv_file, html_file)
+            if ok:
                 print(f"Converted: {filename}")
                 converted += 1
         
         # Create index page
         self.create_index_page(csv_files)
         
-        print(f"\nSuccessfully converted {converted}/{len(csv_files)} timetables!")
+        print(f"\nSuccessfully converted {converted}/{len(targets)} timetables!")
         print(f"HTML files location: {self.output_dir}/")
         print(f"Open index.html to view all timetables")
         
         return True
 
+    def convert_store(self, groups=None):
+        """Convert every timetable held in the ScheduleStore (only those of `groups`, if given) to HTML"""
+        stored = self.store.sections()
+        targets = stored if groups is None else [group for group in stored if group in set(groups)]
+        print(f"\nConverting {len(targets)} timetables from {self.store.path} to HTML...")
+        
+        converted = 0
+        for group in targets:
+            filename = timetable_stem(group)
+            html_file = os.path.join(self.output_dir, filename + '.html')
+            
+            with TRACER.span('timetable.export_html', file=filename):
+                ok = self.store_to_html(self.store, group, html_file)
+            if ok:
+                print(f"Converted: {filename}")
+                converted += 1
+        
+        # The index only needs the file names
+        self.create_index_page([filename + '.csv' for filename in map(timetable_stem, stored)])
+        
+        print(f"\nSuccessfully converted {converted}/{len(targets)} timetables!")
+        print(f"HTML files location: {self.output_dir}/")
+        return True
+
 def main():
     """Main function"""
     print("\nBeyondGames Timetable HTML Converter")
     print("="*80)
+    configure_logging()
     
-    converter = TimetableHTMLConverter()
+    # With TIMETABLE_DB set, timetables are read from the schedule database
+    converter = TimetableHTMLConverter(store=ScheduleStore.from_env())
     converter.convert_all()
+    TRACER.finish()
     
     print("\n" + "="*80)
     print("HTML conversion complete!")
@@ -0,0 +1,218 @@
+"""
+What-If Batch Runner
+====================
+
+Evaluates a grid of scheduler configuration variants (elective rotation,
+backup large rooms, lab rooms, Saturday groups, ...) in a process pool and
+ranks them. Each scenario generates every timetable from scratch and is
+scored on unscheduled sessions, evening-slot and Saturday usage, and large-room
+fallbacks; room utilization is reported alongside but not scored. The ranking
+is written as a CSV comparison table.
+
+Usage (from timetable_generator/):
+    python what_if.py input_files/what_if_scenarios.json
+    python what_if.py scenarios.json --workers 4 --output timetable_outputs/what_if_ranking.csv
+
+Scenario file (JSON):
+    {
+      "grid": {                                   # every combination is run
+        "saturday_groups": {"ece4": [["ECE", 4]], "none": []},
+        "lab_rooms": {"5labs": ["Lab-1", "Lab-2", "Lab-3", "Lab-4", "Lab-5"], "3labs": ["Lab-1", "Lab-2", "Lab-3"]}
+      },
+      "scenarios": {"all_electives": {"elective_rotation": {}}},   # extra named variants
+      "weights": {"unscheduled": 100}             # overrides DEFAULT_WEIGHTS
+    }
+
+Author: BeyondGames Team
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from structured_logging import configure_logging, get_logger
+
+from scheduling_core import SchedulerConfig, SchedulingCore
+from room_analytics import RoomUtilizationReport
+from main import select_groups
+
+log = get_logger('timetable.what_if')
+
+DEFAULT_GROUPS = tuple(select_groups())
+
+# Penalty per unit of each metric; lower total score ranks higher.
+DEFAULT_WEIGHTS = {
+    'unscheduled': 100.0,
+    'evening_sessions': 5.0,
+    'saturday_sessions': 2.0,
+    'large_room_fallback_pct': 0.5,
+}
+
+# Reported but never scored: utilization is measured over each scenario's own rooms,
+# so a scenario that drops rooms would look better for it
+INFO_METRICS = ('utilization_pct',)
+
+COLUMNS = ['rank', 'scenario', 'score', 'unscheduled', 'evening_sessions', 'saturday_sessions',
+           'utilization_pct', 'large_room_fallback_pct', 'changes']
+
+_CONFIG_FIELDS = {f.name for f in fields(SchedulerConfig)}
+
+
+def _as_tuple(value):
+    """JSON lists -> (nested) tuples so config values stay hashable"""
+    if isinstance(value, list):
+        return tuple(_as_tuple(v) for v in value)
+    return value
+
+
+def config_changes_from_json(changes):
+    """Convert one scenario's JSON values into SchedulerConfig field values"""
+    converted = {}
+    for key, value in changes.items():
+        if key not in _CONFIG_FIELDS:
+            raise ValueError(f"Unknown scheduler setting in scenario: {key}")
+        if key == 'saturday_groups':
+            value = frozenset(tuple(group) for group in value)
+        elif key == 'elective_rotation':
+            value = tuple(sorted((int(sem), tuple(baskets)) for sem, baskets in value.items()))
+        else:
+            value = _as_tuple(value)
+        converted[key] = value
+    return converted
+
+
+def expand_scenarios(spec):
+    """
+    Turn a scenario file into an ordered {name: changes} dict.
+
+    Grid options may be a {label: value} dict or a plain list (labelled by index);
+    the scenario name joins the chosen labels, e.g. 'saturday_groups=none,lab_rooms=3labs'.
+    """
+    scenarios = {'baseline': {}}
+    grid = spec.get('grid', {})
+    axes = []
+    for key, options in grid.items():
+        if isinstance(options, dict):
+            axes.append([(key, label, value) for label, value in options.items()])
+        else:
+            axes.append([(key, str(i), value) for i, value in enumerate(options)])
+
+    if axes:
+        for combo in itertools.product(*axes):
+            name = ','.join(f"{key}={label}" for key, label, _ in combo)
+            scenarios[name] = {key: value for key, _, value in combo}
+
+    scenarios.update(spec.get('scenarios', {}))
+    return scenarios
+
+
+def score_scenario(name, changes, csv_folder='input_files/sdtt_inputs', groups=DEFAULT_GROUPS):
+    """Generate every group under one configuration and return its metrics (runs in a worker process)"""
+    config = SchedulerConfig.from_env().with_changes(csv_folder=csv_folder, **config_changes_from_json(changes))
+    core = SchedulingCore(config)
+    contexts = core.generate_all(groups)
+
+    unscheduled = evening = saturday = 0
+    for ctx in contexts.values():
+        if ctx is None:
+            continue
+        unscheduled += len(ctx.unscheduled_courses)
+        for day, slots in ctx.timetable.items():
+            for cell in slots.values():
+                if cell in ('Free', 'LUNCH BREAK'):
+                    continue
+                if '[EVENING]' in cell:
+                    evening += 1
+                if day == 'Saturday':
+                    saturday += 1
+
+    report = RoomUtilizationReport.from_config(config, core.state, unscheduled_count=unscheduled)
+    occupancy = report.room_occupancy()
+    stats = core.state.large_room_stats
+    fallbacks = stats['backup'] + stats['none']
+
+    return {
+        'scenario': name,
+        'unscheduled': unscheduled,
+        'evening_sessions': evening,
+        'saturday_sessions': saturday,
+        'utilization_pct': round(float(occupancy.mean()) * 100, 1) if len(occupancy) else 0.0,
+        'large_room_fallback_pct': round(100.0 * fallbacks / stats['requests'], 1) if stats['requests'] else 0.0,
+        'changes': json.dumps(changes, sort_keys=True),
+    }
+
+
+def rank_results(results, weights=None):
+    """Add a weighted score to each result and sort best-first (ties keep scenario order)"""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    unscored = sorted(set(weights) & set(INFO_METRICS))
+    if unscored:
+        raise ValueError(f"Metrics are informational only and cannot be weighted: {', '.join(unscored)}")
+    for row in results:
+        row['score'] = round(sum(w * row[metric] for metric, w in weights.items()), 2)
+    ranked = sorted(results, key=lambda r: r['score'])
+    for rank, row in enumerate(ranked, start=1):
+        row['rank'] = rank
+    return ranked
+
+
+def run_batch(scenarios, csv_folder='input_files/sdtt_inputs', workers=None, weights=None, groups=DEFAULT_GROUPS):
+    """Score every scenario in a process pool and return the ranked rows"""
+    names = list(scenarios)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(score_scenario, name, scenarios[name], csv_folder, groups) for name in names]
+        results = [future.result() for future in futures]
+    return rank_results(results, weights)
+
+
+def write_ranking_csv(ranked, path):
+    """Write the ranked comparison table"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in ranked:
+            writer.writerow({col: row[col] for col in COLUMNS})
+    return path
+
+
+def print_ranking(ranked):
+    print(f"\n{'Rank':>4}  {'Score':>8}  {'Unsched':>7}  {'Evening':>7}  {'Sat':>4}  {'Util%':>6}  {'Fallback%':>9}  Scenario")
+    print("-" * 90)
+    for r in ranked:
+        print(f"{r['rank']:>4}  {r['score']:>8.1f}  {r['unscheduled']:>7}  {r['evening_sessions']:>7}  "
+              f"{r['saturday_sessions']:>4}  {r['utilization_pct']:>6.1f}  {r['large_room_fallback_pct']:>9.1f}  "
+              f"{r['scenario']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run and rank timetable what-if scenarios')
+    parser.add_argument('scenario_file', help='JSON file with a "grid" and/or named "scenarios"')
+    parser.add_argument('--csv-folder', default='input_files/sdtt_inputs', help='course CSV folder')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--output', default=os.path.join('timetable_outputs', 'what_if_ranking.csv'))
+    parser.add_argument('--verbose', action='store_true', help='show generator output')
+    args = parser.parse_args(argv)
+
+    configure_logging(level='DEBUG' if args.verbose else 'ERROR')
+
+    with open(args.scenario_file, encoding='utf-8') as f:
+        spec = json.load(f)
+    scenarios = expand_scenarios(spec)
+    print(f"Running {len(scenarios)} scenario(s)...")
+
+    ranked = run_batch(scenarios, csv_folder=args.csv_folder, workers=args.workers, weights=spec.get('weights'))
+    print_ranking(ranked)
+    print(f"\nRanking saved: {write_ranking_csv(ranked, args.output)}")
+    return ranked
+
+
+if __name__ == "__main__":
+    main()